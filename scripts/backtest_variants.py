@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Walk-forward backtest of every rating variant (see rating_backtest.py).
+
+Rates each variant with its current constants through its regular
+calculate_* code (parameter_sweep.evaluate()) and scores every round of the
+last --days before it is applied: Plackett-Luce log-likelihood per entry,
+its gain over chance, Kendall tau and top-3 hit rate. Higher is better for
+all four; the variants are scored on the same rounds.
+
+Usage:
+  python scripts/backtest_variants.py [--days 365] [--variant base ...] [--engine numpy]
+"""
+
+import sys
+
+import calculate_rating as base
+from parameter_sweep import VARIANTS, backtest_start, evaluate
+from rating_backtest import DEFAULT_BACKTEST_DAYS
+from rating_pipeline import RatingPipeline
+
+
+def main():
+    parser = base.build_arg_parser("Walk-forward predictive backtest of the rating variants.")
+    parser.add_argument("--days", type=int, default=DEFAULT_BACKTEST_DAYS,
+                        help=f"score the rounds of the last N days, 0 for all (default: {DEFAULT_BACKTEST_DAYS})")
+    parser.add_argument("--variant", action="append", choices=list(VARIANTS), default=[],
+                        help="variant to backtest; repeatable (default: all)")
+    args = parser.parse_args()
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    if not len(runs):
+        print("No runs loaded. Exiting.")
+        return 1
+    profiles = base.build_team_profiles(runs)
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE, engine=args.engine)
+    score_from = backtest_start(runs, args.days)
+
+    print(f"\nScoring rounds from {score_from or 'the first competition'} to {runs.latest_date()}")
+    print(f"\n{'variant':<14}{'rounds':>8}{'entries':>9}{'loglik':>10}{'gain':>9}{'tau':>8}{'top3':>8}{'seconds':>9}")
+    for variant in args.variant or VARIANTS:
+        _, elapsed, scores = evaluate(runs, profiles, pipeline, {}, variant, score_from)
+        if not scores["rounds"]:
+            print(f"{variant:<14}{0:>8}  no rounds in the scoring period")
+            continue
+        tau = f"{scores['tau']:.4f}" if scores["tau"] is not None else "-"
+        print(f"{variant:<14}{scores['rounds']:>8}{scores['entries']:>9}{scores['loglik']:>10.4f}"
+              f"{scores['gain']:>9.4f}{tau:>8}{scores['top3']:>8.4f}{elapsed:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
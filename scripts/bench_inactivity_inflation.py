@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark and cross-check lazy inactivity inflation in the live variant.
+
+LiveVariantStrategy inflates a team's sigma once, for the summed gaps of the
+competitions since its last run (see its docstring for the equivalence
+rules). This script rates every size with it and with the per-competition
+loop it replaces (every team inflated at the start of every competition),
+for the full history and the form window, and reports rating time, the
+number of inflation calls and the largest absolute mu/sigma difference.
+
+Exits non-zero if any difference exceeds
+plackett_luce_kernel.EQUIVALENCE_TOLERANCE.
+
+Usage:
+  python scripts/bench_inactivity_inflation.py [--repeat 1]
+"""
+
+import sys
+import time
+
+import calculate_rating as base
+import calculate_rating_live_variant as live_variant
+from plackett_luce_kernel import EQUIVALENCE_TOLERANCE
+from rating_pipeline import RatingPipeline
+from rating_reference import EagerInflationStrategy, max_rating_diff, rate_all
+
+
+class CountingLazyStrategy(live_variant.LiveVariantStrategy):
+    """LiveVariantStrategy(True) counting its inflation calls across sizes."""
+
+    def __init__(self, counter=None):
+        super().__init__(True)
+        self.counter = counter if counter is not None else [0]
+
+    @property
+    def calls(self):
+        return self.counter[0]
+
+    def _inflate(self, rating, stats):
+        self.counter[0] += 1
+        super()._inflate(rating, stats)
+
+    def split(self):
+        return CountingLazyStrategy(self.counter)
+
+
+def _time(make_strategy, pipeline, since, repeat):
+    best = None
+    for _ in range(repeat):
+        strategy = make_strategy()
+        t0 = time.perf_counter()
+        result = rate_all(pipeline, strategy, since)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, strategy.calls, result
+
+
+def main():
+    parser = base.build_arg_parser("Cross-check lazy inactivity inflation against the per-competition loop.")
+    parser.add_argument("--repeat", type=int, default=1, help="timed repetitions, best is reported")
+    args = parser.parse_args()
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE, engine=args.engine)
+    windows = [("full history", None), ("form 12m", live_variant._form_window_start(runs))]
+
+    print(f"\n{'window':<14}{'eager':>10}{'lazy':>10}{'eager calls':>13}{'lazy calls':>12}  max |diff|")
+    ok = True
+    for name, since in windows:
+        for size in pipeline.size_labels(since=since):
+            pipeline.competitions(size, since=since)
+        t_eager, eager_calls, reference = _time(EagerInflationStrategy, pipeline, since, args.repeat)
+        t_lazy, lazy_calls, candidate = _time(CountingLazyStrategy, pipeline, since, args.repeat)
+        diff = max_rating_diff(reference, candidate)
+        ok &= diff <= EQUIVALENCE_TOLERANCE
+        print(f"{name:<14}{t_eager * 1000:8.0f}ms{t_lazy * 1000:8.0f}ms{eager_calls:>13}{lazy_calls:>12}  {diff:.3g}")
+
+    print(f"\nwithin tolerance {EQUIVALENCE_TOLERANCE:g}: {'yes' if ok else 'NO'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark indexed vs pairwise dog-variant merging.
+
+Times dog_variants.dog_variant_merge_map_pairwise() (original all-pairs
+loops), dog_variant_merge_map() with every handler indexed, and the default
+dog_variant_merge_map() (index only handlers with INDEXED_MERGE_MIN_DOGS+ dog
+ids) on:
+  - the real data/ set (runs loaded without merging),
+  - a synthetic set where every handler owns N disjoint copies of their dogs
+    (default 10x), which is what prolific handlers with many spelling
+    variants look like to the pairwise version.
+
+All must produce the same merge map; the script exits non-zero otherwise.
+
+Usage:
+  python scripts/bench_merge_dog_variants.py [--scale 10] [--repeat 3]
+"""
+
+import sys
+import time
+
+import calculate_rating as base
+from dog_variants import dog_variant_merge_map, dog_variant_merge_map_pairwise
+from rating_reference import scaled_handler_dogs
+
+
+def _time(fn, args, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _index_all(handler_dogs, handler_dog_regnames):
+    return dog_variant_merge_map(handler_dogs, handler_dog_regnames, min_indexed_dogs=2)
+
+
+def _bench(label, handler_dogs, handler_dog_regnames, repeat):
+    num_dogs = sum(len(d) for d in handler_dogs.values())
+    args = (handler_dogs, handler_dog_regnames)
+    t_pairwise, pairwise = _time(dog_variant_merge_map_pairwise, args, repeat)
+    print(f"{label}: {len(handler_dogs)} handlers, {num_dogs} dog ids, {len(pairwise)} merges")
+    print(f"  pairwise     {t_pairwise * 1000:9.1f} ms")
+    same = True
+    for name, fn in (("indexed all", _index_all), ("default", dog_variant_merge_map)):
+        elapsed, merge_map = _time(fn, args, repeat)
+        same &= merge_map == pairwise
+        print(f"  {name:<12} {elapsed * 1000:9.1f} ms  ({t_pairwise / elapsed:.1f}x)")
+    print(f"  identical merge maps: {'yes' if same else 'NO'}")
+    return same
+
+
+def main():
+    parser = base.build_arg_parser("Benchmark indexed vs pairwise dog-variant merging.")
+    parser.add_argument("--scale", type=int, default=10, help="synthetic copies per handler (default: 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions, best is reported")
+    args = parser.parse_args()
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers, merge_variants=False)
+    handler_dogs, handler_dog_regnames = base._collect_handler_dogs(runs, base.IDENTITY_RESOLVER)
+
+    print()
+    ok = _bench("data/", handler_dogs, handler_dog_regnames, args.repeat)
+    scaled = scaled_handler_dogs(handler_dogs, handler_dog_regnames, args.scale)
+    ok &= _bench(f"synthetic {args.scale}x", *scaled, args.repeat)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
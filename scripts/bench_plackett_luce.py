@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark and cross-check the NumPy Plackett-Luce engine against openskill.
+
+Rates every size with the strategy of each calculator (baseline, wow,
+disfocus, live_final with its live window, live_variant with inactivity
+inflation) once per engine on the same prepared rounds, and reports the
+rating time per engine plus the largest absolute mu/sigma difference.
+
+Exits non-zero if any difference exceeds
+plackett_luce_kernel.EQUIVALENCE_TOLERANCE.
+
+Usage:
+  python scripts/bench_plackett_luce.py [--repeat 1]
+"""
+
+import sys
+import time
+
+import calculate_rating as base
+from plackett_luce_kernel import EQUIVALENCE_TOLERANCE
+from rating_pipeline import RatingPipeline
+from rating_reference import calculator_strategies, max_rating_diff, rate_all
+
+
+def _time(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = base.build_arg_parser("Benchmark the NumPy Plackett-Luce engine against openskill.")
+    parser.add_argument("--repeat", type=int, default=1, help="timed repetitions, best is reported")
+    args = parser.parse_args()
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE)
+
+    print(f"\n{'strategy':<14}{'openskill':>12}{'numpy':>12}{'speedup':>9}  max |diff|")
+    ok = True
+    for name, make_strategy, since in calculator_strategies(runs):
+        # Prepare rounds outside the timed region; both engines share them.
+        for size in pipeline.size_labels(since=since):
+            pipeline.competitions(size, since=since)
+        t_ref, reference = _time(lambda: rate_all(pipeline, make_strategy(), since, "openskill"), args.repeat)
+        t_np, candidate = _time(lambda: rate_all(pipeline, make_strategy(), since, "numpy"), args.repeat)
+        diff = max_rating_diff(reference, candidate)
+        ok &= diff <= EQUIVALENCE_TOLERANCE
+        print(f"{name:<14}{t_ref * 1000:10.0f}ms{t_np * 1000:10.0f}ms{t_ref / t_np:8.1f}x  {diff:.3g}")
+
+    print(f"\nwithin tolerance {EQUIVALENCE_TOLERANCE:g}: {'yes' if ok else 'NO'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
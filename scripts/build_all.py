@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Rebuild every rating output in one run.
+
+Running the five calculate_rating*.py scripts one after another loads and
+resolves all results CSVs five times and builds the team profiles five
+times. This script loads runs and profiles once and then runs the variant
+builds as tasks:
+
+  base                  ratings.csv / .html
+  live_final            ratings_live_final.csv / .html, index.html
+  live_variant_active   ratings_live_variant_active.csv / .html
+  live_variant_form12m  ratings_live_variant_form12m.csv / .html
+  wow                   ratings_wow.csv / .html
+  disfocus              ratings_disfocus.csv / .html
+
+With --workers > 1 the tasks run in a process pool; workers receive the
+loaded runs and profiles once, through the pool initializer. Tasks run in
+the same worker share one RatingPipeline, so rounds prepared for one variant
+are reused by the next. ratings_live_variant_compare.html needs both live
+variant results and is written by the parent at the end.
+
+Serial runs fold base, wow and disfocus into a single task that rates all
+three in one walk over the rounds (RatingPipeline.rate_sizes()); in a pool
+they stay separate tasks so they can run concurrently.
+
+Each task's console output is captured and printed in task order. Output
+files are byte-identical to the individual scripts. Every task counts its
+checkpoint use on its own fork of the store; the parent adds them up and
+prints one summary for the whole build.
+
+Usage:
+  python scripts/build_all.py [--workers N] [--engine numpy]
+"""
+
+import contextlib
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import calculate_rating as base
+import calculate_rating_disfocus_variant as disfocus
+import calculate_rating_live_final as live_final
+import calculate_rating_live_variant as live_variant
+import calculate_rating_wow_variant as wow
+from rating_checkpoints import CheckpointStore
+from rating_pipeline import RatingPipeline
+
+
+def _build_base(runs, profiles, pipeline):
+    base.build(runs, profiles, pipeline)
+
+
+def _build_live_final(runs, profiles, pipeline):
+    live_final.print_config()
+    live_final.build(runs, profiles, pipeline)
+
+
+def _build_live_variant_active(runs, profiles, pipeline):
+    live_variant.print_config()
+    live_variant._print_windows(runs)
+    print("\n[1/2] Calculating full-history ratings with inactivity sigma inflation...")
+    all_ratings = live_variant.calculate_active(runs, profiles, pipeline)
+    live_variant.write_active(all_ratings)
+    return all_ratings
+
+
+def _build_live_variant_form12m(runs, profiles, pipeline):
+    print("\n[2/2] Calculating form-only ratings (last 12 months)...")
+    all_ratings = live_variant.calculate_form(runs, profiles, pipeline)
+    live_variant.write_form(all_ratings)
+    return all_ratings
+
+
+def _build_wow(runs, profiles, pipeline):
+    wow.print_config()
+    wow.build(runs, profiles, pipeline)
+
+
+def _build_disfocus(runs, profiles, pipeline):
+    disfocus.print_config()
+    disfocus.build(runs, profiles, pipeline)
+
+
+def _build_base_wow_disfocus(runs, profiles, pipeline):
+    # The three variants share the full-history round stream and differ only
+    # in entries, weights and stats, so one pass rates all of them.
+    strategies = [base.BaselineStrategy(), wow.WowStrategy(), disfocus.DisfocusStrategy()]
+    rated = pipeline.rate_sizes(strategies)
+    base_states, wow_states, disfocus_states = (
+        {size: states[idx] for size, states in rated.items()} for idx in range(len(strategies))
+    )
+    base.build(runs, profiles, pipeline, states=base_states)
+    wow.print_config()
+    wow.build(runs, profiles, pipeline, states=wow_states)
+    disfocus.print_config()
+    disfocus.build(runs, profiles, pipeline, states=disfocus_states)
+
+
+# Task name -> build(runs, profiles, pipeline), in submission / log order.
+TASKS = {
+    "base": _build_base,
+    "live_final": _build_live_final,
+    "live_variant_active": _build_live_variant_active,
+    "live_variant_form12m": _build_live_variant_form12m,
+    "wow": _build_wow,
+    "disfocus": _build_disfocus,
+}
+
+# Serial runs fold base, wow and disfocus into one single-pass task.
+SINGLE_PASS_TASKS = {
+    "base+wow+disfocus": _build_base_wow_disfocus,
+    "live_final": _build_live_final,
+    "live_variant_active": _build_live_variant_active,
+    "live_variant_form12m": _build_live_variant_form12m,
+}
+
+# Loaded data of the current process (parent when serial, else each worker).
+_TASK_STATE = {}
+
+
+def _init_tasks(runs, profiles, engine, checkpoints):
+    _TASK_STATE["runs"] = runs
+    _TASK_STATE["profiles"] = profiles
+    _TASK_STATE["pipeline"] = RatingPipeline(runs, base.MIN_FIELD_SIZE, engine=engine, checkpoints=checkpoints)
+
+
+def _run_task(name):
+    """Run one task; returns (captured console output, result, seconds, checkpoint counters)."""
+    task = TASKS.get(name) or SINGLE_PASS_TASKS[name]
+    pipeline = _TASK_STATE["pipeline"]
+    if pipeline.checkpoints is not None:
+        pipeline.checkpoints = pipeline.checkpoints.fork()
+    log = io.StringIO()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        result = task(_TASK_STATE["runs"], _TASK_STATE["profiles"], pipeline)
+    return log.getvalue(), result, time.perf_counter() - t0, pipeline.checkpoints
+
+
+def build_all(runs, profiles, engine=base.DEFAULT_RATING_ENGINE, workers=1, single_pass=None,
+              checkpoints=None):
+    """Run every task and write all outputs; returns {task: seconds}.
+
+    checkpoints: rating_checkpoints.CheckpointStore to resume ratings from;
+    the counters of every task are added to it.
+    single_pass (default: serial runs only) rates base, wow and disfocus in
+    one walk over the rounds instead of three tasks.
+    """
+    if single_pass is None:
+        single_pass = workers <= 1
+    names = list(SINGLE_PASS_TASKS if single_pass else TASKS)
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(names)),
+            initializer=_init_tasks,
+            initargs=(runs, profiles, engine, checkpoints),
+        )
+        with pool:
+            futures = [pool.submit(_run_task, name) for name in names]
+            outcomes = [future.result() for future in futures]
+    else:
+        _init_tasks(runs, profiles, engine, checkpoints)
+        outcomes = [_run_task(name) for name in names]
+
+    results = {}
+    timings = {}
+    for name, (log, result, elapsed, task_checkpoints) in zip(names, outcomes):
+        print(f"\n===== {name} =====")
+        print(log, end="")
+        results[name] = result
+        timings[name] = elapsed
+        if checkpoints is not None:
+            checkpoints.merge_counts(task_checkpoints)
+
+    live_variant.write_compare(results["live_variant_active"], results["live_variant_form12m"])
+    return timings
+
+
+def main():
+    args = base.build_arg_parser("Rebuild all rating outputs from one load.").parse_args()
+    t0 = time.perf_counter()
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    if not len(runs):
+        print("No runs loaded. Exiting.")
+        return
+    profiles = base.build_team_profiles(runs)
+    t_load = time.perf_counter() - t0
+
+    checkpoints = None if args.no_cache else CheckpointStore(base.CHECKPOINT_DIR)
+    timings = build_all(runs, profiles, engine=args.engine, workers=args.workers, checkpoints=checkpoints)
+
+    print(f"\nLoad + profiles: {t_load:.1f}s")
+    for name, elapsed in timings.items():
+        print(f"  {name:<22}{elapsed:6.1f}s")
+    print(f"Total: {time.perf_counter() - t0:.1f}s")
+    if checkpoints is not None:
+        print(checkpoints.summary())
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
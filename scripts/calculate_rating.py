@@ -8,14 +8,30 @@ ratings per size category, and outputs:
   - output/ratings.csv   (flat export)
 """
 
+import argparse
 import csv
+import functools
 import glob
+import hashlib
+import io
+import json
 import os
 import re
+import sys
 import unicodedata
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-from openskill.models import PlackettLuce
+import numpy as np
+
+import rank_intervals
+import rating_postprocess
+from dog_variants import dog_variant_merge_map
+from leaderboard import Leaderboard, leaderboards
+from run_cache import RunCache
+from rating_checkpoints import CheckpointStore
+from rating_pipeline import ENGINES, RatingPipeline, RatingStrategy
+from run_table import ChunkBuilder, RunTableBuilder
 
 # ---------------------------------------------------------------------------
 # Competition registry
@@ -75,6 +91,21 @@ COMPETITIONS = {
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+RUN_CACHE_DIR = os.path.join(CACHE_DIR, "runs")
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+
+# Bump when _parse_results_csv() or the identity helpers change behavior,
+# so cached chunks from an older parser are not reused.
+RUN_PARSER_VERSION = 1
+
+# Distinct raw strings remembered per IdentityResolver function.
+IDENTITY_CACHE_SIZE = 1 << 16
+# Default --workers for CSV parsing in load_all_runs().
+DEFAULT_LOAD_WORKERS = os.cpu_count() or 1
+# Round-update engine (see rating_pipeline.ENGINES). "numpy" is faster and
+# agrees with openskill to plackett_luce_kernel.EQUIVALENCE_TOLERANCE.
+DEFAULT_RATING_ENGINE = "openskill"
 
 MIN_FIELD_SIZE = 6
 MIN_RUNS_FOR_RANKING = 5  # teams with fewer runs are excluded from output
@@ -100,6 +131,7 @@ PROVISIONAL_SIGMA_THRESHOLD = 4.0
 ELITE_TOP_PERCENT = 0.02
 CHAMPION_TOP_PERCENT = 0.10  # Elite + Champion
 EXPERT_TOP_PERCENT = 0.30    # Elite + Champion + Expert
+TIER_TOP_PERCENTS = (ELITE_TOP_PERCENT, CHAMPION_TOP_PERCENT, EXPERT_TOP_PERCENT)
 
 # Preferred size tab order in the UI.
 SIZE_TAB_ORDER = ["Large", "Intermediate", "Medium", "Small"]
@@ -118,33 +150,32 @@ def is_provisional(sigma):
     return sigma >= PROVISIONAL_SIGMA_THRESHOLD
 
 
-def _percentile_threshold(values, percentile):
-    """Return value at percentile p (0..1) using deterministic nearest-rank index."""
-    if not values:
-        return float("inf")
-    sorted_values = sorted(values)
-    idx = int((len(sorted_values) - 1) * percentile)
-    return sorted_values[idx]
+def compute_tier_thresholds(all_ratings, score_key="displayed_rating", min_runs=MIN_RUNS_FOR_RANKING):
+    """Compute per-size skill tier cutoffs from displayed rating percentiles."""
+    return rating_postprocess.compute_tier_thresholds(all_ratings, score_key, min_runs, TIER_TOP_PERCENTS)
 
 
-def compute_tier_thresholds(all_ratings):
-    """Compute per-size skill tier cutoffs from displayed rating percentiles."""
-    thresholds_by_size = {}
-
-    for size in sorted(all_ratings.keys()):
-        ranked = [
-            t for t in all_ratings[size].values()
-            if t["num_runs"] >= MIN_RUNS_FOR_RANKING
-        ]
-        scores = [t["displayed_rating"] for t in ranked]
-
-        thresholds_by_size[size] = {
-            "elite_min": _percentile_threshold(scores, 1.0 - ELITE_TOP_PERCENT),
-            "champion_min": _percentile_threshold(scores, 1.0 - CHAMPION_TOP_PERCENT),
-            "expert_min": _percentile_threshold(scores, 1.0 - EXPERT_TOP_PERCENT),
-        }
+def assign_skill_tiers(all_ratings, score_key="displayed_rating", min_runs=MIN_RUNS_FOR_RANKING,
+                       provisional_sigma=PROVISIONAL_SIGMA_THRESHOLD):
+    """Set per-size percentile skill tiers and the provisional flag, in place."""
+    rating_postprocess.assign_tiers(all_ratings, score_key, min_runs, TIER_TOP_PERCENTS, provisional_sigma)
+
+
+def attach_rank_intervals(boards, workers=1):
+    """Monte Carlo 90% rank interval and P(Elite) of every ranked team (rank_intervals.py)."""
+    scores = {}
+    for size, board in boards.items():
+        mu = rating_postprocess.column(board.size_results, "mu")[board.rows]
+        sigma = rating_postprocess.column(board.size_results, "sigma")[board.rows]
+        scores[size] = (mu - 3.0 * sigma, sigma)
+    rank_intervals.attach_rank_intervals(boards, scores, ELITE_TOP_PERCENT, workers)
 
-    return thresholds_by_size
+
+def format_rank_interval(team):
+    """HTML cell text of a team's rank interval, e.g. 3–9."""
+    if team["rank_low"] == team["rank_high"]:
+        return str(team["rank_low"])
+    return f"{team['rank_low']}–{team['rank_high']}"
 
 
 def skill_tier_label(rating, thresholds):
@@ -157,9 +188,17 @@ def skill_tier_label(rating, thresholds):
     return "Competitor"
 
 
+def print_size_summary(board):
+    """Log line of a rated size: team count and top team (board over every team)."""
+    print(f"  {len(board)} unique teams rated")
+    if len(board):
+        top = board.top(1)[0]
+        print(f"  Top: {top['handler']} / {top['dog']} ({top['country']}) — {top[board.score_key]}")
+
+
 def natural_sort_key(value):
     """Sort strings in human order: ..._2 before ..._10."""
-    parts = re.split(r"(\d+)", value or "")
+    parts = _DIGIT_RUN_RE.split(value or "")
     key = []
     for part in parts:
         if part.isdigit():
@@ -254,6 +293,17 @@ HANDLER_DISPLAY_OVERRIDES = {
 }
 
 
+# Patterns shared by the name parsers (compiled once, used per row).
+_DIGIT_RUN_RE = re.compile(r"(\d+)")
+_WHITESPACE_RE = re.compile(r"\s+")
+_PAREN_SUFFIX_RE = re.compile(r"\(([^)]+)\)\s*$")
+_QUOTE_SUFFIX_RE = re.compile(r'"([^"]+)"\s*$')
+_PAREN_SUFFIX_STRIP_RE = re.compile(r'\s*\([^)]+\)\s*$')
+_QUOTE_SUFFIX_STRIP_RE = re.compile(r'\s*"[^"]+"\s*$')
+_PAREN_GROUP_RE = re.compile(r"\(([^)]+)\)")
+_OPEN_PAREN_TAIL_RE = re.compile(r"\(([^()]*)\s*$")
+_NON_NAME_CHARS_RE = re.compile(r"[^\w\s'\-’]", flags=re.UNICODE)
+
 # Characters that NFKD decomposition doesn't handle (single codepoints
 # without a base+combining decomposition).
 _EXTRA_TRANSLITERATION = str.maketrans({
@@ -265,6 +315,8 @@ _EXTRA_TRANSLITERATION = str.maketrans({
 
 def strip_diacritics(s):
     """Remove diacritics: 'Diviš' -> 'Divis', 'Gołąb' -> 'Golab'."""
+    if s.isascii():
+        return s
     s = s.translate(_EXTRA_TRANSLITERATION)
     nfkd = unicodedata.normalize("NFKD", s)
     return "".join(c for c in nfkd if not unicodedata.combining(c))
@@ -272,7 +324,7 @@ def strip_diacritics(s):
 
 def normalize_registered_name(name):
     """Normalize registered name and fix known source typos."""
-    normalized = re.sub(r"\s+", " ", name.strip().lower())
+    normalized = _WHITESPACE_RE.sub(" ", name.strip().lower())
     return REGISTERED_NAME_ALIASES.get(normalized, normalized)
 
 
@@ -290,7 +342,7 @@ def normalize_handler(name):
         parts = name.split(",", 1)
         name = f"{parts[1].strip()} {parts[0].strip()}"
     # Collapse multiple spaces
-    name = re.sub(r"\s+", " ", name)
+    name = _WHITESPACE_RE.sub(" ", name)
     # Sort name parts so "jakub divis" == "divis jakub"
     parts = name.split()
     normalized = " ".join(sorted(parts))
@@ -317,7 +369,7 @@ def parse_dog_name(dog_name):
     dog_name = dog_name.replace("\u2018", "'").replace("\u2019", "'")
 
     # Try to extract from parentheses at end: "... (CallName)"
-    match = re.search(r"\(([^)]+)\)\s*$", dog_name)
+    match = _PAREN_SUFFIX_RE.search(dog_name)
     if match:
         call = match.group(1).strip().lower()
         if call in NON_CALL_SUFFIXES:
@@ -332,7 +384,7 @@ def parse_dog_name(dog_name):
             return call, reg
 
     # Try to extract from quotes: '... "CallName"'
-    match = re.search(r'"([^"]+)"\s*$', dog_name)
+    match = _QUOTE_SUFFIX_RE.search(dog_name)
     if match:
         call = match.group(1).strip().lower()
         if call in NON_CALL_SUFFIXES:
@@ -370,6 +422,54 @@ def make_team_id(handler, dog):
     return f"{h}|||{d}"
 
 
+class IdentityResolver:
+    """Memoizing front end for normalize_handler / parse_dog_name / make_team_id.
+
+    The same few thousand handler and dog strings repeat across tens of
+    thousands of rows. Each distinct raw string is resolved once (bounded LRU
+    per function, keyed on the raw input) and the resulting strings are
+    interned, so equal team ids share one object.
+    """
+
+    def __init__(self, max_entries=IDENTITY_CACHE_SIZE):
+        self.normalize_handler = functools.lru_cache(maxsize=max_entries)(self._normalize_handler)
+        self.parse_dog_name = functools.lru_cache(maxsize=max_entries)(self._parse_dog_name)
+        self.make_team_id = functools.lru_cache(maxsize=max_entries)(self._make_team_id)
+
+    @staticmethod
+    def _normalize_handler(name):
+        return sys.intern(normalize_handler(name))
+
+    @staticmethod
+    def _parse_dog_name(dog_name):
+        call, reg = parse_dog_name(dog_name)
+        return sys.intern(call), sys.intern(reg)
+
+    def _make_team_id(self, handler, dog):
+        # Same rules as make_team_id(), on top of the memoized parts.
+        h = self.normalize_handler(handler)
+        if dog:
+            call, reg = self.parse_dog_name(dog)
+            d = call if call else reg
+        else:
+            d = ""
+        return sys.intern(f"{h}|||{d}")
+
+    def summary(self):
+        """One-line hit rates, e.g. for the end of a loader log."""
+        parts = []
+        for name in ("make_team_id", "normalize_handler", "parse_dog_name"):
+            info = getattr(self, name).cache_info()
+            calls = info.hits + info.misses
+            hit_pct = 100.0 * info.hits / calls if calls else 0.0
+            parts.append(f"{name} {hit_pct:.1f}% of {calls}")
+        return "Identity resolver hits: " + ", ".join(parts)
+
+
+# Shared by load_all_runs(), dog-variant merging and build_team_profiles().
+IDENTITY_RESOLVER = IdentityResolver()
+
+
 def _extract_call_name_from_handler_blob(handler_blob):
     """Extract call name from a combined handler+dog string.
 
@@ -380,18 +480,18 @@ def _extract_call_name_from_handler_blob(handler_blob):
         return ""
 
     # Prefer the last complete "(...)" group anywhere in the string.
-    all_parens = re.findall(r"\(([^)]+)\)", handler_blob)
+    all_parens = _PAREN_GROUP_RE.findall(handler_blob)
     if all_parens:
         candidate = all_parens[-1]
     else:
         # Fallback for malformed inputs missing trailing ")".
-        tail = re.search(r"\(([^()]*)\s*$", handler_blob)
+        tail = _OPEN_PAREN_TAIL_RE.search(handler_blob)
         if not tail:
             return ""
         candidate = tail.group(1)
 
-    candidate = re.sub(r"[^\w\s'\-’]", "", candidate, flags=re.UNICODE)
-    candidate = re.sub(r"\s+", " ", candidate).strip()
+    candidate = _NON_NAME_CHARS_RE.sub("", candidate)
+    candidate = _WHITESPACE_RE.sub(" ", candidate).strip()
     if not candidate:
         return ""
     # Call names are typically short; longer tails are likely parsing noise.
@@ -404,19 +504,75 @@ def _extract_call_name_from_handler_blob(handler_blob):
 # Data loading
 # ---------------------------------------------------------------------------
 
-def load_all_runs():
-    """Load all CSV files and attach competition metadata.
+def identity_rules_fingerprint():
+    """Hash of everything besides file contents that shapes parsed runs."""
+    rules = {
+        "parser_version": RUN_PARSER_VERSION,
+        "team_disciplines_included": sorted(TEAM_DISCIPLINES_INCLUDED),
+        "dog_aliases": DOG_ALIASES,
+        "non_call_suffixes": sorted(NON_CALL_SUFFIXES),
+        "registered_to_call": REGISTERED_TO_CALL,
+        "registered_name_aliases": REGISTERED_NAME_ALIASES,
+        "handler_aliases": HANDLER_ALIASES,
+    }
+    payload = json.dumps(rules, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def build_arg_parser(description):
+    """Argument parser with the options shared by all rating calculators."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="re-parse every results CSV and re-rate from scratch instead of using the "
+             "parsed-run cache and rating checkpoints",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_LOAD_WORKERS,
+        help="processes used to parse results CSVs and rate sizes (default: all cores; 1 = serial)",
+    )
+    parser.add_argument(
+        "--engine", choices=list(ENGINES), default=DEFAULT_RATING_ENGINE,
+        help=f"Plackett-Luce update implementation (default: {DEFAULT_RATING_ENGINE})",
+    )
+    return parser
+
+
+def pipeline_from_args(runs, args):
+    """RatingPipeline over runs configured by build_arg_parser() options."""
+    checkpoints = None if args.no_cache else CheckpointStore(CHECKPOINT_DIR)
+    return RatingPipeline(runs, MIN_FIELD_SIZE, engine=args.engine, workers=args.workers,
+                          checkpoints=checkpoints)
+
+
+def load_all_runs(use_cache=True, resolver=None, workers=1, merge_variants=True):
+    """Load all CSV files into a RunTable with competition metadata side table.
 
     Team rounds are included only for individual-run disciplines
     (Agility/Jumping/Final). Aggregate team-only rows (e.g. Unknown) are skipped.
+
+    With use_cache, files whose bytes and identity rules are unchanged since the
+    previous load come from the parsed-run cache (see run_cache.py) instead of
+    being parsed and resolved again. Identity resolution goes through
+    resolver (default: the shared IDENTITY_RESOLVER).
+
+    With workers > 1, files that need parsing are parsed in a process pool.
+    Recovery maps are file-local, so each file parses independently; chunks
+    are merged in sorted file order and the result (runs and counters) is the
+    same as a serial load. Worker processes resolve identities with their own
+    IDENTITY_RESOLVER, so the resolver hit rates only cover the parent.
+
+    merge_variants=False skips dog-variant merging (used by tools that study
+    the merge itself).
     """
-    runs = []
+    resolver = resolver or IDENTITY_RESOLVER
+    builder = RunTableBuilder()
     csv_files = sorted(glob.glob(os.path.join(DATA_DIR, "*", "*_results.csv")))
-    skipped_no_identity = 0
-    skipped_team_rounds = 0
-    recovered_handler_from_id = 0
-    recovered_identity_from_start_no = 0
+    cache = RunCache(RUN_CACHE_DIR, identity_rules_fingerprint()) if use_cache else None
+    totals = defaultdict(int)
 
+    # file entries in load order: [comp_idx, filepath, cache_key, text, chunk]
+    entries = []
     for filepath in csv_files:
         comp_dir = os.path.basename(os.path.dirname(filepath))
         if comp_dir == "_downloads":
@@ -425,283 +581,223 @@ def load_all_runs():
             print(f"WARNING: unknown competition dir '{comp_dir}', skipping")
             continue
 
-        comp_meta = COMPETITIONS[comp_dir]
-
-        with open(filepath, newline="", encoding="utf-8") as f:
-            rows = list(csv.DictReader(f))
-
-        # File-local recovery map: handler_id -> best known handler text.
-        # We only trust rows that already have a dog in a dedicated dog column.
-        handler_by_id = {}
-        identity_by_start_no = {}
-        ambiguous_start_no = set()
-        for row in rows:
-            hid = row.get("handler_id", "").strip()
-            h = row.get("handler", "").strip()
-            d = row.get("dog", "").strip()
-            if not hid or not h or not d:
-                continue
-            current = handler_by_id.get(hid)
-            if current is None or len(h.split()) < len(current.split()):
-                handler_by_id[hid] = h
-
-            start_no = row.get("start_no", "").strip()
-            if start_no:
-                tid = make_team_id(h, d)
-                existing = identity_by_start_no.get(start_no)
-                if existing and existing["team_id"] != tid:
-                    ambiguous_start_no.add(start_no)
-                else:
-                    identity_by_start_no[start_no] = {"handler": h, "dog": d, "team_id": tid}
-
-        for start_no in ambiguous_start_no:
-            identity_by_start_no.pop(start_no, None)
-
-        for row in rows:
-            is_team_round = row.get("is_team_round", "").strip().lower() == "true"
-            discipline = row.get("discipline", "").strip()
-            if is_team_round and discipline not in TEAM_DISCIPLINES_INCLUDED:
-                skipped_team_rounds += 1
-                continue
-
-            raw_handler = row.get("handler", "").strip()
-            handler = raw_handler
-            dog = row.get("dog", "").strip()
-            handler_id = row.get("handler_id", "").strip()
-            start_no = row.get("start_no", "").strip()
-
-            # Recover handler if source row has broken "handler+dog" blob.
-            mapped_handler = handler_by_id.get(handler_id, "")
-            if mapped_handler and handler != mapped_handler:
-                handler = mapped_handler
-                recovered_handler_from_id += 1
-
-            # Strong recovery path: copy full identity from the same start number
-            # in the same file when available (AWC exports often have this issue).
-            start_identity = identity_by_start_no.get(start_no)
-            if start_identity and (not handler or not dog):
-                if handler != start_identity["handler"] or dog != start_identity["dog"]:
-                    handler = start_identity["handler"]
-                    dog = start_identity["dog"]
-                    recovered_identity_from_start_no += 1
-
-            # If dog is missing, try extracting call name from the handler blob.
-            if not dog and raw_handler:
-                call_name = _extract_call_name_from_handler_blob(raw_handler)
-                if call_name:
-                    # Accept fallback only when handler came from trusted map,
-                    # or when raw handler looks like a plain personal name.
-                    if mapped_handler or len(raw_handler.split()) <= 4:
-                        dog = call_name
-
-            if not handler or not dog:
-                skipped_no_identity += 1
-                continue
-
-            team_id = make_team_id(handler, dog)
-
-                # Parse rank
-            rank_str = row.get("rank", "").strip()
-            try:
-                rank = int(rank_str)
-            except (ValueError, KeyError):
-                rank = None
-
-            eliminated = row.get("eliminated", "") == "True"
-            # Treat DIS/DSQ rank as eliminated even if eliminated flag is False
-            if rank is None and rank_str.upper() in ("DIS", "DSQ", "NFC", "RET", "WD"):
-                eliminated = True
-
-            runs.append({
-                "comp_dir": comp_dir,
-                "comp_name": comp_meta["name"],
-                "comp_date": comp_meta["date"],
-                "comp_tier": comp_meta["tier"],
-                "round_key": row.get("round_key", ""),
-                "size": row.get("size", ""),
-                "team_id": team_id,
-                "handler": handler,
-                "dog": dog,
-                "country": row.get("country", ""),
-                "rank": rank,
-                "eliminated": eliminated,
-            })
-
-    if skipped_no_identity:
-        print(f"Skipped {skipped_no_identity} runs with no parseable team identity")
-    if skipped_team_rounds:
-        print(f"Skipped {skipped_team_rounds} non-individual team-round runs")
-    if recovered_handler_from_id:
-        print(f"Recovered {recovered_handler_from_id} handler names via handler_id map")
-    if recovered_identity_from_start_no:
-        print(f"Recovered {recovered_identity_from_start_no} identities via start_no map")
+        comp = builder.add_competition(comp_dir, COMPETITIONS[comp_dir])
+
+        with open(filepath, "rb") as f:
+            data = f.read()
+
+        chunk = None
+        cache_key = None
+        if cache:
+            cache_key = cache.key(data)
+            chunk = cache.get(filepath, cache_key)
+        entries.append([comp, filepath, cache_key, None if chunk else data.decode("utf-8"), chunk])
+
+    pending = [entry for entry in entries if entry[4] is None]
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            chunks = pool.map(_parse_results_csv_worker, [entry[3] for entry in pending])
+            for entry, chunk in zip(pending, chunks):
+                entry[4] = chunk
+    else:
+        for entry in pending:
+            entry[4] = _parse_results_csv(entry[3], resolver)
+    if cache:
+        for comp, filepath, cache_key, _, chunk in pending:
+            cache.put(filepath, cache_key, chunk)
+
+    for comp, _, _, _, chunk in entries:
+        for name, value in chunk["stats"].items():
+            totals[name] += value
+        builder.add_chunk(comp, chunk)
+
+    if cache:
+        print(cache.summary())
+    if totals["skipped_no_identity"]:
+        print(f"Skipped {totals['skipped_no_identity']} runs with no parseable team identity")
+    if totals["skipped_team_rounds"]:
+        print(f"Skipped {totals['skipped_team_rounds']} non-individual team-round runs")
+    if totals["recovered_handler_from_id"]:
+        print(f"Recovered {totals['recovered_handler_from_id']} handler names via handler_id map")
+    if totals["recovered_identity_from_start_no"]:
+        print(f"Recovered {totals['recovered_identity_from_start_no']} identities via start_no map")
+    runs = builder.build(natural_sort_key)
     print(f"Loaded {len(runs)} individual runs from {len(csv_files)} files")
 
     # --- Fuzzy dog name merging ---
     # For each handler, find dog name variants that should be the same dog.
     # E.g., "day" and "daylight neverending force" for the same handler.
-    runs = _merge_dog_variants(runs)
+    if merge_variants:
+        runs = _merge_dog_variants(runs, resolver)
 
     return runs
 
 
-def _merge_dog_variants(runs):
-    """Merge team_ids where the same handler has multiple dog name variants
-    that refer to the same dog.
+def _parse_results_csv_worker(text):
+    """Process-pool entry point: parse with the worker's shared resolver."""
+    return _parse_results_csv(text, IDENTITY_RESOLVER)
 
-    Uses two strategies:
-    1. Call name prefix: short call name (1-2 words) matches the start of a
-       longer dog name part for the same handler.
-    2. Registered name overlap: collect (handler, registered_name) from all runs.
-       If two team_ids for the same handler share a similar registered name,
-       merge the one without a call name into the one with a call name.
+
+def _parse_results_csv(text, resolver):
+    """Parse and resolve one competition CSV into a run chunk.
+
+    Recovery maps (handler_id, start_no) are file-local, so the result depends
+    only on the file contents and the identity rules.
     """
-    # --- Collect per-handler dog info from runs ---
-    # handler -> set of dog_id parts (from team_id)
-    handler_dogs = defaultdict(set)
-    # (handler, dog_id) -> set of registered names seen
-    handler_dog_regnames = defaultdict(set)
+    rows = list(csv.DictReader(io.StringIO(text, newline="")))
+    chunk = ChunkBuilder()
+    skipped_no_identity = 0
+    skipped_team_rounds = 0
+    recovered_handler_from_id = 0
+    recovered_identity_from_start_no = 0
 
-    for run in runs:
-        h, d = run["team_id"].split("|||", 1)
-        handler_dogs[h].add(d)
-        # Parse the raw dog field to get registered name
-        raw_dog = run.get("dog", "").strip()
-        if raw_dog:
-            _, reg = parse_dog_name(raw_dog)
-            if reg:
-                handler_dog_regnames[(h, d)].add(reg)
+    # File-local recovery map: handler_id -> best known handler text.
+    # We only trust rows that already have a dog in a dedicated dog column.
+    handler_by_id = {}
+    identity_by_start_no = {}
+    ambiguous_start_no = set()
+    for row in rows:
+        hid = row.get("handler_id", "").strip()
+        h = row.get("handler", "").strip()
+        d = row.get("dog", "").strip()
+        if not hid or not h or not d:
+            continue
+        current = handler_by_id.get(hid)
+        if current is None or len(h.split()) < len(current.split()):
+            handler_by_id[hid] = h
+
+        start_no = row.get("start_no", "").strip()
+        if start_no:
+            tid = resolver.make_team_id(h, d)
+            existing = identity_by_start_no.get(start_no)
+            if existing and existing["team_id"] != tid:
+                ambiguous_start_no.add(start_no)
+            else:
+                identity_by_start_no[start_no] = {"handler": h, "dog": d, "team_id": tid}
+
+    for start_no in ambiguous_start_no:
+        identity_by_start_no.pop(start_no, None)
 
-    merge_map = {}
+    for row in rows:
+        is_team_round = row.get("is_team_round", "").strip().lower() == "true"
+        discipline = row.get("discipline", "").strip()
+        if is_team_round and discipline not in TEAM_DISCIPLINES_INCLUDED:
+            skipped_team_rounds += 1
+            continue
 
-    for handler in sorted(handler_dogs.keys()):
-        dogs = sorted(handler_dogs[handler], key=lambda d: (len(d.split()), d))
-        if len(dogs) < 2:
+        raw_handler = row.get("handler", "").strip()
+        handler = raw_handler
+        dog = row.get("dog", "").strip()
+        handler_id = row.get("handler_id", "").strip()
+        start_no = row.get("start_no", "").strip()
+
+        # Recover handler if source row has broken "handler+dog" blob.
+        mapped_handler = handler_by_id.get(handler_id, "")
+        if mapped_handler and handler != mapped_handler:
+            handler = mapped_handler
+            recovered_handler_from_id += 1
+
+        # Strong recovery path: copy full identity from the same start number
+        # in the same file when available (AWC exports often have this issue).
+        start_identity = identity_by_start_no.get(start_no)
+        if start_identity and (not handler or not dog):
+            if handler != start_identity["handler"] or dog != start_identity["dog"]:
+                handler = start_identity["handler"]
+                dog = start_identity["dog"]
+                recovered_identity_from_start_no += 1
+
+        # If dog is missing, try extracting call name from the handler blob.
+        if not dog and raw_handler:
+            call_name = _extract_call_name_from_handler_blob(raw_handler)
+            if call_name:
+                # Accept fallback only when handler came from trusted map,
+                # or when raw handler looks like a plain personal name.
+                if mapped_handler or len(raw_handler.split()) <= 4:
+                    dog = call_name
+
+        if not handler or not dog:
+            skipped_no_identity += 1
             continue
 
-        # Strategy 1: call name prefix match
-        for i, short in enumerate(dogs):
-            short_words = short.split()
-            if len(short_words) > 2 or not short:
-                continue
-            for long in dogs[i + 1:]:
-                long_words = long.split()
-                if len(long_words) <= len(short_words):
-                    continue
-                if long_words[0].startswith(short_words[0]):
-                    long_tid = f"{handler}|||{long}"
-                    short_tid = f"{handler}|||{short}"
-                    if long_tid not in merge_map:
-                        merge_map[long_tid] = short_tid
-
-        # Strategy 2: registered name overlap
-        # For each pair of dog_ids, check if their registered names overlap
-        for i, d1 in enumerate(dogs):
-            for d2 in dogs[i + 1:]:
-                tid1 = f"{handler}|||{d1}"
-                tid2 = f"{handler}|||{d2}"
-                # Skip if already merged
-                if tid1 in merge_map or tid2 in merge_map:
-                    continue
-                regs1 = handler_dog_regnames.get((handler, d1), set())
-                regs2 = handler_dog_regnames.get((handler, d2), set())
-                if not regs1 or not regs2:
-                    continue
-                if _registered_names_match(regs1, regs2):
-                    # Prefer the team_id with the shorter dog part (call name)
-                    if len(d1.split()) <= len(d2.split()):
-                        merge_map[tid2] = tid1
-                    else:
-                        merge_map[tid1] = tid2
-
-        # Strategy 3: call name appears as a word in registered name
-        # e.g., call="crocodile" matches reg="a3ch crocodile yabalute"
-        for i, d1 in enumerate(dogs):
-            w1 = d1.split()
-            if len(w1) != 1 or not d1:
-                continue  # only single-word call names
-            for d2 in dogs:
-                if d1 == d2:
-                    continue
-                tid1 = f"{handler}|||{d1}"
-                tid2 = f"{handler}|||{d2}"
-                if tid1 in merge_map or tid2 in merge_map:
-                    continue
-                # Check if d1 (call name) appears as a word in the registered
-                # names associated with d2
-                regs2 = handler_dog_regnames.get((handler, d2), set())
-                for reg in regs2:
-                    if d1 in reg.split():
-                        merge_map[tid2] = tid1
-                        break
-
-    # Resolve transitive merges: A->B, B->C => A->C
-    for tid in list(merge_map):
-        target = merge_map[tid]
-        while target in merge_map:
-            target = merge_map[target]
-        merge_map[tid] = target
+        team_id = resolver.make_team_id(handler, dog)
+
+        # Parse rank
+        rank_str = row.get("rank", "").strip()
+        try:
+            rank = int(rank_str)
+        except (ValueError, KeyError):
+            rank = None
+
+        eliminated = row.get("eliminated", "") == "True"
+        # Treat DIS/DSQ rank as eliminated even if eliminated flag is False
+        if rank is None and rank_str.upper() in ("DIS", "DSQ", "NFC", "RET", "WD"):
+            eliminated = True
+
+        chunk.append(
+            row.get("round_key", ""),
+            row.get("size", ""),
+            team_id,
+            handler,
+            dog,
+            row.get("country", ""),
+            rank,
+            eliminated,
+        )
+
+    return chunk.build({
+        "skipped_no_identity": skipped_no_identity,
+        "skipped_team_rounds": skipped_team_rounds,
+        "recovered_handler_from_id": recovered_handler_from_id,
+        "recovered_identity_from_start_no": recovered_identity_from_start_no,
+    })
+
+
+def _merge_dog_variants(runs, resolver):
+    """Merge team_ids where the same handler has multiple dog name variants
+    that refer to the same dog.
+
+    Merge rules (call name prefix, registered name overlap, call name inside
+    registered name) live in dog_variants.py.
+    """
+    handler_dogs, handler_dog_regnames = _collect_handler_dogs(runs, resolver)
+    merge_map = dog_variant_merge_map(handler_dogs, handler_dog_regnames)
 
     if merge_map:
-        merged_count = 0
-        for run in runs:
-            if run["team_id"] in merge_map:
-                run["team_id"] = merge_map[run["team_id"]]
-                merged_count += 1
+        merged_count = runs.remap_teams(merge_map)
         print(f"Merged {merged_count} runs across {len(merge_map)} dog name variants")
 
     return runs
 
 
-def _registered_names_match(regs1, regs2):
-    """Check if two sets of registered names likely refer to the same dog.
+def _collect_handler_dogs(runs, resolver):
+    """Per-handler dog ids and the registered names seen for each of them.
 
-    Matches if any pair shares >=3 consecutive words starting from the
-    beginning of at least one name (prefix match). This avoids false
-    positives from shared kennel name suffixes like "from Malibo Land".
+    Returns (handler -> set of dog_id parts,
+             (handler, dog_id) -> set of registered names).
     """
-    for r1 in regs1:
-        w1 = r1.split()
-        for r2 in regs2:
-            w2 = r2.split()
-            # Check prefix overlap: words matching from start of both names
-            prefix_match = 0
-            for a, b in zip(w1, w2):
-                if a == b:
-                    prefix_match += 1
-                else:
-                    break
-            if prefix_match >= 3:
-                return True
-
-            # Also check if one name starts from the beginning of the other
-            # at some offset (e.g., "A3Ch Finrod Frances..." vs "Finrod Frances...")
-            for offset in range(1, min(3, len(w1))):
-                match = 0
-                for a, b in zip(w1[offset:], w2):
-                    if a == b:
-                        match += 1
-                    else:
-                        break
-                if match >= 3:
-                    return True
-            for offset in range(1, min(3, len(w2))):
-                match = 0
-                for a, b in zip(w1, w2[offset:]):
-                    if a == b:
-                        match += 1
-                    else:
-                        break
-                if match >= 3:
-                    return True
-    return False
+    handler_dogs = defaultdict(set)
+    handler_dog_regnames = defaultdict(set)
+
+    # Every distinct (team_id, raw dog string) pair only needs parsing once.
+    pair_keys = np.unique(runs.team.astype(np.int64) * len(runs.dogs) + runs.dog)
+    for team, dog in zip(*np.divmod(pair_keys, len(runs.dogs))):
+        h, d = runs.team_ids[team].split("|||", 1)
+        handler_dogs[h].add(d)
+        # Parse the raw dog field to get registered name
+        raw_dog = runs.dogs[dog].strip()
+        if raw_dog:
+            _, reg = resolver.parse_dog_name(raw_dog)
+            if reg:
+                handler_dog_regnames[(h, d)].add(reg)
+
+    return handler_dogs, handler_dog_regnames
 
 
 # ---------------------------------------------------------------------------
 # Team profile aggregation
 # ---------------------------------------------------------------------------
 
-def build_team_profiles(runs):
+def build_team_profiles(runs, resolver=None):
     """Aggregate best metadata for each team across all runs.
 
     Returns dict: team_id -> {
@@ -712,29 +808,37 @@ def build_team_profiles(runs):
         country: str,
     }
     """
-    # Collect raw data per team_id
+    resolver = resolver or IDENTITY_RESOLVER
+    # Per team_id: distinct raw variants (as pool indices) with run counts,
+    # in first-seen order. Memory grows with distinct variants, not runs.
     raw = defaultdict(lambda: {
-        "handlers": [],       # all raw handler strings
-        "dogs": [],           # all raw dog strings
-        "countries": [],      # all raw country strings
+        "handlers": Counter(),    # raw handler string -> runs
+        "dogs": Counter(),        # raw dog string -> runs
+        "countries": Counter(),   # raw country string -> runs
     })
 
-    for run in runs:
-        tid = run["team_id"]
-        raw[tid]["handlers"].append(run["handler"])
-        raw[tid]["dogs"].append(run["dog"])
-        raw[tid]["countries"].append(run["country"])
+    team_ids = runs.team_ids.values
+    for team, handler, dog, country in zip(
+        runs.team.tolist(), runs.handler.tolist(), runs.dog.tolist(), runs.country.tolist()
+    ):
+        data = raw[team_ids[team]]
+        data["handlers"][handler] += 1
+        data["dogs"][dog] += 1
+        data["countries"][country] += 1
 
     profiles = {}
     for tid, data in raw.items():
-        call_name, registered_name = _best_dog_names(data["dogs"])
+        dog_counts = _variant_counts(data["dogs"], runs.dogs)
+        call_name, registered_name = _best_dog_names(dog_counts, resolver)
         dog_display = _format_dog_display(call_name, registered_name)
         profiles[tid] = {
-            "handler_display": _best_handler_display(data["handlers"]),
+            "handler_display": _best_handler_display(
+                _variant_counts(data["handlers"], runs.handlers), resolver
+            ),
             "call_name": call_name,
             "registered_name": registered_name,
             "dog_display": dog_display,
-            "country": _best_country(data["countries"]),
+            "country": _best_country(_variant_counts(data["countries"], runs.countries)),
         }
 
     # Country backfill: use normalized handler to share country across team_ids
@@ -757,54 +861,59 @@ def build_team_profiles(runs):
     print(f"Team profiles: {len(profiles)} teams, "
           f"backfilled {backfilled} countries, "
           f"{stats_no_country} still missing country")
+    print(resolver.summary())
 
     return profiles
 
 
-def _best_handler_display(handlers):
+def _variant_counts(index_counts, pool):
+    """{pool index: runs} -> {stripped non-empty string: runs}, first-seen order."""
+    counts = Counter()
+    for idx, n in index_counts.items():
+        value = pool[idx].strip()
+        if value:
+            counts[value] += n
+    return counts
+
+
+def _best_handler_display(handlers, resolver):
     """Pick the best handler display name from all variants.
 
+    handlers maps stripped raw handler strings to their run counts, in the
+    order they were first seen.
+
     Priority:
     1. "Last, First" format → convert to "First Last" (reliable first/last split)
     2. Most frequent "First Last" string, preferring version with diacritics
     """
     # Try to find a comma-separated variant — prefer one with diacritics
-    comma_variants = []
-    for h in handlers:
-        h = h.strip()
-        if "," in h and h:
-            comma_variants.append(h)
+    # (non-ASCII chars = more original); ties go to the first one seen.
+    comma_variants = [h for h in handlers if "," in h]
 
     if comma_variants:
-        # Prefer variant with diacritics (non-ASCII chars = more original)
-        comma_variants.sort(key=lambda h: sum(1 for c in h if ord(c) > 127), reverse=True)
-        parts = comma_variants[0].split(",", 1)
+        parts = max(comma_variants, key=_diacritics_score).split(",", 1)
         last = parts[0].strip()
         first = parts[1].strip()
         chosen = f"{first} {last}"
-        return HANDLER_DISPLAY_OVERRIDES.get(normalize_handler(chosen), chosen)
+        return HANDLER_DISPLAY_OVERRIDES.get(resolver.normalize_handler(chosen), chosen)
 
     # No comma variant — pick the most common non-empty name
-    counts = defaultdict(int)
-    for h in handlers:
-        h = h.strip()
-        if h:
-            counts[h] += 1
-
-    if not counts:
+    if not handlers:
         return ""
 
     # Among top candidates, prefer the one with diacritics
-    max_count = max(counts.values())
-    top_candidates = [h for h, c in counts.items() if c == max_count]
-    top_candidates.sort(key=lambda h: sum(1 for c in h if ord(c) > 127), reverse=True)
-    chosen = top_candidates[0]
-    return HANDLER_DISPLAY_OVERRIDES.get(normalize_handler(chosen), chosen)
+    max_count = max(handlers.values())
+    top_candidates = [h for h, c in handlers.items() if c == max_count]
+    chosen = max(top_candidates, key=_diacritics_score)
+    return HANDLER_DISPLAY_OVERRIDES.get(resolver.normalize_handler(chosen), chosen)
 
 
-def _best_dog_names(dogs):
+def _best_dog_names(dogs, resolver):
     """Extract the best call name and registered name from all dog string variants.
 
+    dogs maps stripped raw dog strings to their run counts, in the order they
+    were first seen.
+
     Returns (call_name, registered_name) — both in original case (best available).
     """
     call_names = defaultdict(int)   # normalized -> count
@@ -812,20 +921,17 @@ def _best_dog_names(dogs):
     call_display = {}               # normalized -> best display form
     reg_display = {}                # normalized -> best display form
 
-    for raw in dogs:
-        raw = raw.strip()
-        if not raw:
-            continue
-        call, reg = parse_dog_name(raw)
+    for raw, count in dogs.items():
+        call, reg = resolver.parse_dog_name(raw)
         if call:
-            call_names[call] += 1
+            call_names[call] += count
             # Keep the display form with most diacritics
             existing = call_display.get(call, "")
             raw_call = _extract_raw_call_name(raw)
             if raw_call and (not existing or _diacritics_score(raw_call) > _diacritics_score(existing)):
                 call_display[call] = raw_call
         if reg:
-            reg_names[reg] += 1
+            reg_names[reg] += count
             raw_reg = _extract_raw_registered_name(raw)
             if raw_reg:
                 existing = reg_display.get(reg, "")
@@ -854,14 +960,14 @@ def _best_dog_names(dogs):
 
 def _extract_raw_call_name(dog_str):
     """Extract call name in original case from a dog string."""
-    match = re.search(r"\(([^)]+)\)\s*$", dog_str)
+    match = _PAREN_SUFFIX_RE.search(dog_str)
     if match:
         candidate = match.group(1).strip()
         if candidate.lower() not in NON_CALL_SUFFIXES:
             return candidate
         # Technical suffix — fall through to parse the base string
         dog_str = dog_str[:match.start()].strip()
-    match = re.search(r'"([^"]+)"\s*$', dog_str)
+    match = _QUOTE_SUFFIX_RE.search(dog_str)
     if match:
         candidate = match.group(1).strip()
         if candidate.lower() not in NON_CALL_SUFFIXES:
@@ -876,13 +982,14 @@ def _extract_raw_call_name(dog_str):
 def _extract_raw_registered_name(dog_str):
     """Extract registered name in original case from a dog string."""
     # Strip call name suffix
-    reg = re.sub(r'\s*\([^)]+\)\s*$', '', dog_str).strip()
-    reg = re.sub(r'\s*"[^"]+"\s*$', '', reg).strip()
+    reg = _PAREN_SUFFIX_STRIP_RE.sub("", dog_str).strip()
+    reg = _QUOTE_SUFFIX_STRIP_RE.sub("", reg).strip()
     if len(reg.split()) > 2:
         return reg
     return ""
 
 
+@functools.lru_cache(maxsize=IDENTITY_CACHE_SIZE)
 def _diacritics_score(s):
     """Count non-ASCII characters — prefer strings with original diacritics."""
     return sum(1 for c in s if ord(c) > 127)
@@ -900,141 +1007,68 @@ def _format_dog_display(call_name, registered_name):
 
 
 def _best_country(countries):
-    """Pick the most common non-empty country."""
-    counts = defaultdict(int)
-    for c in countries:
-        c = c.strip()
-        if c:
-            counts[c] += 1
-    if not counts:
+    """Pick the most common non-empty country (countries: stripped string -> runs)."""
+    if not countries:
         return ""
-    return max(counts, key=counts.get)
+    return max(countries, key=countries.get)
 
 
 # ---------------------------------------------------------------------------
 # Rating calculation
 # ---------------------------------------------------------------------------
 
-def calculate_ratings(runs, profiles):
+class BaselineStrategy(RatingStrategy):
+    """Every entry rated; optional tier weights; SIGMA_DECAY towards SIGMA_MIN."""
+
+    def __init__(self, sigma_decay=None, sigma_min=None):
+        # Module constants are read here, not bound as defaults, so a
+        # parameter sweep can change them between strategies.
+        super().__init__(
+            sigma_decay=SIGMA_DECAY if sigma_decay is None else sigma_decay,
+            sigma_min=SIGMA_MIN if sigma_min is None else sigma_min,
+        )
+
+    def config(self):
+        config = super().config()
+        config.update(tier_weighting=ENABLE_TIER_WEIGHTING, tier_weights=sorted(TIER_WEIGHTS.items()))
+        return config
+
+    def tier_weight(self, state, comp):
+        return TIER_WEIGHTS.get(state.comps.tiers[comp], 1.0)
+
+    def weights(self, state, comp, rnd, entries):
+        # Optional tier weighting via OpenSkill's native "weights" parameter.
+        tier_weight = self.tier_weight(state, comp)
+        if ENABLE_TIER_WEIGHTING and tier_weight != 1.0:
+            return [[tier_weight] for _ in entries]
+        return None
+
+
+def calculate_ratings(runs, profiles, pipeline=None, states=None):
     """
     Calculate OpenSkill ratings per size category.
 
+    pipeline: RatingPipeline over runs to reuse prepared rounds (optional).
+    states: {size: SizeState} already rated with BaselineStrategy, e.g. by
+    RatingPipeline.rate_sizes() together with other variants (optional).
+
     Returns dict: size -> {team_id: {mu, sigma, handler, dog, country, num_runs, last_comp}}
     """
-    # Group runs by size
-    by_size = defaultdict(list)
-    for run in runs:
-        by_size[run["size"]].append(run)
-
+    if pipeline is None:
+        pipeline = RatingPipeline(runs, MIN_FIELD_SIZE)
+    if states is None:
+        states = pipeline.rate(BaselineStrategy())
     all_ratings = {}
 
-    for size in sorted(by_size.keys()):
-        size_runs = by_size[size]
-        print(f"\n--- {size} ({len(size_runs)} runs) ---")
-
-        model = PlackettLuce()
-
-        # team_id -> PlackettLuceRating
-        team_ratings = {}
-        # team_id -> {num_runs, last_comp, last_comp_date}
-        team_stats = {}
-
-        # Group by competition (chronological)
-        comp_runs = defaultdict(list)
-        for run in size_runs:
-            comp_runs[run["comp_dir"]].append(run)
-
-        # Sort competitions chronologically
-        sorted_comps = sorted(comp_runs.keys(), key=lambda c: COMPETITIONS[c]["date"])
-
-        for comp_dir in sorted_comps:
-            comp_name = COMPETITIONS[comp_dir]["name"]
-
-            # Group by round
-            round_runs = defaultdict(list)
-            for run in comp_runs[comp_dir]:
-                round_runs[run["round_key"]].append(run)
-
-            for round_key in sorted(round_runs.keys(), key=natural_sort_key):
-                entries = round_runs[round_key]
-
-                # Deduplicate by team_id (keep first occurrence)
-                seen = set()
-                unique_entries = []
-                for e in entries:
-                    if e["team_id"] not in seen:
-                        seen.add(e["team_id"])
-                        unique_entries.append(e)
-                entries = unique_entries
-
-                if len(entries) < MIN_FIELD_SIZE:
-                    continue
-
-                # Build ranked list
-                # Non-eliminated: use their rank
-                # Eliminated: shared last place
-                clean = [e for e in entries if not e["eliminated"] and e["rank"] is not None]
-                elim = [e for e in entries if e["eliminated"]]
-
-                # Sort clean by rank
-                clean.sort(key=lambda e: e["rank"])
-
-                # Assign OpenSkill ranks (1-indexed)
-                ranked_entries = []
-                for i, entry in enumerate(clean):
-                    ranked_entries.append((entry, i + 1))
-
-                # Eliminated share last rank
-                last_rank = len(clean) + 1
-                for entry in elim:
-                    ranked_entries.append((entry, last_rank))
-
-                if len(ranked_entries) < MIN_FIELD_SIZE:
-                    continue
-
-                # Prepare teams and ranks for openskill
-                teams = []
-                ranks = []
-                entry_order = []
-
-                for entry, rank in ranked_entries:
-                    tid = entry["team_id"]
-                    if tid not in team_ratings:
-                        team_ratings[tid] = model.rating()
-                        team_stats[tid] = {
-                            "num_runs": 0,
-                            "last_comp": "",
-                            "last_comp_date": "",
-                        }
-                    teams.append([team_ratings[tid]])
-                    ranks.append(rank)
-                    entry_order.append(tid)
-
-                    # Update stats
-                    team_stats[tid]["num_runs"] += 1
-                    if entry["comp_date"] >= team_stats[tid]["last_comp_date"]:
-                        team_stats[tid]["last_comp"] = comp_name
-                        team_stats[tid]["last_comp_date"] = entry["comp_date"]
-
-                # Optional tier weighting via OpenSkill's native "weights" parameter.
-                tier = entries[0]["comp_tier"]
-                tier_weight = TIER_WEIGHTS.get(tier, 1.0)
-                weights = None
-                if ENABLE_TIER_WEIGHTING and tier_weight != 1.0:
-                    weights = [[tier_weight] for _ in entry_order]
-
-                result = model.rate(teams, ranks=ranks, weights=weights)
-
-                # Apply sigma decay
-                for i, tid in enumerate(entry_order):
-                    new_rating = result[i][0]
-
-                    # Force sigma convergence
-                    new_rating.sigma = max(SIGMA_MIN, new_rating.sigma * SIGMA_DECAY)
-                    team_ratings[tid] = new_rating
-
-            # end round loop
-        # end competition loop
+    for size in pipeline.size_labels():
+        print(f"\n--- {size} ({pipeline.num_runs(size)} runs) ---")
+
+        # Competitions in chronological order, rounds in natural key order
+        # Rounds come deduplicated by team_id (first occurrence kept) and
+        # ranked: non-eliminated by placement, eliminated sharing last place.
+        state = states[size]
+        team_ratings = state.ratings
+        team_stats = state.stats
 
         # Build final results for this size, using profiles for display metadata
         size_results = {}
@@ -1054,22 +1088,12 @@ def calculate_ratings(runs, profiles):
                 "last_comp": stats["last_comp"],
             }
 
-        # Sort by displayed rating descending
-        sorted_teams = sorted(size_results.items(), key=lambda x: -x[1]["displayed_rating"])
-        print(f"  {len(sorted_teams)} unique teams rated")
-        if sorted_teams:
-            top = sorted_teams[0][1]
-            print(f"  Top: {top['handler']} / {top['dog']} ({top['country']}) — {top['displayed_rating']}")
+        print_size_summary(Leaderboard(size_results, "displayed_rating"))
 
         all_ratings[size] = size_results
 
     # Add per-size percentile skill tiers + provisional badge flag.
-    tier_thresholds = compute_tier_thresholds(all_ratings)
-    for size in sorted(all_ratings.keys()):
-        thresholds = tier_thresholds[size]
-        for team in all_ratings[size].values():
-            team["skill_tier"] = skill_tier_label(team["displayed_rating"], thresholds)
-            team["provisional"] = is_provisional(team["sigma"])
+    assign_skill_tiers(all_ratings)
 
     return all_ratings
 
@@ -1078,7 +1102,7 @@ def calculate_ratings(runs, profiles):
 # Output: CSV
 # ---------------------------------------------------------------------------
 
-def write_csv(all_ratings):
+def write_csv(boards):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(OUTPUT_DIR, "ratings.csv")
 
@@ -1088,14 +1112,11 @@ def write_csv(all_ratings):
             "rank", "handler", "call_name", "registered_name", "size", "country",
             "mu", "sigma", "displayed_rating",
             "tier", "provisional", "num_runs", "last_competition",
+            "rank_low", "rank_high", "p_elite",
         ])
 
-        for size in sorted(all_ratings.keys()):
-            sorted_teams = sorted(
-                (t for t in all_ratings[size].values() if t["num_runs"] >= MIN_RUNS_FOR_RANKING),
-                key=lambda x: -x["displayed_rating"],
-            )
-            for i, team in enumerate(sorted_teams, 1):
+        for size in sorted(boards.keys()):
+            for i, team in boards[size]:
                 writer.writerow([
                     i,
                     team["handler"],
@@ -1110,6 +1131,9 @@ def write_csv(all_ratings):
                     str(team.get("provisional", False)).lower(),
                     team["num_runs"],
                     team["last_comp"],
+                    team["rank_low"],
+                    team["rank_high"],
+                    round(team["p_elite"], 3),
                 ])
 
     print(f"\nCSV written to {outpath}")
@@ -1119,23 +1143,19 @@ def write_csv(all_ratings):
 # Output: HTML
 # ---------------------------------------------------------------------------
 
-def write_html(all_ratings):
+def write_html(boards):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(OUTPUT_DIR, "ratings.html")
 
-    sizes = ordered_sizes(all_ratings.keys())
+    sizes = ordered_sizes(boards.keys())
 
     # Build table rows per size
     tables = {}
     countries_by_size = {}
     for size in sizes:
-        sorted_teams = sorted(
-            (t for t in all_ratings[size].values() if t["num_runs"] >= MIN_RUNS_FOR_RANKING),
-            key=lambda x: -x["displayed_rating"],
-        )
-        countries_by_size[size] = sorted({t["country"] for t in sorted_teams if t["country"]})
+        countries_by_size[size] = boards[size].countries()
         rows = []
-        for i, team in enumerate(sorted_teams, 1):
+        for i, team in boards[size]:
             rating = team["displayed_rating"]
             tl = team.get("skill_tier", "Competitor")
             provisional_badge = ""
@@ -1160,6 +1180,8 @@ def write_html(all_ratings):
                 f"<td>{dog_cell}</td>"
                 f"<td>{_esc(team['country'])}</td>"
                 f"<td class='num'>{rating:.0f}</td>"
+                f"<td class='num'>{format_rank_interval(team)}</td>"
+                f"<td class='num'>{team['p_elite'] * 100:.0f}%</td>"
                 f"<td class='num'>{team['num_runs']}</td>"
                 f"<td>{_esc(team['last_comp'])}</td>"
                 f"</tr>"
@@ -1169,7 +1191,7 @@ def write_html(all_ratings):
     # Tab buttons
     tab_buttons = []
     for i, size in enumerate(sizes):
-        count = sum(1 for t in all_ratings[size].values() if t["num_runs"] >= MIN_RUNS_FOR_RANKING)
+        count = len(boards[size])
         active = " active" if i == 0 else ""
         tab_buttons.append(
             f'<button class="tab-btn{active}" onclick="showTab(\'{size}\')">'
@@ -1190,8 +1212,10 @@ def write_html(all_ratings):
                         <th onclick="sortTable('table-{size}', 2, 'str')">Dog</th>
                         <th onclick="sortTable('table-{size}', 3, 'str')">Country</th>
                         <th onclick="sortTable('table-{size}', 4, 'num')">Rating</th>
-                        <th onclick="sortTable('table-{size}', 5, 'num')">Runs</th>
-                        <th onclick="sortTable('table-{size}', 6, 'str')">Last Competition</th>
+                        <th onclick="sortTable('table-{size}', 5, 'num')" title="90% rank interval">Rank range</th>
+                        <th onclick="sortTable('table-{size}', 6, 'num')">P(Elite)</th>
+                        <th onclick="sortTable('table-{size}', 7, 'num')">Runs</th>
+                        <th onclick="sortTable('table-{size}', 8, 'str')">Last Competition</th>
                     </tr>
                 </thead>
                 <tbody>
@@ -1246,6 +1270,7 @@ h1 {{ margin-bottom: 4px; }}
     <div class="legend-item"><div class="legend-color" style="background:#3b82f6"></div> Expert (next 20%)</div>
     <div class="legend-item"><div class="legend-color" style="background:#10b981"></div> Competitor (remaining)</div>
     <div class="legend-item"><span class="prov-badge">PROV</span> Provisional (sigma ≥ {PROVISIONAL_SIGMA_THRESHOLD})</div>
+    <div class="legend-item">Rank range / P(Elite): 90% interval and Elite probability over {rank_intervals.RANK_SAMPLES} rating draws</div>
 </div>
 
 <div class="filters">
@@ -1361,14 +1386,29 @@ def _esc(s):
 # Main
 # ---------------------------------------------------------------------------
 
-if __name__ == "__main__":
-    runs = load_all_runs()
-    profiles = build_team_profiles(runs)
-    all_ratings = calculate_ratings(runs, profiles)
+def build(runs, profiles, pipeline, states=None):
+    """Rate loaded runs and write ratings.csv / ratings.html."""
+    all_ratings = calculate_ratings(runs, profiles, pipeline=pipeline, states=states)
 
     total_teams = sum(len(r) for r in all_ratings.values())
     print(f"\nTotal unique teams across all sizes: {total_teams}")
 
-    write_csv(all_ratings)
-    write_html(all_ratings)
+    boards = leaderboards(all_ratings, "displayed_rating", MIN_RUNS_FOR_RANKING)
+    attach_rank_intervals(boards, pipeline.workers)
+    write_csv(boards)
+    write_html(boards)
     print("\nDone!")
+
+
+def main():
+    args = build_arg_parser("Baseline OpenSkill rating (ratings.csv / ratings.html).").parse_args()
+    runs = load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    profiles = build_team_profiles(runs)
+    pipeline = pipeline_from_args(runs, args)
+    build(runs, profiles, pipeline)
+    if pipeline.checkpoints is not None:
+        print(pipeline.checkpoints.summary())
+
+
+if __name__ == "__main__":
+    main()
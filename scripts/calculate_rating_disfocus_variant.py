@@ -16,11 +16,10 @@ Outputs:
 
 import csv
 import os
-from collections import defaultdict
-
-from openskill.models import PlackettLuce
 
 import calculate_rating as base
+from leaderboard import Leaderboard, leaderboards
+from rating_pipeline import RatingPipeline
 
 
 # ---------------------------------------------------------------------------
@@ -42,109 +41,48 @@ def _elim_weight(elim_count, field_size):
     return max(ELIM_WEIGHT_MIN, weight)
 
 
-def calculate_ratings_disfocus(runs, profiles):
+class DisfocusStrategy(base.BaselineStrategy):
+    """Baseline updates with eliminated entries down-weighted."""
+
+    def config(self):
+        config = super().config()
+        config.update(elim_weight_base=ELIM_WEIGHT_BASE, elim_weight_min=ELIM_WEIGHT_MIN)
+        return config
+
+    def weights(self, state, comp, rnd, entries):
+        elim_weight = _elim_weight(rnd.num_eliminated, rnd.field_size)
+        # Keep tier weighting behavior compatible with baseline.
+        tier_weight = self.tier_weight(state, comp) if base.ENABLE_TIER_WEIGHTING else 1.0
+        weights = []
+        for _, _, eliminated in entries:
+            entry_weight = tier_weight
+            if eliminated:
+                entry_weight *= elim_weight
+            weights.append([entry_weight])
+        return weights
+
+
+def calculate_ratings_disfocus(runs, profiles, pipeline=None, states=None):
     """
     Calculate OpenSkill ratings per size category for the dis-focus variant.
 
+    states: {size: SizeState} already rated with DisfocusStrategy (optional).
+
     Returns:
       dict: size -> {team_id -> rating payload}
     """
-    by_size = defaultdict(list)
-    for run in runs:
-        by_size[run["size"]].append(run)
-
+    if pipeline is None:
+        pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE)
+    if states is None:
+        states = pipeline.rate(DisfocusStrategy())
     all_ratings = {}
 
-    for size in sorted(by_size.keys()):
-        size_runs = by_size[size]
-        print(f"\n--- {size} ({len(size_runs)} runs) ---")
-
-        model = PlackettLuce()
-        team_ratings = {}
-        team_stats = {}
-
-        comp_runs = defaultdict(list)
-        for run in size_runs:
-            comp_runs[run["comp_dir"]].append(run)
-
-        sorted_comps = sorted(comp_runs.keys(), key=lambda c: base.COMPETITIONS[c]["date"])
-
-        for comp_dir in sorted_comps:
-            comp_name = base.COMPETITIONS[comp_dir]["name"]
-
-            round_runs = defaultdict(list)
-            for run in comp_runs[comp_dir]:
-                round_runs[run["round_key"]].append(run)
-
-            for round_key in sorted(round_runs.keys(), key=base.natural_sort_key):
-                entries = round_runs[round_key]
-
-                seen = set()
-                unique_entries = []
-                for entry in entries:
-                    if entry["team_id"] not in seen:
-                        seen.add(entry["team_id"])
-                        unique_entries.append(entry)
-                entries = unique_entries
-
-                if len(entries) < base.MIN_FIELD_SIZE:
-                    continue
-
-                clean = [e for e in entries if not e["eliminated"] and e["rank"] is not None]
-                elim = [e for e in entries if e["eliminated"]]
-                clean.sort(key=lambda e: e["rank"])
-
-                ranked_entries = []
-                for idx, entry in enumerate(clean):
-                    ranked_entries.append((entry, idx + 1))
-
-                last_rank = len(clean) + 1
-                for entry in elim:
-                    ranked_entries.append((entry, last_rank))
-
-                if len(ranked_entries) < base.MIN_FIELD_SIZE:
-                    continue
-
-                elim_weight = _elim_weight(len(elim), len(entries))
-                tier = entries[0]["comp_tier"]
-                tier_weight = base.TIER_WEIGHTS.get(tier, 1.0)
-
-                teams = []
-                ranks = []
-                weights = []
-                entry_order = []
-
-                for entry, rank in ranked_entries:
-                    team_id = entry["team_id"]
-                    if team_id not in team_ratings:
-                        team_ratings[team_id] = model.rating()
-                        team_stats[team_id] = {
-                            "num_runs": 0,
-                            "last_comp": "",
-                            "last_comp_date": "",
-                        }
-
-                    teams.append([team_ratings[team_id]])
-                    ranks.append(rank)
-                    entry_order.append(team_id)
-
-                    # Keep tier weighting behavior compatible with baseline.
-                    entry_weight = tier_weight if base.ENABLE_TIER_WEIGHTING else 1.0
-                    if entry["eliminated"]:
-                        entry_weight *= elim_weight
-                    weights.append([entry_weight])
-
-                    team_stats[team_id]["num_runs"] += 1
-                    if entry["comp_date"] >= team_stats[team_id]["last_comp_date"]:
-                        team_stats[team_id]["last_comp"] = comp_name
-                        team_stats[team_id]["last_comp_date"] = entry["comp_date"]
-
-                result = model.rate(teams, ranks=ranks, weights=weights)
-
-                for idx, team_id in enumerate(entry_order):
-                    new_rating = result[idx][0]
-                    new_rating.sigma = max(base.SIGMA_MIN, new_rating.sigma * base.SIGMA_DECAY)
-                    team_ratings[team_id] = new_rating
+    for size in pipeline.size_labels():
+        print(f"\n--- {size} ({pipeline.num_runs(size)} runs) ---")
+
+        state = states[size]
+        team_ratings = state.ratings
+        team_stats = state.stats
 
         size_results = {}
         for team_id, rating in team_ratings.items():
@@ -163,25 +101,16 @@ def calculate_ratings_disfocus(runs, profiles):
                 "last_comp": stats["last_comp"],
             }
 
-        sorted_teams = sorted(size_results.items(), key=lambda x: -x[1]["displayed_rating"])
-        print(f"  {len(sorted_teams)} unique teams rated")
-        if sorted_teams:
-            top = sorted_teams[0][1]
-            print(f"  Top: {top['handler']} / {top['dog']} ({top['country']}) — {top['displayed_rating']}")
+        base.print_size_summary(Leaderboard(size_results, "displayed_rating"))
 
         all_ratings[size] = size_results
 
-    tier_thresholds = base.compute_tier_thresholds(all_ratings)
-    for size in sorted(all_ratings.keys()):
-        thresholds = tier_thresholds[size]
-        for team in all_ratings[size].values():
-            team["skill_tier"] = base.skill_tier_label(team["displayed_rating"], thresholds)
-            team["provisional"] = base.is_provisional(team["sigma"])
+    base.assign_skill_tiers(all_ratings)
 
     return all_ratings
 
 
-def write_csv_disfocus(all_ratings):
+def write_csv_disfocus(boards):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, "ratings_disfocus.csv")
 
@@ -193,12 +122,8 @@ def write_csv_disfocus(all_ratings):
             "tier", "provisional", "num_runs", "last_competition",
         ])
 
-        for size in sorted(all_ratings.keys()):
-            sorted_teams = sorted(
-                (team for team in all_ratings[size].values() if team["num_runs"] >= base.MIN_RUNS_FOR_RANKING),
-                key=lambda x: -x["displayed_rating"],
-            )
-            for rank, team in enumerate(sorted_teams, 1):
+        for size in sorted(boards.keys()):
+            for rank, team in boards[size]:
                 writer.writerow([
                     rank,
                     team["handler"],
@@ -218,22 +143,18 @@ def write_csv_disfocus(all_ratings):
     print(f"\nCSV written to {outpath}")
 
 
-def write_html_disfocus(all_ratings):
+def write_html_disfocus(boards):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, "ratings_disfocus.html")
 
-    sizes = base.ordered_sizes(all_ratings.keys())
+    sizes = base.ordered_sizes(boards.keys())
 
     tables = {}
     countries_by_size = {}
     for size in sizes:
-        sorted_teams = sorted(
-            (t for t in all_ratings[size].values() if t["num_runs"] >= base.MIN_RUNS_FOR_RANKING),
-            key=lambda x: -x["displayed_rating"],
-        )
-        countries_by_size[size] = sorted({t["country"] for t in sorted_teams if t["country"]})
+        countries_by_size[size] = boards[size].countries()
         rows = []
-        for rank, team in enumerate(sorted_teams, 1):
+        for rank, team in boards[size]:
             rating = team["displayed_rating"]
             tier_label = team.get("skill_tier", "Competitor")
             provisional_badge = ""
@@ -267,7 +188,7 @@ def write_html_disfocus(all_ratings):
 
     tab_buttons = []
     for idx, size in enumerate(sizes):
-        count = sum(1 for t in all_ratings[size].values() if t["num_runs"] >= base.MIN_RUNS_FOR_RANKING)
+        count = len(boards[size])
         active = " active" if idx == 0 else ""
         tab_buttons.append(
             f'<button class="tab-btn{active}" onclick="showTab(\'{size}\')">'
@@ -449,17 +370,34 @@ updateCountryFilterOptions();
     print(f"HTML written to {outpath}")
 
 
-if __name__ == "__main__":
+def print_config():
     print("Running dis-focus variant (down-weighted ELIM influence).")
     print(f"ELIM_WEIGHT_BASE={ELIM_WEIGHT_BASE}, ELIM_WEIGHT_MIN={ELIM_WEIGHT_MIN}")
 
-    runs = base.load_all_runs()
-    profiles = base.build_team_profiles(runs)
-    all_ratings = calculate_ratings_disfocus(runs, profiles)
+
+def build(runs, profiles, pipeline, states=None):
+    """Rate loaded runs and write ratings_disfocus.csv / .html."""
+    all_ratings = calculate_ratings_disfocus(runs, profiles, pipeline=pipeline, states=states)
 
     total_teams = sum(len(size_map) for size_map in all_ratings.values())
     print(f"\nTotal unique teams across all sizes: {total_teams}")
 
-    write_csv_disfocus(all_ratings)
-    write_html_disfocus(all_ratings)
+    boards = leaderboards(all_ratings, "displayed_rating", base.MIN_RUNS_FOR_RANKING)
+    write_csv_disfocus(boards)
+    write_html_disfocus(boards)
     print("\nDone!")
+
+
+def main():
+    args = base.build_arg_parser("Dis-focus variant (down-weighted ELIM influence).").parse_args()
+    print_config()
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    profiles = base.build_team_profiles(runs)
+    pipeline = base.pipeline_from_args(runs, args)
+    build(runs, profiles, pipeline)
+    if pipeline.checkpoints is not None:
+        print(pipeline.checkpoints.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,16 @@ Outputs:
 
 import csv
 import os
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from openskill.models import PlackettLuce
+import numpy as np
 
 import calculate_rating as base
+import rank_intervals
+import rating_postprocess
+from leaderboard import Leaderboard, leaderboards
+from live_window_planner import LiveWindowPlanner
+from rating_pipeline import RatingPipeline, RatingStrategy
 
 
 # ---------------------------------------------------------------------------
@@ -56,267 +60,232 @@ PODIUM_BOOST_RANGE = 0.20
 PODIUM_BOOST_TARGET = 50.0
 
 
-def _parse_date(date_str):
-    return datetime.strptime(date_str, "%Y-%m-%d").date()
+def live_rating(mu, sigma):
+    return DISPLAY_BASE + DISPLAY_SCALE * (mu - RATING_SIGMA_MULTIPLIER * sigma)
 
 
-def _percentile_threshold(values, percentile):
-    if not values:
-        return float("inf")
-    sorted_values = sorted(values)
-    idx = int((len(sorted_values) - 1) * percentile)
-    return sorted_values[idx]
+def podium_boost_factors(top3_pct):
+    """Quality factor per team from its top-3 percentage array."""
+    return rating_postprocess.podium_boost_factors(
+        top3_pct, PODIUM_BOOST_BASE, PODIUM_BOOST_RANGE, PODIUM_BOOST_TARGET,
+    )
 
 
-def live_rating(mu, sigma):
-    return DISPLAY_BASE + DISPLAY_SCALE * (mu - RATING_SIGMA_MULTIPLIER * sigma)
+class LiveFinalStrategy(RatingStrategy):
+    """Live-window updates with major-event weights, podium stats and comp stats."""
+
+    def __init__(self):
+        super().__init__(sigma_decay=LIVE_SIGMA_DECAY, sigma_min=base.SIGMA_MIN)
+        # Per-competition stats: comp_dir -> {name, date, tier, teams_by_size, runs_total, finished_runs, total_entries}
+        self.comp_stats = {}
+        self._comp_teams = set()
+
+    def config(self):
+        config = super().config()
+        config.update(major_event_weighting=ENABLE_MAJOR_EVENT_WEIGHTING, major_event_weight=MAJOR_EVENT_WEIGHT)
+        return config
+
+    def new_team_stats(self):
+        return {
+            "num_runs": 0,
+            "finished_runs": 0,
+            "top3_runs": 0,
+            "top10_runs": 0,
+            "last_comp": "",
+            "last_comp_date": "",
+            "prev_mu": None,
+            "prev_sigma": None,
+        }
 
+    def record_entry(self, state, stats, entry, comp):
+        _, rank, eliminated = entry
+        comp_date = state.comps.dates[comp]
+        stats["num_runs"] += 1
+        if not eliminated:
+            stats["finished_runs"] += 1
+            if rank <= 3:
+                stats["top3_runs"] += 1
+            if rank <= 10:
+                stats["top10_runs"] += 1
+        if comp_date >= stats["last_comp_date"]:
+            stats["last_comp"] = state.comps.names[comp]
+            stats["last_comp_date"] = comp_date
+
+    def start_competition(self, state, comp, rounds):
+        comp_dir = state.comps.dirs[comp]
+        if comp_dir not in self.comp_stats:
+            self.comp_stats[comp_dir] = {
+                "name": state.comps.names[comp],
+                "date": state.comps.dates[comp],
+                "tier": state.comps.tiers[comp],
+                "teams_by_size": {},
+                "team_ids_by_size": {},
+                "runs_total": 0,
+                "finished_runs_total": 0,
+                "total_entries": 0,
+            }
+        self._comp_teams = set()
+
+    def before_rate(self, state, comp, rnd, entries):
+        # Track competition stats
+        comp_stats = self.comp_stats[state.comps.dirs[comp]]
+        comp_stats["runs_total"] += 1
+        comp_stats["total_entries"] += len(rnd.entries)
+        comp_stats["finished_runs_total"] += rnd.num_clean
+        for team_id, _, _ in rnd.entries:
+            self._comp_teams.add(team_id)
+
+        # Snapshot current ratings before update (for trend arrows)
+        for team_id, _, _ in entries:
+            stats = state.stats[team_id]
+            stats["prev_mu"] = state.ratings[team_id].mu
+            stats["prev_sigma"] = state.ratings[team_id].sigma
+
+    def weights(self, state, comp, rnd, entries):
+        tier = state.comps.tiers[comp]
+        tier_weight = MAJOR_EVENT_WEIGHT if (ENABLE_MAJOR_EVENT_WEIGHTING and tier == 1) else 1.0
+        if tier_weight != 1.0:
+            return [[tier_weight] for _ in entries]
+        return None
+
+    def end_competition(self, state, comp, rounds):
+        # Save unique teams for this size in this competition
+        if self._comp_teams:
+            comp_stats = self.comp_stats[state.comps.dirs[comp]]
+            comp_stats["teams_by_size"][state.size] = len(self._comp_teams)
+            comp_stats["team_ids_by_size"][state.size] = self._comp_teams
+
+    def split(self):
+        return LiveFinalStrategy()
+
+    def join(self, size, other):
+        # Sizes are joined in rating order, so new competitions and per-size
+        # entries land in the same dict order as in a serial run.
+        for comp_dir, other_stats in other.comp_stats.items():
+            comp_stats = self.comp_stats.get(comp_dir)
+            if comp_stats is None:
+                self.comp_stats[comp_dir] = other_stats
+                continue
+            comp_stats["teams_by_size"].update(other_stats["teams_by_size"])
+            comp_stats["team_ids_by_size"].update(other_stats["team_ids_by_size"])
+            for key in ("runs_total", "finished_runs_total", "total_entries"):
+                comp_stats[key] += other_stats[key]
+
+
+def live_size_results(state, profiles):
+    """Live payloads {team_id: {...}} of one rated size (podium boost applied)."""
+    size_results = {}
+    for team_id, rating in state.ratings.items():
+        stats = state.stats[team_id]
+        profile = profiles.get(team_id, {})
+        num_runs = stats["num_runs"]
+        size_results[team_id] = {
+            "mu": rating.mu,
+            "sigma": rating.sigma,
+            "rating": None,
+            "rating_base": live_rating(rating.mu, rating.sigma),
+            "quality_factor": 1.0,
+            "handler": profile.get("handler_display", ""),
+            "dog": profile.get("dog_display", ""),
+            "call_name": profile.get("call_name", ""),
+            "registered_name": profile.get("registered_name", ""),
+            "country": profile.get("country", ""),
+            "num_runs": num_runs,
+            "finished_runs": stats["finished_runs"],
+            "top3_runs": stats["top3_runs"],
+            "top10_runs": stats["top10_runs"],
+            "finished_pct": round((stats["finished_runs"] / num_runs) * 100.0, 1) if num_runs else 0.0,
+            "top3_pct": round((stats["top3_runs"] / num_runs) * 100.0, 1) if num_runs else 0.0,
+            "top10_pct": round((stats["top10_runs"] / num_runs) * 100.0, 1) if num_runs else 0.0,
+            "last_comp": stats["last_comp"],
+            "prev_rating": None,
+        }
+        prev_mu = stats.get("prev_mu")
+        prev_sigma = stats.get("prev_sigma")
+        if prev_mu is not None and prev_sigma is not None:
+            size_results[team_id]["prev_rating"] = live_rating(prev_mu, prev_sigma)
+
+    if ENABLE_PODIUM_BOOST:
+        quality_factor = podium_boost_factors(rating_postprocess.column(size_results, "top3_pct"))
+    else:
+        quality_factor = np.ones(len(size_results))
+    rating = (rating_postprocess.column(size_results, "rating_base") * quality_factor).tolist()
+    prev_rating = (rating_postprocess.column(size_results, "prev_rating") * quality_factor).tolist()
+    for idx, team in enumerate(size_results.values()):
+        team["rating"] = round(rating[idx], 1)
+        team["rating_base"] = round(team["rating_base"], 1)
+        team["quality_factor"] = round(float(quality_factor[idx]), 4)
+        if team["prev_rating"] is not None:
+            team["prev_rating"] = round(prev_rating[idx], 1)
+    return size_results
+
+
+def normalize_live_ratings(all_ratings):
+    """Map each size's rating and prev_rating to NORM_TARGET_MEAN / NORM_TARGET_STD in place.
+
+    Returns [(size, mean, std), ...] of the sizes that were normalized.
+    """
+    if not NORMALIZE_ACROSS_SIZES:
+        return []
+    return rating_postprocess.normalize_sizes(
+        all_ratings, ("rating", "prev_rating"), MIN_RUNS_FOR_LIVE_RANKING,
+        NORM_TARGET_MEAN, NORM_TARGET_STD,
+    )
 
-def podium_boost_factor(finished_pct, top3_pct, top10_pct):
-    quality_norm = max(0.0, min(1.0, top3_pct / PODIUM_BOOST_TARGET))
-    return PODIUM_BOOST_BASE + (PODIUM_BOOST_RANGE * quality_norm)
 
+def assign_live_tiers(all_ratings):
+    """Set skill_tier and provisional on every team, in place."""
+    base.assign_skill_tiers(all_ratings, "rating", MIN_RUNS_FOR_LIVE_RANKING, LIVE_PROVISIONAL_SIGMA_THRESHOLD)
 
-def is_live_provisional(sigma):
-    return sigma >= LIVE_PROVISIONAL_SIGMA_THRESHOLD
 
+def attach_live_rank_intervals(boards, workers=1):
+    """Monte Carlo 90% rank interval and P(Elite) of every ranked team (rank_intervals.py).
 
-def _compute_tier_thresholds(all_ratings):
-    thresholds_by_size = {}
-    for size in sorted(all_ratings.keys()):
-        ranked = [
-            team for team in all_ratings[size].values()
-            if team["num_runs"] >= MIN_RUNS_FOR_LIVE_RANKING
-        ]
-        scores = [team["rating"] for team in ranked]
-        thresholds_by_size[size] = {
-            "elite_min": _percentile_threshold(scores, 1.0 - base.ELITE_TOP_PERCENT),
-            "champion_min": _percentile_threshold(scores, 1.0 - base.CHAMPION_TOP_PERCENT),
-            "expert_min": _percentile_threshold(scores, 1.0 - base.EXPERT_TOP_PERCENT),
-        }
-    return thresholds_by_size
+    Draws are scored like rating: live_rating() times the team's quality
+    factor (the size normalization does not change the order).
+    """
+    scores = {}
+    for size, board in boards.items():
+        size_results = board.size_results
+        mu = rating_postprocess.column(size_results, "mu")[board.rows]
+        sigma = rating_postprocess.column(size_results, "sigma")[board.rows]
+        quality_factor = rating_postprocess.column(size_results, "quality_factor")[board.rows]
+        center = (DISPLAY_BASE + DISPLAY_SCALE * (mu - RATING_SIGMA_MULTIPLIER * sigma)) * quality_factor
+        scores[size] = (center, DISPLAY_SCALE * sigma * quality_factor)
+    rank_intervals.attach_rank_intervals(boards, scores, base.ELITE_TOP_PERCENT, workers)
 
 
-def calculate_live_ratings(runs, profiles):
+def calculate_live_ratings(runs, profiles, pipeline=None):
     """Calculate one live rating from runs inside the configured time window."""
-    if not runs:
+    if not len(runs):
         return {}, None, None, {}
 
-    latest_date = max(_parse_date(run["comp_date"]) for run in runs)
+    latest_date = runs.latest_date()
     cutoff_date = latest_date - timedelta(days=LIVE_WINDOW_DAYS)
-    live_runs = [run for run in runs if _parse_date(run["comp_date"]) >= cutoff_date]
-
-    by_size = defaultdict(list)
-    for run in live_runs:
-        by_size[run["size"]].append(run)
 
+    if pipeline is None:
+        pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE)
+    strategy = LiveFinalStrategy()
+    planner = LiveWindowPlanner(pipeline, LIVE_WINDOW_DAYS)
+    states = planner.rate(strategy, LiveFinalStrategy, latest_date)
+    if pipeline.checkpoints is not None:
+        print(planner.summary())
     all_ratings = {}
-    # Per-competition stats: comp_dir -> {name, date, tier, teams_by_size, runs_total, finished_runs, total_entries}
-    comp_stats = {}
-
-    for size in sorted(by_size.keys()):
-        size_runs = by_size[size]
-        print(f"\n--- {size} ({len(size_runs)} live-window runs) ---")
-
-        model = PlackettLuce()
-        team_ratings = {}
-        team_stats = {}
-
-        comp_runs = defaultdict(list)
-        for run in size_runs:
-            comp_runs[run["comp_dir"]].append(run)
-
-        sorted_comps = sorted(comp_runs.keys(), key=lambda c: base.COMPETITIONS[c]["date"])
-
-        for comp_dir in sorted_comps:
-            comp_info = base.COMPETITIONS[comp_dir]
-            comp_name = comp_info["name"]
-
-            if comp_dir not in comp_stats:
-                comp_stats[comp_dir] = {
-                    "name": comp_name,
-                    "date": comp_info["date"],
-                    "tier": comp_info["tier"],
-                    "teams_by_size": {},
-                    "team_ids_by_size": {},
-                    "runs_total": 0,
-                    "finished_runs_total": 0,
-                    "total_entries": 0,
-                }
-
-            round_runs = defaultdict(list)
-            for run in comp_runs[comp_dir]:
-                round_runs[run["round_key"]].append(run)
-
-            comp_teams_this_size = set()
-
-            for round_key in sorted(round_runs.keys(), key=base.natural_sort_key):
-                entries = round_runs[round_key]
-
-                seen = set()
-                unique_entries = []
-                for entry in entries:
-                    if entry["team_id"] not in seen:
-                        seen.add(entry["team_id"])
-                        unique_entries.append(entry)
-                entries = unique_entries
-
-                if len(entries) < base.MIN_FIELD_SIZE:
-                    continue
-
-                clean = [e for e in entries if not e["eliminated"] and e["rank"] is not None]
-                elim = [e for e in entries if e["eliminated"]]
-                clean.sort(key=lambda e: e["rank"])
-
-                ranked_entries = []
-                for idx, entry in enumerate(clean):
-                    ranked_entries.append((entry, idx + 1))
-
-                last_rank = len(clean) + 1
-                for entry in elim:
-                    ranked_entries.append((entry, last_rank))
-
-                if len(ranked_entries) < base.MIN_FIELD_SIZE:
-                    continue
-
-                teams = []
-                ranks = []
-                entry_order = []
-
-                for entry, rank in ranked_entries:
-                    team_id = entry["team_id"]
-                    if team_id not in team_ratings:
-                        team_ratings[team_id] = model.rating()
-                        team_stats[team_id] = {
-                            "num_runs": 0,
-                            "finished_runs": 0,
-                            "top3_runs": 0,
-                            "top10_runs": 0,
-                            "last_comp": "",
-                            "last_comp_date": "",
-                            "prev_mu": None,
-                            "prev_sigma": None,
-                        }
-
-                    teams.append([team_ratings[team_id]])
-                    ranks.append(rank)
-                    entry_order.append(team_id)
-
-                    team_stats[team_id]["num_runs"] += 1
-                    if not entry["eliminated"] and entry["rank"] is not None:
-                        team_stats[team_id]["finished_runs"] += 1
-                        if rank <= 3:
-                            team_stats[team_id]["top3_runs"] += 1
-                        if rank <= 10:
-                            team_stats[team_id]["top10_runs"] += 1
-                    if entry["comp_date"] >= team_stats[team_id]["last_comp_date"]:
-                        team_stats[team_id]["last_comp"] = comp_name
-                        team_stats[team_id]["last_comp_date"] = entry["comp_date"]
-
-                # Track competition stats
-                comp_stats[comp_dir]["runs_total"] += 1
-                comp_stats[comp_dir]["total_entries"] += len(ranked_entries)
-                comp_stats[comp_dir]["finished_runs_total"] += len(clean)
-                for entry, rank in ranked_entries:
-                    comp_teams_this_size.add(entry["team_id"])
-
-                # Snapshot current ratings before update (for trend arrows)
-                for team_id in entry_order:
-                    team_stats[team_id]["prev_mu"] = team_ratings[team_id].mu
-                    team_stats[team_id]["prev_sigma"] = team_ratings[team_id].sigma
-
-                tier = entries[0]["comp_tier"]
-                tier_weight = MAJOR_EVENT_WEIGHT if (ENABLE_MAJOR_EVENT_WEIGHTING and tier == 1) else 1.0
-                weights = None
-                if tier_weight != 1.0:
-                    weights = [[tier_weight] for _ in entry_order]
-
-                result = model.rate(teams, ranks=ranks, weights=weights)
-
-                for idx, team_id in enumerate(entry_order):
-                    new_rating = result[idx][0]
-                    new_rating.sigma = max(base.SIGMA_MIN, new_rating.sigma * LIVE_SIGMA_DECAY)
-                    team_ratings[team_id] = new_rating
-
-            # Save unique teams for this size in this competition
-            if comp_teams_this_size:
-                comp_stats[comp_dir]["teams_by_size"][size] = len(comp_teams_this_size)
-                comp_stats[comp_dir]["team_ids_by_size"][size] = comp_teams_this_size
-
-        size_results = {}
-        for team_id, rating in team_ratings.items():
-            stats = team_stats[team_id]
-            profile = profiles.get(team_id, {})
-            num_runs = stats["num_runs"]
-            finished_pct = round((stats["finished_runs"] / num_runs) * 100.0, 1) if num_runs else 0.0
-            top3_pct = round((stats["top3_runs"] / num_runs) * 100.0, 1) if num_runs else 0.0
-            top10_pct = round((stats["top10_runs"] / num_runs) * 100.0, 1) if num_runs else 0.0
-            rating_base = live_rating(rating.mu, rating.sigma)
-            quality_factor = podium_boost_factor(finished_pct, top3_pct, top10_pct) if ENABLE_PODIUM_BOOST else 1.0
-            prev_mu = stats.get("prev_mu")
-            prev_sigma = stats.get("prev_sigma")
-            prev_rating = None
-            if prev_mu is not None and prev_sigma is not None:
-                prev_rating_base = live_rating(prev_mu, prev_sigma)
-                prev_rating = round(prev_rating_base * quality_factor, 1)
-            size_results[team_id] = {
-                "mu": rating.mu,
-                "sigma": rating.sigma,
-                "rating": round(rating_base * quality_factor, 1),
-                "rating_base": round(rating_base, 1),
-                "quality_factor": round(quality_factor, 4),
-                "handler": profile.get("handler_display", ""),
-                "dog": profile.get("dog_display", ""),
-                "call_name": profile.get("call_name", ""),
-                "registered_name": profile.get("registered_name", ""),
-                "country": profile.get("country", ""),
-                "num_runs": num_runs,
-                "finished_runs": stats["finished_runs"],
-                "top3_runs": stats["top3_runs"],
-                "top10_runs": stats["top10_runs"],
-                "finished_pct": finished_pct,
-                "top3_pct": top3_pct,
-                "top10_pct": top10_pct,
-                "last_comp": stats["last_comp"],
-                "prev_rating": prev_rating,
-            }
+    comp_stats = strategy.comp_stats
+
+    for size in pipeline.size_labels(since=cutoff_date):
+        print(f"\n--- {size} ({pipeline.num_runs(size, since=cutoff_date)} live-window runs) ---")
 
-        sorted_teams = sorted(size_results.items(), key=lambda x: -x[1]["rating"])
-        print(f"  {len(sorted_teams)} unique teams rated")
-        if sorted_teams:
-            top = sorted_teams[0][1]
-            print(f"  Top: {top['handler']} / {top['dog']} ({top['country']}) — {top['rating']}")
+        size_results = live_size_results(states[size], profiles)
+        base.print_size_summary(Leaderboard(size_results, "rating"))
 
         all_ratings[size] = size_results
 
     # Cross-size normalization: map each size to common mean/std
-    if NORMALIZE_ACROSS_SIZES:
-        for size in sorted(all_ratings.keys()):
-            qualified = [
-                t for t in all_ratings[size].values()
-                if t["num_runs"] >= MIN_RUNS_FOR_LIVE_RANKING
-            ]
-            if len(qualified) < 2:
-                continue
-            ratings = [t["rating"] for t in qualified]
-            size_mean = sum(ratings) / len(ratings)
-            size_std = (sum((r - size_mean) ** 2 for r in ratings) / len(ratings)) ** 0.5
-            if size_std < 1:
-                continue
-            for team in all_ratings[size].values():
-                z = (team["rating"] - size_mean) / size_std
-                team["rating"] = round(NORM_TARGET_MEAN + NORM_TARGET_STD * z, 1)
-                if team.get("prev_rating") is not None:
-                    z_prev = (team["prev_rating"] - size_mean) / size_std
-                    team["prev_rating"] = round(NORM_TARGET_MEAN + NORM_TARGET_STD * z_prev, 1)
-            print(f"  {size}: normalized (mean {size_mean:.0f}→{NORM_TARGET_MEAN:.0f}, std {size_std:.0f}→{NORM_TARGET_STD:.0f})")
-
-    tier_thresholds = _compute_tier_thresholds(all_ratings)
-    for size in sorted(all_ratings.keys()):
-        thresholds = tier_thresholds[size]
-        for team in all_ratings[size].values():
-            team["skill_tier"] = base.skill_tier_label(team["rating"], thresholds)
-            team["provisional"] = is_live_provisional(team["sigma"])
+    for size, size_mean, size_std in normalize_live_ratings(all_ratings):
+        print(f"  {size}: normalized (mean {size_mean:.0f}→{NORM_TARGET_MEAN:.0f}, std {size_std:.0f}→{NORM_TARGET_STD:.0f})")
+
+    assign_live_tiers(all_ratings)
 
     # Compute average rating per competition from final ratings
     for comp_dir, cs in comp_stats.items():
@@ -335,7 +304,7 @@ def calculate_live_ratings(runs, profiles):
     return all_ratings, cutoff_date, latest_date, comp_stats
 
 
-def write_csv_live(all_ratings):
+def write_csv_live(boards):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, "ratings_live_final.csv")
 
@@ -347,14 +316,11 @@ def write_csv_live(all_ratings):
             "tier", "provisional", "num_runs",
             "finished_pct", "top3_pct",
             "last_competition",
+            "rank_low", "rank_high", "p_elite",
         ])
 
-        for size in sorted(all_ratings.keys()):
-            sorted_teams = sorted(
-                (team for team in all_ratings[size].values() if team["num_runs"] >= MIN_RUNS_FOR_LIVE_RANKING),
-                key=lambda x: -x["rating"],
-            )
-            for rank, team in enumerate(sorted_teams, 1):
+        for size in sorted(boards.keys()):
+            for rank, team in boards[size]:
                 writer.writerow([
                     rank,
                     team["handler"],
@@ -371,32 +337,28 @@ def write_csv_live(all_ratings):
                     team["finished_pct"],
                     team["top3_pct"],
                     team["last_comp"],
+                    team["rank_low"],
+                    team["rank_high"],
+                    round(team["p_elite"], 3),
                 ])
 
     print(f"\nCSV written to {outpath}")
 
 
-def write_html_live(all_ratings, cutoff_date, latest_date, comp_stats=None):
+def write_html_live(boards, cutoff_date, latest_date, comp_stats=None):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, "ratings_live_final.html")
 
-    sizes = base.ordered_sizes(all_ratings.keys())
+    sizes = base.ordered_sizes(boards.keys())
     tables = {}
     for size in sizes:
-        sorted_teams = sorted(
-            (team for team in all_ratings[size].values() if team["num_runs"] >= MIN_RUNS_FOR_LIVE_RANKING),
-            key=lambda x: -x["rating"],
-        )
-
         # Build previous-rank lookup for trend arrows
-        prev_ranked = [t for t in sorted_teams if t.get("prev_rating") is not None]
-        prev_ranked.sort(key=lambda t: -t["prev_rating"])
         prev_rank_map = {}
-        for prev_rank, team in enumerate(prev_ranked, 1):
+        for prev_rank, team in boards[size].rerank("prev_rating"):
             prev_rank_map[(team["handler"], team["dog"])] = prev_rank
 
         rows = []
-        for rank, team in enumerate(sorted_teams, 1):
+        for rank, team in boards[size]:
             provisional_badge = ""
             if team.get("provisional", False):
                 provisional_badge = " <span class='prov-badge'>FEW RUNS</span>"
@@ -446,6 +408,8 @@ def write_html_live(all_ratings, cutoff_date, latest_date, comp_stats=None):
                 f"<td>{dog_cell}</td>"
                 f"<td>{base._esc(team['country'])}</td>"
                 f"<td class='num rating-cell'>{team['rating']:.0f}</td>"
+                f"<td class='num'>{base.format_rank_interval(team)}</td>"
+                f"<td class='num'>{team['p_elite'] * 100:.0f}%</td>"
                 f"<td class='num'>{team['num_runs']}</td>"
                 f"<td class='num'>{team['finished_pct']:.1f}%</td>"
                 f"<td class='num'>{team['top3_pct']:.1f}%</td>"
@@ -455,16 +419,13 @@ def write_html_live(all_ratings, cutoff_date, latest_date, comp_stats=None):
         tables[size] = "\n".join(rows)
 
     # Compute static summary stats for header cards
-    total_teams = sum(
-        sum(1 for t in s.values() if t["num_runs"] >= MIN_RUNS_FOR_LIVE_RANKING)
-        for s in all_ratings.values()
-    )
+    total_teams = sum(len(board) for board in boards.values())
     total_comps = len(comp_stats) if comp_stats else 0
     total_rounds = sum(cs["runs_total"] for cs in comp_stats.values()) if comp_stats else 0
 
     tab_buttons = []
     for idx, size in enumerate(sizes):
-        count = sum(1 for team in all_ratings[size].values() if team["num_runs"] >= MIN_RUNS_FOR_LIVE_RANKING)
+        count = len(boards[size])
         active = " active" if idx == 0 else ""
         tab_buttons.append(
             f'<button class="tab-btn{active}" onclick="showTab(\'{size}\', this)">'
@@ -485,9 +446,11 @@ def write_html_live(all_ratings, cutoff_date, latest_date, comp_stats=None):
                         <th onclick="sortTable('table-{size}', 2, 'str')">Dog</th>
                         <th onclick="sortTable('table-{size}', 3, 'str')">Country</th>
                         <th class="num" onclick="sortTable('table-{size}', 4, 'num')">Rating</th>
-                        <th class="num" onclick="sortTable('table-{size}', 5, 'num')">Runs</th>
-                        <th class="num" onclick="sortTable('table-{size}', 6, 'num')">Finished</th>
-                        <th class="num" onclick="sortTable('table-{size}', 7, 'num')">TOP3</th>
+                        <th class="num" onclick="sortTable('table-{size}', 5, 'num')" title="90% rank interval">Rank range</th>
+                        <th class="num" onclick="sortTable('table-{size}', 6, 'num')">P(Elite)</th>
+                        <th class="num" onclick="sortTable('table-{size}', 7, 'num')">Runs</th>
+                        <th class="num" onclick="sortTable('table-{size}', 8, 'num')">Finished</th>
+                        <th class="num" onclick="sortTable('table-{size}', 9, 'num')">TOP3</th>
                     </tr>
                 </thead>
                 <tbody>
@@ -1003,7 +966,7 @@ body {{
     .stat-cards {{ display: none; }}
     .content-area {{ padding: 16px; }}
     .table-card {{ overflow-x: auto; }}
-    .rating-table {{ min-width: 700px; }}
+    .rating-table {{ min-width: 860px; }}
     .search-box input {{ width: 100%; }}
     .main-nav {{ gap: 4px; padding: 10px 12px; }}
     .main-nav .nav-pill {{ padding: 6px 14px; font-size: 13px; }}
@@ -1111,6 +1074,7 @@ body {{
 
             <h3>3. Confidence grows over time</h3>
             <p>New teams start with high <strong>uncertainty</strong> &mdash; the system doesn't know yet how good they really are. With each run, uncertainty shrinks and the rating becomes more stable. Teams with very few runs are marked <span class="prov-badge">FEW RUNS</span> to signal that their rating may still change significantly.</p>
+            <p>The <strong>Rank range</strong> column shows where a team would land in 90% of {rank_intervals.RANK_SAMPLES} leaderboards drawn from the ratings' uncertainty, and <strong>P(Elite)</strong> how often it lands in the Elite tier (top {base.ELITE_TOP_PERCENT * 100:.0f}%).</p>
 
             <h3>4. Podium bonus</h3>
             <p>Teams that consistently finish in the <strong>top 3</strong> receive a quality bonus of up to <strong>+{(PODIUM_BOOST_BASE + PODIUM_BOOST_RANGE - PODIUM_BOOST_BASE) * 100:.0f}%</strong> on their rating. Teams without any podium finishes get a small penalty (<strong>&minus;{(1.0 - PODIUM_BOOST_BASE) * 100:.0f}%</strong>). This rewards not just beating weak fields, but actually winning competitive runs.</p>
@@ -1248,7 +1212,7 @@ function filterRows() {{
     print(f"HTML written to {root_path}")
 
 
-def main():
+def print_config():
     print("Running final live leaderboard variant...")
     print(
         "LIVE_WINDOW_DAYS="
@@ -1260,17 +1224,30 @@ def main():
         f"PODIUM_BOOST_RANGE={PODIUM_BOOST_RANGE}, PODIUM_BOOST_TARGET={PODIUM_BOOST_TARGET}"
     )
 
-    runs = base.load_all_runs()
-    profiles = base.build_team_profiles(runs)
 
-    all_ratings, cutoff_date, latest_date, comp_stats = calculate_live_ratings(runs, profiles)
+def build(runs, profiles, pipeline):
+    """Rate the live window and write ratings_live_final.csv / .html (+ index.html)."""
+    all_ratings, cutoff_date, latest_date, comp_stats = calculate_live_ratings(runs, profiles, pipeline=pipeline)
     total_teams = sum(len(size_map) for size_map in all_ratings.values())
     print(f"\nTotal unique teams rated (inside live window): {total_teams}")
 
-    write_csv_live(all_ratings)
-    write_html_live(all_ratings, cutoff_date, latest_date, comp_stats)
+    boards = leaderboards(all_ratings, "rating", MIN_RUNS_FOR_LIVE_RANKING)
+    attach_live_rank_intervals(boards, pipeline.workers)
+    write_csv_live(boards)
+    write_html_live(boards, cutoff_date, latest_date, comp_stats)
     print("Done!")
 
 
+def main():
+    args = base.build_arg_parser("Final live leaderboard (ratings_live_final.csv / .html).").parse_args()
+    print_config()
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    profiles = base.build_team_profiles(runs)
+    pipeline = base.pipeline_from_args(runs, args)
+    build(runs, profiles, pipeline)
+    if pipeline.checkpoints is not None:
+        print(pipeline.checkpoints.summary())
+
+
 if __name__ == "__main__":
     main()
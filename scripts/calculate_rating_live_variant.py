@@ -15,12 +15,12 @@ Outputs:
 import csv
 import math
 import os
-from collections import defaultdict
-from datetime import datetime, timedelta
-
-from openskill.models import PlackettLuce
+from bisect import bisect_right
+from datetime import timedelta
 
 import calculate_rating as base
+from leaderboard import Leaderboard, leaderboards
+from rating_pipeline import RatingPipeline
 
 
 # ---------------------------------------------------------------------------
@@ -33,7 +33,9 @@ MIN_RUNS_IN_ACTIVE_WINDOW = 3
 ACTIVE_WINDOW_DAYS = 365
 
 # Inactivity inflation for sigma (calendar gap between competitions).
-# Applied before each competition for teams that already have a rating.
+# Each competition inflates teams whose last run is more than
+# INACTIVITY_GRACE_DAYS earlier (see LiveVariantStrategy for how it is applied).
+INACTIVITY_GRACE_DAYS = 30
 INACTIVITY_TAU = 0.50
 SIGMA_MAX = 25.0 / 3.0  # OpenSkill default initial sigma
 
@@ -41,43 +43,24 @@ SIGMA_MAX = 25.0 / 3.0  # OpenSkill default initial sigma
 MIN_FORM_RUNS_FOR_RANKING = 3
 
 
-def _parse_date(date_str):
-    return datetime.strptime(date_str, "%Y-%m-%d").date()
-
-
-def _percentile_threshold(values, percentile):
-    if not values:
-        return float("inf")
-    sorted_values = sorted(values)
-    idx = int((len(sorted_values) - 1) * percentile)
-    return sorted_values[idx]
-
-
-def _compute_tier_thresholds(all_ratings, min_runs_threshold):
-    thresholds_by_size = {}
-    for size in sorted(all_ratings.keys()):
-        ranked = [
-            team for team in all_ratings[size].values()
-            if team["num_runs"] >= min_runs_threshold
-        ]
-        scores = [team["displayed_rating"] for team in ranked]
-        thresholds_by_size[size] = {
-            "elite_min": _percentile_threshold(scores, 1.0 - base.ELITE_TOP_PERCENT),
-            "champion_min": _percentile_threshold(scores, 1.0 - base.CHAMPION_TOP_PERCENT),
-            "expert_min": _percentile_threshold(scores, 1.0 - base.EXPERT_TOP_PERCENT),
-        }
-    return thresholds_by_size
-
-
 def _inflate_sigma_for_gap(rating, last_run_date, current_date):
     """Inflate sigma for inactivity gap between two dates."""
     if not last_run_date:
         return
     gap_days = (current_date - last_run_date).days
-    if gap_days <= 30:
+    if gap_days <= INACTIVITY_GRACE_DAYS:
         return
+    _inflate_sigma(rating, gap_days)
+
+
+def _inflate_sigma(rating, gap_days):
+    """Add gap_days worth of inactivity variance, capped at SIGMA_MAX."""
+    rating.sigma = _inflated_sigma(rating.sigma, gap_days)
+
+
+def _inflated_sigma(sigma, gap_days):
     months = gap_days / 30.0
-    rating.sigma = min(SIGMA_MAX, math.sqrt((rating.sigma * rating.sigma) + (INACTIVITY_TAU * INACTIVITY_TAU * months)))
+    return min(SIGMA_MAX, math.sqrt((sigma * sigma) + (INACTIVITY_TAU * INACTIVITY_TAU * months)))
 
 
 def _annotate_activity(size_results, reference_date):
@@ -90,6 +73,112 @@ def _annotate_activity(size_results, reference_date):
         team["active_12m"] = runs_12m >= MIN_RUNS_IN_ACTIVE_WINDOW
 
 
+class LiveVariantStrategy(base.BaselineStrategy):
+    """Baseline updates plus run-date tracking and optional inactivity inflation.
+
+    Inactivity inflation is defined per competition: at the start of every
+    competition of the size, each rated team whose last run is more than
+    INACTIVITY_GRACE_DAYS before it gets
+
+        sigma^2 <- min(SIGMA_MAX^2, sigma^2 + tau^2 * gap / 30)
+
+    with gap measured from the last run (inflation does not move it, so
+    every further competition adds its own, longer gap). Nothing else
+    touches a team's sigma until it runs again, and the steps only add
+    variance under a monotone cap, so applying them one by one equals
+    applying once with the summed gaps (capped once). The two differ only
+    in floating-point rounding of the intermediate square roots;
+    bench_inactivity_inflation.py checks that against the per-competition
+    loop (_inflate_sigma_for_gap()).
+
+    The strategy therefore applies inflation lazily: it keeps the dates of
+    the competitions started so far (with prefix sums) and inflates a team
+    once, for the competitions since its last run, when it next enters a
+    round or in finish(). Cost scales with entries instead of teams x
+    competitions.
+    """
+
+    def __init__(self, apply_inactivity_inflation):
+        super().__init__()
+        self.apply_inactivity_inflation = apply_inactivity_inflation
+        # Date ordinals of the competitions started so far (chronological)
+        # and their prefix sums: _comp_date_sums[i] = sum(_comp_dates[:i]).
+        self._comp_dates = []
+        self._comp_date_sums = [0]
+
+    def config(self):
+        config = super().config()
+        config.update(inactivity_inflation=self.apply_inactivity_inflation,
+                      inactivity_tau=INACTIVITY_TAU, sigma_max=SIGMA_MAX)
+        return config
+
+    def new_team_stats(self):
+        return {
+            "num_runs": 0,
+            "last_comp": "",
+            "last_comp_date": "",
+            "last_run_date": None,
+            "run_dates": [],
+            "inflated_through": 0,    # competitions started when last inflated
+        }
+
+    def record_entry(self, state, stats, entry, comp):
+        if self.apply_inactivity_inflation:
+            self._inflate(state.ratings[entry[0]], stats)
+        comp_date = state.comps.date(comp)
+        stats["num_runs"] += 1
+        stats["run_dates"].append(comp_date)
+        stats["last_run_date"] = comp_date
+        if state.comps.dates[comp] >= stats["last_comp_date"]:
+            stats["last_comp"] = state.comps.names[comp]
+            stats["last_comp_date"] = state.comps.dates[comp]
+
+    def start_competition(self, state, comp, rounds):
+        if self.apply_inactivity_inflation:
+            comp_date = int(state.comps.date_ordinal[comp])
+            self._comp_dates.append(comp_date)
+            self._comp_date_sums.append(self._comp_date_sums[-1] + comp_date)
+
+    def finish(self, state):
+        if self.apply_inactivity_inflation:
+            for team_id, rating in state.ratings.items():
+                self._inflate(rating, state.stats[team_id])
+
+    def effective_rating(self, state, team_id):
+        rating = state.ratings[team_id]
+        gap_days = self._pending_gap(state.stats[team_id]) if self.apply_inactivity_inflation else 0
+        if gap_days > 0:
+            return rating.mu, _inflated_sigma(rating.sigma, gap_days)
+        return rating.mu, rating.sigma
+
+    def split(self):
+        # The competition dates are per size.
+        return LiveVariantStrategy(self.apply_inactivity_inflation)
+
+    def _pending_gap(self, stats):
+        """Summed inactivity gap (days) of the competitions started since the
+        team was last inflated; 0 if none is past the grace period."""
+        last_run_date = stats["last_run_date"]
+        if last_run_date is None:
+            return 0
+        last_run = last_run_date.toordinal()
+        end = len(self._comp_dates)
+        # Competitions more than the grace period after the last run; dates
+        # are sorted, so they form a suffix.
+        start = max(stats["inflated_through"], bisect_right(self._comp_dates, last_run + INACTIVITY_GRACE_DAYS))
+        count = end - start
+        if count <= 0:
+            return 0
+        return self._comp_date_sums[end] - self._comp_date_sums[start] - count * last_run
+
+    def _inflate(self, rating, stats):
+        """Apply the inflation of every competition started since the last call."""
+        gap_days = self._pending_gap(stats)
+        stats["inflated_through"] = len(self._comp_dates)
+        if gap_days > 0:
+            _inflate_sigma(rating, gap_days)
+
+
 def calculate_ratings_variant(
     runs,
     profiles,
@@ -97,112 +186,27 @@ def calculate_ratings_variant(
     *,
     apply_inactivity_inflation,
     min_runs_for_tiers,
+    since=None,
+    pipeline=None,
 ):
     """
     Calculate OpenSkill ratings for variant mode.
 
+    With since, only runs from that date on (inclusive) are rated.
+
     Returns dict: size -> {team_id: payload}
     """
-    by_size = defaultdict(list)
-    for run in runs:
-        by_size[run["size"]].append(run)
-
+    if pipeline is None:
+        pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE)
+    states = pipeline.rate(LiveVariantStrategy(apply_inactivity_inflation), since=since)
     all_ratings = {}
 
-    for size in sorted(by_size.keys()):
-        size_runs = by_size[size]
-        print(f"\n--- {size} ({len(size_runs)} runs) ---")
-
-        model = PlackettLuce()
-        team_ratings = {}
-        team_stats = {}
-
-        comp_runs = defaultdict(list)
-        for run in size_runs:
-            comp_runs[run["comp_dir"]].append(run)
-
-        sorted_comps = sorted(comp_runs.keys(), key=lambda c: base.COMPETITIONS[c]["date"])
-
-        for comp_dir in sorted_comps:
-            comp_name = base.COMPETITIONS[comp_dir]["name"]
-            comp_date = _parse_date(base.COMPETITIONS[comp_dir]["date"])
-
-            if apply_inactivity_inflation:
-                for team_id, rating in team_ratings.items():
-                    _inflate_sigma_for_gap(rating, team_stats[team_id]["last_run_date"], comp_date)
-
-            round_runs = defaultdict(list)
-            for run in comp_runs[comp_dir]:
-                round_runs[run["round_key"]].append(run)
-
-            for round_key in sorted(round_runs.keys(), key=base.natural_sort_key):
-                entries = round_runs[round_key]
-
-                seen = set()
-                unique_entries = []
-                for entry in entries:
-                    if entry["team_id"] not in seen:
-                        seen.add(entry["team_id"])
-                        unique_entries.append(entry)
-                entries = unique_entries
-
-                if len(entries) < base.MIN_FIELD_SIZE:
-                    continue
-
-                clean = [e for e in entries if not e["eliminated"] and e["rank"] is not None]
-                elim = [e for e in entries if e["eliminated"]]
-                clean.sort(key=lambda e: e["rank"])
-
-                ranked_entries = []
-                for idx, entry in enumerate(clean):
-                    ranked_entries.append((entry, idx + 1))
-
-                last_rank = len(clean) + 1
-                for entry in elim:
-                    ranked_entries.append((entry, last_rank))
-
-                if len(ranked_entries) < base.MIN_FIELD_SIZE:
-                    continue
-
-                teams = []
-                ranks = []
-                entry_order = []
-
-                for entry, rank in ranked_entries:
-                    team_id = entry["team_id"]
-                    if team_id not in team_ratings:
-                        team_ratings[team_id] = model.rating()
-                        team_stats[team_id] = {
-                            "num_runs": 0,
-                            "last_comp": "",
-                            "last_comp_date": "",
-                            "last_run_date": None,
-                            "run_dates": [],
-                        }
-
-                    teams.append([team_ratings[team_id]])
-                    ranks.append(rank)
-                    entry_order.append(team_id)
-
-                    team_stats[team_id]["num_runs"] += 1
-                    team_stats[team_id]["run_dates"].append(comp_date)
-                    team_stats[team_id]["last_run_date"] = comp_date
-                    if entry["comp_date"] >= team_stats[team_id]["last_comp_date"]:
-                        team_stats[team_id]["last_comp"] = comp_name
-                        team_stats[team_id]["last_comp_date"] = entry["comp_date"]
-
-                tier = entries[0]["comp_tier"]
-                tier_weight = base.TIER_WEIGHTS.get(tier, 1.0)
-                weights = None
-                if base.ENABLE_TIER_WEIGHTING and tier_weight != 1.0:
-                    weights = [[tier_weight] for _ in entry_order]
-
-                result = model.rate(teams, ranks=ranks, weights=weights)
-
-                for idx, team_id in enumerate(entry_order):
-                    new_rating = result[idx][0]
-                    new_rating.sigma = max(base.SIGMA_MIN, new_rating.sigma * base.SIGMA_DECAY)
-                    team_ratings[team_id] = new_rating
+    for size in pipeline.size_labels(since=since):
+        print(f"\n--- {size} ({pipeline.num_runs(size, since=since)} runs) ---")
+
+        state = states[size]
+        team_ratings = state.ratings
+        team_stats = state.stats
 
         size_results = {}
         for team_id, rating in team_ratings.items():
@@ -224,25 +228,16 @@ def calculate_ratings_variant(
 
         _annotate_activity(size_results, reference_date)
 
-        sorted_teams = sorted(size_results.items(), key=lambda x: -x[1]["displayed_rating"])
-        print(f"  {len(sorted_teams)} unique teams rated")
-        if sorted_teams:
-            top = sorted_teams[0][1]
-            print(f"  Top: {top['handler']} / {top['dog']} ({top['country']}) — {top['displayed_rating']}")
+        base.print_size_summary(Leaderboard(size_results, "displayed_rating"))
 
         all_ratings[size] = size_results
 
-    tier_thresholds = _compute_tier_thresholds(all_ratings, min_runs_for_tiers)
-    for size in sorted(all_ratings.keys()):
-        thresholds = tier_thresholds[size]
-        for team in all_ratings[size].values():
-            team["skill_tier"] = base.skill_tier_label(team["displayed_rating"], thresholds)
-            team["provisional"] = base.is_provisional(team["sigma"])
+    base.assign_skill_tiers(all_ratings, min_runs=min_runs_for_tiers)
 
     return all_ratings
 
 
-def _write_csv(all_ratings, out_filename, *, eligibility_fn):
+def _write_csv(boards, out_filename):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, out_filename)
 
@@ -254,12 +249,8 @@ def _write_csv(all_ratings, out_filename, *, eligibility_fn):
             "tier", "provisional", "num_runs", "num_runs_12m", "active_12m", "last_competition",
         ])
 
-        for size in sorted(all_ratings.keys()):
-            sorted_teams = sorted(
-                (team for team in all_ratings[size].values() if eligibility_fn(team)),
-                key=lambda x: -x["displayed_rating"],
-            )
-            for rank, team in enumerate(sorted_teams, 1):
+        for size in sorted(boards.keys()):
+            for rank, team in boards[size]:
                 writer.writerow([
                     rank,
                     team["handler"],
@@ -281,22 +272,18 @@ def _write_csv(all_ratings, out_filename, *, eligibility_fn):
     print(f"\nCSV written to {outpath}")
 
 
-def _write_html(all_ratings, out_filename, title, subtitle, *, eligibility_fn, include_active_cols):
+def _write_html(boards, out_filename, title, subtitle, *, include_active_cols):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, out_filename)
 
-    sizes = base.ordered_sizes(all_ratings.keys())
+    sizes = base.ordered_sizes(boards.keys())
     tables = {}
     countries_by_size = {}
 
     for size in sizes:
-        sorted_teams = sorted(
-            (team for team in all_ratings[size].values() if eligibility_fn(team)),
-            key=lambda x: -x["displayed_rating"],
-        )
-        countries_by_size[size] = sorted({team["country"] for team in sorted_teams if team["country"]})
+        countries_by_size[size] = boards[size].countries()
         rows = []
-        for rank, team in enumerate(sorted_teams, 1):
+        for rank, team in boards[size]:
             provisional_badge = ""
             if team.get("provisional", False):
                 provisional_badge = " <span class='prov-badge'>PROV</span>"
@@ -339,7 +326,7 @@ def _write_html(all_ratings, out_filename, title, subtitle, *, eligibility_fn, i
 
     tab_buttons = []
     for idx, size in enumerate(sizes):
-        count = sum(1 for team in all_ratings[size].values() if eligibility_fn(team))
+        count = len(boards[size])
         active = " active" if idx == 0 else ""
         tab_buttons.append(
             f'<button class="tab-btn{active}" onclick="showTab(\'{size}\')">'
@@ -524,30 +511,17 @@ def _write_html_compare(live_all_ratings, form_all_ratings):
     rows_by_size_mode = {"active": {}, "form": {}}
     countries_by_size_mode = {"active": {}, "form": {}}
 
+    live_boards = active_leaderboards(live_all_ratings)
+    form_boards = form_leaderboards(form_all_ratings)
+
     for size in sizes:
         live_size = live_all_ratings.get(size, {})
         form_size = form_all_ratings.get(size, {})
-        team_ids = set(live_size.keys()) | set(form_size.keys())
-
-        active_rows_data = []
-        form_rows_data = []
 
-        for team_id in team_ids:
+        def _row_data(team_id):
             live_team = live_size.get(team_id)
             form_team = form_size.get(team_id)
             meta = live_team or form_team
-            if not meta:
-                continue
-
-            active_eligible = bool(
-                live_team
-                and live_team["num_runs"] >= base.MIN_RUNS_FOR_RANKING
-                and live_team.get("active_12m", False)
-            )
-            form_eligible = bool(
-                form_team
-                and form_team["num_runs"] >= MIN_FORM_RUNS_FOR_RANKING
-            )
 
             active_rating = live_team["displayed_rating"] if live_team else None
             form_rating = form_team["displayed_rating"] if form_team else None
@@ -555,12 +529,12 @@ def _write_html_compare(live_all_ratings, form_all_ratings):
             if active_rating is not None and form_rating is not None:
                 rating_delta = form_rating - active_rating
 
-            common = {
+            return {
                 "handler": meta["handler"],
                 "call_name": meta.get("call_name", ""),
                 "registered_name": meta.get("registered_name", ""),
                 "country": meta["country"],
-                "last_comp": (live_team or form_team).get("last_comp", ""),
+                "last_comp": meta.get("last_comp", ""),
                 "num_runs_total": live_team["num_runs"] if live_team else 0,
                 "num_runs_12m": live_team["num_runs_12m"] if live_team else 0,
                 "num_runs_form": form_team["num_runs"] if form_team else 0,
@@ -573,13 +547,10 @@ def _write_html_compare(live_all_ratings, form_all_ratings):
                 "form_prov": form_team.get("provisional", False) if form_team else False,
             }
 
-            if active_eligible:
-                active_rows_data.append(common)
-            if form_eligible:
-                form_rows_data.append(common)
-
-        active_rows_data.sort(key=lambda x: -(x["active_rating"] if x["active_rating"] is not None else -999999))
-        form_rows_data.sort(key=lambda x: -(x["form_rating"] if x["form_rating"] is not None else -999999))
+        live_board = live_boards.get(size)
+        form_board = form_boards.get(size)
+        active_rows_data = [_row_data(team_id) for team_id in live_board.ranked_team_ids()] if live_board is not None else []
+        form_rows_data = [_row_data(team_id) for team_id in form_board.ranked_team_ids()] if form_board is not None else []
 
         def _dog_cell(row):
             call = base._esc(row.get("call_name", ""))
@@ -643,8 +614,8 @@ def _write_html_compare(live_all_ratings, form_all_ratings):
 
         rows_by_size_mode["active"][size] = "\n".join(active_rows)
         rows_by_size_mode["form"][size] = "\n".join(form_rows)
-        countries_by_size_mode["active"][size] = sorted({row["country"] for row in active_rows_data if row["country"]})
-        countries_by_size_mode["form"][size] = sorted({row["country"] for row in form_rows_data if row["country"]})
+        countries_by_size_mode["active"][size] = live_board.countries() if live_board is not None else []
+        countries_by_size_mode["form"][size] = form_board.countries() if form_board is not None else []
 
     # Buttons
     size_buttons = []
@@ -844,87 +815,132 @@ updateCountryFilterOptions();
     print(f"HTML written to {outpath}")
 
 
-def main():
+def print_config():
     print("Running live variant: active filter + inactivity sigma inflation + form 12m output")
     print(
         f"ACTIVE_WINDOW_DAYS={ACTIVE_WINDOW_DAYS}, MIN_RUNS_IN_ACTIVE_WINDOW={MIN_RUNS_IN_ACTIVE_WINDOW}, "
         f"INACTIVITY_TAU={INACTIVITY_TAU}, SIGMA_MAX={SIGMA_MAX:.4f}"
     )
 
-    runs = base.load_all_runs()
-    profiles = base.build_team_profiles(runs)
-    if not runs:
-        print("No runs loaded. Exiting.")
-        return
 
-    latest_date = max(_parse_date(run["comp_date"]) for run in runs)
-    cutoff_12m = latest_date - timedelta(days=ACTIVE_WINDOW_DAYS)
-    form_runs = [run for run in runs if _parse_date(run["comp_date"]) >= cutoff_12m]
+def _form_window_start(runs):
+    return runs.latest_date() - timedelta(days=ACTIVE_WINDOW_DAYS)
 
-    print(f"Latest competition date in dataset: {latest_date}")
-    print(f"Form window starts at: {cutoff_12m} (inclusive)")
-    print(f"Form runs: {len(form_runs)} / {len(runs)}")
 
-    print("\n[1/2] Calculating full-history ratings with inactivity sigma inflation...")
-    live_all_ratings = calculate_ratings_variant(
+def calculate_active(runs, profiles, pipeline):
+    """Full-history ratings with inactivity sigma inflation."""
+    return calculate_ratings_variant(
         runs,
         profiles,
-        latest_date,
+        runs.latest_date(),
         apply_inactivity_inflation=True,
         min_runs_for_tiers=base.MIN_RUNS_FOR_RANKING,
+        pipeline=pipeline,
     )
 
-    print("\n[2/2] Calculating form-only ratings (last 12 months)...")
-    form_all_ratings = calculate_ratings_variant(
-        form_runs,
+
+def calculate_form(runs, profiles, pipeline):
+    """Ratings from the last ACTIVE_WINDOW_DAYS only."""
+    return calculate_ratings_variant(
+        runs,
         profiles,
-        latest_date,
+        runs.latest_date(),
         apply_inactivity_inflation=False,
         min_runs_for_tiers=MIN_FORM_RUNS_FOR_RANKING,
+        since=_form_window_start(runs),
+        pipeline=pipeline,
     )
 
-    _write_csv(
-        live_all_ratings,
-        "ratings_live_variant_active.csv",
-        eligibility_fn=lambda team: team["num_runs"] >= base.MIN_RUNS_FOR_RANKING and team["active_12m"],
-    )
+
+def active_leaderboards(live_all_ratings):
+    """Active ranking: MIN_RUNS_FOR_RANKING runs and active_12m."""
+    return leaderboards(live_all_ratings, "displayed_rating", base.MIN_RUNS_FOR_RANKING, active_only=True)
+
+
+def form_leaderboards(form_all_ratings):
+    """Form ranking: MIN_FORM_RUNS_FOR_RANKING runs inside the form window."""
+    return leaderboards(form_all_ratings, "displayed_rating", MIN_FORM_RUNS_FOR_RANKING)
+
+
+def write_active(live_all_ratings):
+    boards = active_leaderboards(live_all_ratings)
+    _write_csv(boards, "ratings_live_variant_active.csv")
     _write_html(
-        live_all_ratings,
+        boards,
         "ratings_live_variant_active.html",
         "ADW Rating - Live Variant (Active Teams)",
         (
             f"OpenSkill (Plackett-Luce) | inactivity sigma inflation (tau={INACTIVITY_TAU}) | "
             f"active = >= {MIN_RUNS_IN_ACTIVE_WINDOW} runs in last {ACTIVE_WINDOW_DAYS} days"
         ),
-        eligibility_fn=lambda team: team["num_runs"] >= base.MIN_RUNS_FOR_RANKING and team["active_12m"],
         include_active_cols=True,
     )
 
-    _write_csv(
-        form_all_ratings,
-        "ratings_live_variant_form12m.csv",
-        eligibility_fn=lambda team: team["num_runs"] >= MIN_FORM_RUNS_FOR_RANKING,
-    )
+
+def write_form(form_all_ratings):
+    boards = form_leaderboards(form_all_ratings)
+    _write_csv(boards, "ratings_live_variant_form12m.csv")
     _write_html(
-        form_all_ratings,
+        boards,
         "ratings_live_variant_form12m.html",
         "ADW Rating - Live Variant (Form 12m)",
         (
             f"OpenSkill (Plackett-Luce) | runs from last {ACTIVE_WINDOW_DAYS} days only | "
             f"min {MIN_FORM_RUNS_FOR_RANKING} runs"
         ),
-        eligibility_fn=lambda team: team["num_runs"] >= MIN_FORM_RUNS_FOR_RANKING,
         include_active_cols=False,
     )
 
+
+def write_compare(live_all_ratings, form_all_ratings):
     _write_html_compare(live_all_ratings, form_all_ratings)
 
     total_live = sum(len(size_map) for size_map in live_all_ratings.values())
     total_form = sum(len(size_map) for size_map in form_all_ratings.values())
     print(f"\nTotal rated teams (live calc): {total_live}")
     print(f"Total rated teams (form calc): {total_form}")
+
+
+def _print_windows(runs):
+    latest_date = runs.latest_date()
+    cutoff_12m = _form_window_start(runs)
+    num_form_runs = int(runs.window_mask(since=cutoff_12m).sum())
+
+    print(f"Latest competition date in dataset: {latest_date}")
+    print(f"Form window starts at: {cutoff_12m} (inclusive)")
+    print(f"Form runs: {num_form_runs} / {len(runs)}")
+
+
+def build(runs, profiles, pipeline):
+    """Rate loaded runs and write the active, form 12m and compare outputs."""
+    if not len(runs):
+        print("No runs loaded. Exiting.")
+        return
+
+    _print_windows(runs)
+
+    print("\n[1/2] Calculating full-history ratings with inactivity sigma inflation...")
+    live_all_ratings = calculate_active(runs, profiles, pipeline)
+
+    print("\n[2/2] Calculating form-only ratings (last 12 months)...")
+    form_all_ratings = calculate_form(runs, profiles, pipeline)
+
+    write_active(live_all_ratings)
+    write_form(form_all_ratings)
+    write_compare(live_all_ratings, form_all_ratings)
     print("Done!")
 
 
+def main():
+    args = base.build_arg_parser("Live variant: active leaderboard + form 12m leaderboard.").parse_args()
+    print_config()
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    profiles = base.build_team_profiles(runs)
+    pipeline = base.pipeline_from_args(runs, args)
+    build(runs, profiles, pipeline)
+    if pipeline.checkpoints is not None:
+        print(pipeline.checkpoints.summary())
+
+
 if __name__ == "__main__":
     main()
@@ -14,124 +14,40 @@ Outputs:
 
 import csv
 import os
-from collections import defaultdict
-
-from openskill.models import PlackettLuce
 
 import calculate_rating as base
+from leaderboard import Leaderboard, leaderboards
+from rating_pipeline import RatingPipeline
 
 
 # Minimum clean runs shown in output leaderboard.
 MIN_CLEAN_RUNS_FOR_RANKING = 4
 
 
-def _percentile_threshold(values, percentile):
-    if not values:
-        return float("inf")
-    sorted_values = sorted(values)
-    idx = int((len(sorted_values) - 1) * percentile)
-    return sorted_values[idx]
-
+class WowStrategy(base.BaselineStrategy):
+    """Baseline updates over clean results only."""
 
-def _compute_tier_thresholds(all_ratings):
-    thresholds_by_size = {}
-    for size in sorted(all_ratings.keys()):
-        ranked = [
-            team for team in all_ratings[size].values()
-            if team["num_runs"] >= MIN_CLEAN_RUNS_FOR_RANKING
-        ]
-        scores = [team["displayed_rating"] for team in ranked]
-        thresholds_by_size[size] = {
-            "elite_min": _percentile_threshold(scores, 1.0 - base.ELITE_TOP_PERCENT),
-            "champion_min": _percentile_threshold(scores, 1.0 - base.CHAMPION_TOP_PERCENT),
-            "expert_min": _percentile_threshold(scores, 1.0 - base.EXPERT_TOP_PERCENT),
-        }
-    return thresholds_by_size
+    def round_entries(self, rnd):
+        # WOW mode: keep only clean results, ignore eliminated entries entirely.
+        if rnd.num_clean < base.MIN_FIELD_SIZE:
+            return None
+        return rnd.clean_entries()
 
 
-def calculate_ratings_wow(runs, profiles):
-    by_size = defaultdict(list)
-    for run in runs:
-        by_size[run["size"]].append(run)
-
+def calculate_ratings_wow(runs, profiles, pipeline=None, states=None):
+    """OpenSkill ratings per size from clean results (states: see base.calculate_ratings)."""
+    if pipeline is None:
+        pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE)
+    if states is None:
+        states = pipeline.rate(WowStrategy())
     all_ratings = {}
 
-    for size in sorted(by_size.keys()):
-        size_runs = by_size[size]
-        print(f"\n--- {size} ({len(size_runs)} runs) ---")
-
-        model = PlackettLuce()
-        team_ratings = {}
-        team_stats = {}
-
-        comp_runs = defaultdict(list)
-        for run in size_runs:
-            comp_runs[run["comp_dir"]].append(run)
-
-        sorted_comps = sorted(comp_runs.keys(), key=lambda c: base.COMPETITIONS[c]["date"])
-
-        for comp_dir in sorted_comps:
-            comp_name = base.COMPETITIONS[comp_dir]["name"]
-
-            round_runs = defaultdict(list)
-            for run in comp_runs[comp_dir]:
-                round_runs[run["round_key"]].append(run)
-
-            for round_key in sorted(round_runs.keys(), key=base.natural_sort_key):
-                entries = round_runs[round_key]
-
-                seen = set()
-                unique_entries = []
-                for entry in entries:
-                    if entry["team_id"] not in seen:
-                        seen.add(entry["team_id"])
-                        unique_entries.append(entry)
-                entries = unique_entries
-
-                if len(entries) < base.MIN_FIELD_SIZE:
-                    continue
-
-                # WOW mode: keep only clean results, ignore eliminated entries entirely.
-                clean = [e for e in entries if not e["eliminated"] and e["rank"] is not None]
-                if len(clean) < base.MIN_FIELD_SIZE:
-                    continue
-                clean.sort(key=lambda e: e["rank"])
-
-                teams = []
-                ranks = []
-                entry_order = []
-
-                for idx, entry in enumerate(clean):
-                    team_id = entry["team_id"]
-                    if team_id not in team_ratings:
-                        team_ratings[team_id] = model.rating()
-                        team_stats[team_id] = {
-                            "num_runs": 0,
-                            "last_comp": "",
-                            "last_comp_date": "",
-                        }
-
-                    teams.append([team_ratings[team_id]])
-                    ranks.append(idx + 1)
-                    entry_order.append(team_id)
-
-                    team_stats[team_id]["num_runs"] += 1
-                    if entry["comp_date"] >= team_stats[team_id]["last_comp_date"]:
-                        team_stats[team_id]["last_comp"] = comp_name
-                        team_stats[team_id]["last_comp_date"] = entry["comp_date"]
-
-                tier = entries[0]["comp_tier"]
-                tier_weight = base.TIER_WEIGHTS.get(tier, 1.0)
-                weights = None
-                if base.ENABLE_TIER_WEIGHTING and tier_weight != 1.0:
-                    weights = [[tier_weight] for _ in entry_order]
-
-                result = model.rate(teams, ranks=ranks, weights=weights)
-
-                for idx, team_id in enumerate(entry_order):
-                    new_rating = result[idx][0]
-                    new_rating.sigma = max(base.SIGMA_MIN, new_rating.sigma * base.SIGMA_DECAY)
-                    team_ratings[team_id] = new_rating
+    for size in pipeline.size_labels():
+        print(f"\n--- {size} ({pipeline.num_runs(size)} runs) ---")
+
+        state = states[size]
+        team_ratings = state.ratings
+        team_stats = state.stats
 
         size_results = {}
         for team_id, rating in team_ratings.items():
@@ -150,25 +66,16 @@ def calculate_ratings_wow(runs, profiles):
                 "last_comp": stats["last_comp"],
             }
 
-        sorted_teams = sorted(size_results.items(), key=lambda x: -x[1]["displayed_rating"])
-        print(f"  {len(sorted_teams)} unique teams rated")
-        if sorted_teams:
-            top = sorted_teams[0][1]
-            print(f"  Top: {top['handler']} / {top['dog']} ({top['country']}) — {top['displayed_rating']}")
+        base.print_size_summary(Leaderboard(size_results, "displayed_rating"))
 
         all_ratings[size] = size_results
 
-    tier_thresholds = _compute_tier_thresholds(all_ratings)
-    for size in sorted(all_ratings.keys()):
-        thresholds = tier_thresholds[size]
-        for team in all_ratings[size].values():
-            team["skill_tier"] = base.skill_tier_label(team["displayed_rating"], thresholds)
-            team["provisional"] = base.is_provisional(team["sigma"])
+    base.assign_skill_tiers(all_ratings, min_runs=MIN_CLEAN_RUNS_FOR_RANKING)
 
     return all_ratings
 
 
-def write_csv_wow(all_ratings):
+def write_csv_wow(boards):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, "ratings_wow.csv")
 
@@ -180,12 +87,8 @@ def write_csv_wow(all_ratings):
             "tier", "provisional", "num_runs", "last_competition",
         ])
 
-        for size in sorted(all_ratings.keys()):
-            sorted_teams = sorted(
-                (team for team in all_ratings[size].values() if team["num_runs"] >= MIN_CLEAN_RUNS_FOR_RANKING),
-                key=lambda x: -x["displayed_rating"],
-            )
-            for rank, team in enumerate(sorted_teams, 1):
+        for size in sorted(boards.keys()):
+            for rank, team in boards[size]:
                 writer.writerow([
                     rank,
                     team["handler"],
@@ -205,22 +108,18 @@ def write_csv_wow(all_ratings):
     print(f"\nCSV written to {outpath}")
 
 
-def write_html_wow(all_ratings):
+def write_html_wow(boards):
     os.makedirs(base.OUTPUT_DIR, exist_ok=True)
     outpath = os.path.join(base.OUTPUT_DIR, "ratings_wow.html")
 
-    sizes = base.ordered_sizes(all_ratings.keys())
+    sizes = base.ordered_sizes(boards.keys())
 
     tables = {}
     countries_by_size = {}
     for size in sizes:
-        sorted_teams = sorted(
-            (t for t in all_ratings[size].values() if t["num_runs"] >= MIN_CLEAN_RUNS_FOR_RANKING),
-            key=lambda x: -x["displayed_rating"],
-        )
-        countries_by_size[size] = sorted({t["country"] for t in sorted_teams if t["country"]})
+        countries_by_size[size] = boards[size].countries()
         rows = []
-        for rank, team in enumerate(sorted_teams, 1):
+        for rank, team in boards[size]:
             rating = team["displayed_rating"]
             tier_label = team.get("skill_tier", "Competitor")
             provisional_badge = ""
@@ -254,7 +153,7 @@ def write_html_wow(all_ratings):
 
     tab_buttons = []
     for idx, size in enumerate(sizes):
-        count = sum(1 for t in all_ratings[size].values() if t["num_runs"] >= MIN_CLEAN_RUNS_FOR_RANKING)
+        count = len(boards[size])
         active = " active" if idx == 0 else ""
         tab_buttons.append(
             f'<button class="tab-btn{active}" onclick="showTab(\'{size}\')">'
@@ -436,17 +335,34 @@ updateCountryFilterOptions();
     print(f"HTML written to {outpath}")
 
 
-if __name__ == "__main__":
+def print_config():
     print("Running WOW variant (ELIM ignored in updates).")
     print(f"MIN_CLEAN_RUNS_FOR_RANKING={MIN_CLEAN_RUNS_FOR_RANKING}")
 
-    runs = base.load_all_runs()
-    profiles = base.build_team_profiles(runs)
-    all_ratings = calculate_ratings_wow(runs, profiles)
+
+def build(runs, profiles, pipeline, states=None):
+    """Rate loaded runs and write ratings_wow.csv / .html."""
+    all_ratings = calculate_ratings_wow(runs, profiles, pipeline=pipeline, states=states)
 
     total_teams = sum(len(size_map) for size_map in all_ratings.values())
     print(f"\nTotal unique teams across all sizes: {total_teams}")
 
-    write_csv_wow(all_ratings)
-    write_html_wow(all_ratings)
+    boards = leaderboards(all_ratings, "displayed_rating", MIN_CLEAN_RUNS_FOR_RANKING)
+    write_csv_wow(boards)
+    write_html_wow(boards)
     print("\nDone!")
+
+
+def main():
+    args = base.build_arg_parser("WOW variant (ELIM ignored in updates).").parse_args()
+    print_config()
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    profiles = base.build_team_profiles(runs)
+    pipeline = base.pipeline_from_args(runs, args)
+    build(runs, profiles, pipeline)
+    if pipeline.checkpoints is not None:
+        print(pipeline.checkpoints.summary())
+
+
+if __name__ == "__main__":
+    main()
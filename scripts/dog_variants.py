@@ -0,0 +1,308 @@
+"""
+Dog name variant merging used by calculate_rating._merge_dog_variants().
+
+The same dog shows up under several dog ids for one handler ("day" vs
+"daylight neverending force", call name vs registered name). Three strategies
+decide which dog ids of a handler are the same dog; they are applied per
+handler in a fixed order and every decision depends on the merges made
+before it:
+
+1. Call name prefix: a short dog id (1-2 words) whose first word is a prefix
+   of the first word of a longer dog id absorbs the longer one.
+2. Registered name overlap: two dog ids whose registered names share three
+   consecutive words from the start of one name (see registered_names_match)
+   are merged into the one with fewer words.
+3. Call name in registered name: a single-word dog id absorbs any dog id with
+   that word in one of its registered names.
+
+dog_variant_merge_map() finds candidates for handlers with many dog ids
+through per-handler indexes (a first-word prefix trie for strategy 1,
+inverted indexes of registered-name 3-word windows and words for strategies
+2 and 3); small handlers keep the original pair enumeration. Merges are
+recorded in a union-find forest. dog_variant_merge_map_pairwise() enumerates
+pairs for every handler and is the reference for bench_merge_dog_variants.py;
+all paths return the same mapping.
+"""
+
+from collections import defaultdict
+
+# Registered names match on this many consecutive words ...
+REG_MATCH_WORDS = 3
+# ... starting at one of the first REG_MATCH_MAX_OFFSET words of either name.
+REG_MATCH_MAX_OFFSET = 2
+# Handlers with fewer dog ids than this are cheaper to compare pairwise than
+# to index (the index setup dominates for a handful of names).
+INDEXED_MERGE_MIN_DOGS = 8
+
+
+def registered_names_match(regs1, regs2):
+    """Check if two sets of registered names likely refer to the same dog.
+
+    Matches if any pair shares >=3 consecutive words starting from the
+    beginning of at least one name (prefix match). This avoids false
+    positives from shared kennel name suffixes like "from Malibo Land".
+    """
+    for r1 in regs1:
+        w1 = r1.split()
+        for r2 in regs2:
+            w2 = r2.split()
+            # Check prefix overlap: words matching from start of both names
+            prefix_match = 0
+            for a, b in zip(w1, w2):
+                if a == b:
+                    prefix_match += 1
+                else:
+                    break
+            if prefix_match >= 3:
+                return True
+
+            # Also check if one name starts from the beginning of the other
+            # at some offset (e.g., "A3Ch Finrod Frances..." vs "Finrod Frances...")
+            for offset in range(1, min(3, len(w1))):
+                match = 0
+                for a, b in zip(w1[offset:], w2):
+                    if a == b:
+                        match += 1
+                    else:
+                        break
+                if match >= 3:
+                    return True
+            for offset in range(1, min(3, len(w2))):
+                match = 0
+                for a, b in zip(w1, w2[offset:]):
+                    if a == b:
+                        match += 1
+                    else:
+                        break
+                if match >= 3:
+                    return True
+    return False
+
+
+class MergeForest:
+    """Union-find over team ids where every merge points src at dst.
+
+    Merges only ever join two current roots (a merged-away id is never used
+    as either side again), so the root of a tree is the id its members
+    resolve to, exactly like following the legacy merge_map chains.
+    """
+
+    def __init__(self):
+        self.parent = {}
+
+    def is_merged(self, tid):
+        return tid in self.parent
+
+    def merge(self, src, dst):
+        self.parent[src] = dst
+
+    def find(self, tid):
+        root = tid
+        while root in self.parent:
+            root = self.parent[root]
+        # Path compression.
+        while tid != root:
+            self.parent[tid], tid = root, self.parent[tid]
+        return root
+
+    def merge_map(self):
+        """{merged team_id: surviving team_id} in merge order."""
+        return {tid: self.find(tid) for tid in list(self.parent)}
+
+
+class PrefixTrie:
+    """Character trie mapping words to the values inserted under them."""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, word, value):
+        node = self.root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append(value)
+
+    def prefixes_of(self, word):
+        """Values stored under every prefix of word (including word itself)."""
+        node = self.root
+        found = list(node.get(None, ()))
+        for ch in word:
+            node = node.get(ch)
+            if node is None:
+                break
+            found.extend(node.get(None, ()))
+        return found
+
+
+def _reg_keys(reg):
+    """(prefix key, window keys) of one registered name.
+
+    Two names match (registered_names_match) exactly when the prefix key of
+    one is among the window keys of the other.
+    """
+    words = tuple(reg.split())
+    if len(words) < REG_MATCH_WORDS:
+        return None, ()
+    windows = {
+        words[offset:offset + REG_MATCH_WORDS]
+        for offset in range(min(REG_MATCH_MAX_OFFSET + 1, len(words) - REG_MATCH_WORDS + 1))
+    }
+    return words[:REG_MATCH_WORDS], windows
+
+
+def _handler_merges(handler, dogs, regnames, forest):
+    """Apply the three strategies to one handler's dog ids (sorted, >= 2)."""
+    tids = [f"{handler}|||{d}" for d in dogs]
+    dog_words = [d.split() for d in dogs]
+
+    # Strategy 1: call name prefix match. For each longer dog id the first
+    # short id (in sorted order) whose first word prefixes its first word wins.
+    trie = PrefixTrie()
+    for i, words in enumerate(dog_words):
+        if 1 <= len(words) <= 2:
+            trie.insert(words[0], i)
+    if trie.root:
+        for j, words in enumerate(dog_words):
+            if len(words) < 2:
+                continue
+            candidates = [i for i in trie.prefixes_of(words[0]) if len(dog_words[i]) < len(words)]
+            if candidates and not forest.is_merged(tids[j]):
+                forest.merge(tids[j], tids[min(candidates)])
+
+    regs_by_dog = [regnames.get((handler, d)) for d in dogs]
+    with_regs = [pos for pos, regs in enumerate(regs_by_dog) if regs]
+    if not with_regs:
+        return
+
+    # Inverted indexes over the registered names of this handler's dogs.
+    prefix_index = defaultdict(set)   # 3-word prefix -> dog positions
+    window_index = defaultdict(set)   # 3-word window at offset 0..2 -> dog positions
+    word_index = defaultdict(set)     # registered-name word -> dog positions
+    dog_keys = {}
+    for pos in with_regs:
+        keys = []
+        for reg in regs_by_dog[pos]:
+            prefix, windows = _reg_keys(reg)
+            if prefix is not None:
+                prefix_index[prefix].add(pos)
+                for window in windows:
+                    window_index[window].add(pos)
+                keys.append((prefix, windows))
+            for word in reg.split():
+                word_index[word].add(pos)
+        dog_keys[pos] = keys
+
+    # Strategy 2: registered name overlap, pairs (i, j > i) in sorted order.
+    # Sorting puts the id with fewer words first, so j always merges into i.
+    if len(with_regs) > 1:
+        for i in with_regs:
+            if forest.is_merged(tids[i]):
+                continue
+            candidates = set()
+            for prefix, windows in dog_keys[i]:
+                candidates.update(window_index.get(prefix, ()))
+                for window in windows:
+                    candidates.update(prefix_index.get(window, ()))
+            for j in sorted(c for c in candidates if c > i):
+                if forest.is_merged(tids[j]):
+                    continue
+                if registered_names_match(regs_by_dog[i], regs_by_dog[j]):
+                    forest.merge(tids[j], tids[i])
+
+    # Strategy 3: single-word call name appears as a word in a registered name.
+    for i, words in enumerate(dog_words):
+        if len(words) != 1 or words[0] != dogs[i] or forest.is_merged(tids[i]):
+            continue
+        hits = word_index.get(dogs[i])
+        if not hits:
+            continue
+        for j in sorted(hits):
+            if j != i and not forest.is_merged(tids[j]):
+                forest.merge(tids[j], tids[i])
+
+
+def _handler_merges_pairwise(handler, dogs, regnames, forest):
+    """Same decisions as _handler_merges() by enumerating every pair.
+
+    Cheaper than building indexes for handlers with only a few dog ids.
+    """
+    # Strategy 1: call name prefix match
+    for i, short in enumerate(dogs):
+        short_words = short.split()
+        if len(short_words) > 2 or not short:
+            continue
+        for long in dogs[i + 1:]:
+            long_words = long.split()
+            if len(long_words) <= len(short_words):
+                continue
+            if long_words[0].startswith(short_words[0]):
+                long_tid = f"{handler}|||{long}"
+                if not forest.is_merged(long_tid):
+                    forest.merge(long_tid, f"{handler}|||{short}")
+
+    # Strategy 2: registered name overlap
+    # For each pair of dog_ids, check if their registered names overlap
+    for i, d1 in enumerate(dogs):
+        for d2 in dogs[i + 1:]:
+            tid1 = f"{handler}|||{d1}"
+            tid2 = f"{handler}|||{d2}"
+            # Skip if already merged
+            if forest.is_merged(tid1) or forest.is_merged(tid2):
+                continue
+            regs1 = regnames.get((handler, d1), set())
+            regs2 = regnames.get((handler, d2), set())
+            if not regs1 or not regs2:
+                continue
+            if registered_names_match(regs1, regs2):
+                # Prefer the team_id with the shorter dog part (call name)
+                if len(d1.split()) <= len(d2.split()):
+                    forest.merge(tid2, tid1)
+                else:
+                    forest.merge(tid1, tid2)
+
+    # Strategy 3: call name appears as a word in registered name
+    # e.g., call="crocodile" matches reg="a3ch crocodile yabalute"
+    for i, d1 in enumerate(dogs):
+        w1 = d1.split()
+        if len(w1) != 1 or not d1:
+            continue  # only single-word call names
+        for d2 in dogs:
+            if d1 == d2:
+                continue
+            tid1 = f"{handler}|||{d1}"
+            tid2 = f"{handler}|||{d2}"
+            if forest.is_merged(tid1) or forest.is_merged(tid2):
+                continue
+            # Check if d1 (call name) appears as a word in the registered
+            # names associated with d2
+            regs2 = regnames.get((handler, d2), set())
+            for reg in regs2:
+                if d1 in reg.split():
+                    forest.merge(tid2, tid1)
+                    break
+
+
+def dog_variant_merge_map(handler_dogs, handler_dog_regnames, min_indexed_dogs=INDEXED_MERGE_MIN_DOGS):
+    """Merge decisions for all handlers.
+
+    handler_dogs: handler -> set of dog ids; handler_dog_regnames:
+    (handler, dog_id) -> set of registered names. Handlers with at least
+    min_indexed_dogs dog ids go through the indexes, the rest through plain
+    pair enumeration (min_indexed_dogs=None: never index). Returns
+    {team_id: canonical team_id} with transitive merges resolved.
+    """
+    forest = MergeForest()
+    for handler in sorted(handler_dogs.keys()):
+        dogs = sorted(handler_dogs[handler], key=lambda d: (len(d.split()), d))
+        if len(dogs) < 2:
+            continue
+        if min_indexed_dogs is not None and len(dogs) >= min_indexed_dogs:
+            _handler_merges(handler, dogs, handler_dog_regnames, forest)
+        else:
+            _handler_merges_pairwise(handler, dogs, handler_dog_regnames, forest)
+    return forest.merge_map()
+
+
+def dog_variant_merge_map_pairwise(handler_dogs, handler_dog_regnames):
+    """All-pairs decisions for every handler (the pre-index behaviour)."""
+    return dog_variant_merge_map(handler_dogs, handler_dog_regnames, min_indexed_dogs=None)
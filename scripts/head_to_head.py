@@ -0,0 +1,275 @@
+"""
+Head-to-head index: how often two teams met and who finished ahead.
+
+With RatingPipeline(head_to_head=True) every state gets a HeadToHeadBuilder
+that takes each prepared round as it is rated (rnd.entries, whatever the
+strategy rates) and appends one encounter per pair of teams in it, as
+int32/int8 arrays: lower team index, higher team index, outcome for the
+lower index (+1 ahead, -1 behind, 0 tied, e.g. both eliminated) and the
+round id. Memory is proportional to the encounters; nothing is rescanned.
+
+HeadToHeadBuilder.build() sorts the encounters by pair (stable, so each
+pair's rounds stay chronological) into a HeadToHead of flat arrays:
+
+  pairs      pair_lo, pair_hi, meetings, lo_wins, hi_wins per distinct pair;
+             pair p met in rounds[round_offsets[p]:round_offsets[p + 1]]
+  CSR        team i's opponents are opponent[offsets[i]:offsets[i + 1]]
+             (sorted), edge_pair pointing at their pair
+  hash       slots: open-addressing table (linear probing, power-of-two
+             size, at most half full) of pair indexes keyed on (lo, hi)
+  rounds     round_comp, round_key, round_date per round id
+
+pair(a, b) is a hash probe, O(1) expected; rivals(team_id) reads one CSR
+row. save()/load() round-trip the arrays through one .npz.
+
+team_rivals.py records and queries the index from the command line.
+"""
+
+import os
+
+import numpy as np
+
+from run_table import StringPool
+
+# 64-bit multiplicative hash constant (2^64 / golden ratio).
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+PAIR_COLUMNS = {
+    "pair_lo": np.int32,
+    "pair_hi": np.int32,
+    "meetings": np.int32,
+    "lo_wins": np.int32,
+    "hi_wins": np.int32,
+}
+
+
+class HeadToHeadBuilder:
+    """Append-only encounters of one size's rating run."""
+
+    def __init__(self):
+        self.team_ids = StringPool()
+        self._lo = []
+        self._hi = []
+        self._outcome = []
+        self._round = []
+        self._rounds = []    # (comp index, round key index, date ordinal) per round id
+        self._pair_indexes = {}
+
+    def record(self, rnd, date_ordinal):
+        """Append the encounters of one prepared round."""
+        entries = rnd.entries
+        round_id = len(self._rounds)
+        self._rounds.append((rnd.comp, rnd.round, date_ordinal))
+        if len(entries) < 2:
+            return
+        team = np.array([self.team_ids.intern(team_id) for team_id, _, _ in entries], dtype=np.int32)
+        rank = np.array([rank for _, rank, _ in entries], dtype=np.int32)
+        first, second = self._pairs(len(entries))
+        swap = team[first] > team[second]
+        lo = np.where(swap, second, first)
+        hi = np.where(swap, first, second)
+        self._lo.append(team[lo])
+        self._hi.append(team[hi])
+        self._outcome.append(np.sign(rank[hi] - rank[lo]).astype(np.int8))
+        self._round.append(np.full(len(lo), round_id, dtype=np.int32))
+
+    def _pairs(self, num):
+        pairs = self._pair_indexes.get(num)
+        if pairs is None:
+            pairs = self._pair_indexes[num] = np.triu_indices(num, 1)
+        return pairs
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_pair_indexes"] = {}
+        return state
+
+    def build(self, runs):
+        """Freeze into a HeadToHead (runs: the RunTable the rounds came from)."""
+        num_teams = len(self.team_ids)
+        lo = _concat(self._lo, np.int32)
+        hi = _concat(self._hi, np.int32)
+        outcome = _concat(self._outcome, np.int8)
+        round_ids = _concat(self._round, np.int32)
+
+        key = lo.astype(np.int64) * num_teams + hi
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) else np.zeros(0, dtype=np.int64)
+        round_offsets = np.r_[starts, len(key)].astype(np.int64)
+        outcome = outcome[order]
+        columns = {
+            "pair_lo": lo[order][starts],
+            "pair_hi": hi[order][starts],
+            "meetings": np.diff(round_offsets).astype(np.int32),
+            "lo_wins": _segment_count(outcome > 0, round_offsets),
+            "hi_wins": _segment_count(outcome < 0, round_offsets),
+        }
+
+        # Both directions of every pair, grouped by team.
+        num_pairs = len(starts)
+        source = np.r_[columns["pair_lo"], columns["pair_hi"]]
+        target = np.r_[columns["pair_hi"], columns["pair_lo"]]
+        edge_order = np.lexsort((target, source))
+        offsets = np.zeros(num_teams + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source, minlength=num_teams), out=offsets[1:])
+
+        comps = runs.comps
+        return HeadToHead(
+            list(self.team_ids.values), columns, round_offsets, round_ids[order],
+            offsets, target[edge_order].astype(np.int32),
+            (edge_order % max(num_pairs, 1)).astype(np.int32),
+            build_slots(columns["pair_lo"], columns["pair_hi"], num_teams),
+            [comps.dirs[comp] for comp, _, _ in self._rounds],
+            [runs.round_keys[round_idx] for _, round_idx, _ in self._rounds],
+            np.array([date_ordinal for _, _, date_ordinal in self._rounds], dtype=np.int32),
+        )
+
+
+def _concat(chunks, dtype):
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+
+def _segment_count(mask, offsets):
+    """True values of mask per segment offsets[i]:offsets[i + 1]."""
+    cumulative = np.r_[0, np.cumsum(mask, dtype=np.int64)]
+    return (cumulative[offsets[1:]] - cumulative[offsets[:-1]]).astype(np.int32)
+
+
+def _slot_hash(lo, hi, num_teams, bits):
+    key = lo.astype(np.uint64) * np.uint64(num_teams) + hi.astype(np.uint64)
+    return ((key * HASH_MULTIPLIER) >> np.uint64(64 - bits)).astype(np.int64)
+
+
+def _slot_bits(num_pairs):
+    return max(1, int(2 * num_pairs - 1).bit_length())
+
+
+def build_slots(pair_lo, pair_hi, num_teams):
+    """Linear-probing table of pair indexes (-1 = empty), at most half full.
+
+    Inserted in rounds: each round every pending pair tries its current
+    slot, the first pair per free slot takes it and the rest move one slot
+    on. Slots are never freed, so every slot between a pair's hash and its
+    final slot is taken, which is all a linear-probing lookup needs.
+    """
+    bits = _slot_bits(len(pair_lo))
+    mask = (1 << bits) - 1
+    slots = np.full(1 << bits, -1, dtype=np.int32)
+    pending = np.arange(len(pair_lo), dtype=np.int64)
+    position = _slot_hash(pair_lo, pair_hi, num_teams, bits)
+    while len(pending):
+        free = slots[position] < 0
+        _, first = np.unique(position[free], return_index=True)
+        taken = np.flatnonzero(free)[first]
+        slots[position[taken]] = pending[taken]
+        keep = np.ones(len(pending), dtype=bool)
+        keep[taken] = False
+        pending = pending[keep]
+        position = (position[keep] + 1) & mask
+    return slots
+
+
+class HeadToHead:
+    """Encounters of one size grouped by pair and by team (see module docstring)."""
+
+    def __init__(self, team_ids, columns, round_offsets, rounds, offsets, opponent, edge_pair, slots,
+                 round_comp, round_key, round_date):
+        self.team_ids = team_ids
+        self.columns = columns
+        self.round_offsets = round_offsets
+        self.rounds = rounds
+        self.offsets = offsets
+        self.opponent = opponent
+        self.edge_pair = edge_pair
+        self.slots = slots
+        self.round_comp = round_comp
+        self.round_key = round_key
+        self.round_date = round_date
+        self.index = {team_id: idx for idx, team_id in enumerate(team_ids)}
+        self._bits = int(len(slots)).bit_length() - 1
+
+    def __len__(self):
+        return len(self.columns["meetings"])
+
+    def __contains__(self, team_id):
+        return team_id in self.index
+
+    def _find(self, a, b):
+        lo, hi = min(a, b), max(a, b)
+        mask = len(self.slots) - 1
+        pair_lo = self.columns["pair_lo"]
+        pair_hi = self.columns["pair_hi"]
+        position = int(_slot_hash(np.array([lo]), np.array([hi]), len(self.team_ids), self._bits)[0])
+        while True:
+            pair = int(self.slots[position])
+            if pair < 0:
+                return None
+            if pair_lo[pair] == lo and pair_hi[pair] == hi:
+                return pair
+            position = (position + 1) & mask
+
+    def _record(self, team, opponent, pair):
+        cols = self.columns
+        wins, losses = int(cols["lo_wins"][pair]), int(cols["hi_wins"][pair])
+        if team > opponent:
+            wins, losses = losses, wins
+        meetings = int(cols["meetings"][pair])
+        return {
+            "opponent": self.team_ids[opponent],
+            "meetings": meetings,
+            "wins": wins,
+            "losses": losses,
+            "ties": meetings - wins - losses,
+        }
+
+    def pair(self, team_a, team_b):
+        """{opponent, meetings, wins, losses, ties, rounds} from team_a's side, or None."""
+        a, b = self.index.get(team_a), self.index.get(team_b)
+        if a is None or b is None or a == b:
+            return None
+        pair = self._find(a, b)
+        if pair is None:
+            return None
+        record = self._record(a, b, pair)
+        record["rounds"] = self.rounds[self.round_offsets[pair]:self.round_offsets[pair + 1]].tolist()
+        return record
+
+    def rivals(self, team_id, top=10):
+        """team_id's most frequent opponents: [record, ...] (pair() without rounds).
+
+        Ordered by meetings, then by the closest win/loss balance.
+        """
+        idx = self.index.get(team_id)
+        if idx is None:
+            return []
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        pairs = self.edge_pair[start:end]
+        opponents = self.opponent[start:end]
+        cols = self.columns
+        balance = np.abs(cols["lo_wins"][pairs] - cols["hi_wins"][pairs])
+        order = np.lexsort((opponents, balance, -cols["meetings"][pairs]))[:top]
+        return [self._record(idx, int(opponents[pos]), int(pairs[pos])) for pos in order.tolist()]
+
+    def round_label(self, round_id):
+        """(competition dir, round key, date ordinal) of a round id."""
+        return self.round_comp[round_id], self.round_key[round_id], int(self.round_date[round_id])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path, team_ids=np.asarray(self.team_ids, dtype=str), round_offsets=self.round_offsets,
+            rounds=self.rounds, offsets=self.offsets, opponent=self.opponent, edge_pair=self.edge_pair,
+            slots=self.slots, round_comp=np.asarray(self.round_comp, dtype=str),
+            round_key=np.asarray(self.round_key, dtype=str), round_date=self.round_date, **self.columns,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in PAIR_COLUMNS}
+            return cls(
+                data["team_ids"].tolist(), columns, data["round_offsets"], data["rounds"], data["offsets"],
+                data["opponent"], data["edge_pair"], data["slots"], data["round_comp"].tolist(),
+                data["round_key"].tolist(), data["round_date"],
+            )
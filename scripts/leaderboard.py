@@ -0,0 +1,124 @@
+"""
+Ranked view of one size's payloads, shared by the output writers.
+
+Every writer used to re-sort a size's teams and rescan them for its
+eligibility filter, row count and country list. A Leaderboard sorts a size
+once (descending score, ties in payload order like sorted()) and answers
+from that order:
+
+  - eligibility: min runs, optionally active_12m; eligible() derives another
+    eligibility view from the same order without sorting again,
+  - top(n), page(number, per_page), rank_of(team_id), by_country(country)
+    and countries(), from the ranked rows and a country -> rows index,
+  - rerank(score_key): the same teams ranked by another score, ties kept in
+    the current rank order (e.g. the previous-window ranking for trends).
+
+Teams whose score is None are not ranked.
+
+leaderboards() builds one per size; writers take those instead of
+all_ratings so the CSV and HTML of a calculator share them.
+"""
+
+import numpy as np
+
+from rating_postprocess import column, ranked_mask
+
+
+class Leaderboard:
+    """One size's teams ranked by score_key, restricted to eligible teams."""
+
+    def __init__(self, size_results, score_key, min_runs=0, active_only=False, order=None):
+        self.size_results = size_results
+        self.score_key = score_key
+        self.min_runs = min_runs
+        self.active_only = active_only
+        self.team_ids = list(size_results)
+        self.teams = list(size_results.values())
+        scores = column(size_results, score_key)
+        if order is None:
+            order = np.argsort(-scores, kind="stable")
+        self.order = order
+
+        self.min_runs_mask = ranked_mask(size_results, min_runs)
+        self.active_mask = np.fromiter(
+            (team.get("active_12m", False) for team in self.teams), dtype=bool, count=len(self.teams),
+        )
+        eligible = self.min_runs_mask & ~np.isnan(scores)
+        if active_only:
+            eligible &= self.active_mask
+        self.rows = order[eligible[order]]
+        self.ranks = np.zeros(len(self.teams), dtype=np.int64)
+        self.ranks[self.rows] = np.arange(1, len(self.rows) + 1)
+        self._row_of = None
+        self._country_rows = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        """(rank, team) pairs, best first."""
+        for rank, row in enumerate(self.rows.tolist(), 1):
+            yield rank, self.teams[row]
+
+    def eligible(self, min_runs=0, active_only=False):
+        """Another eligibility view of the same size, sharing the sort order."""
+        return Leaderboard(self.size_results, self.score_key, min_runs, active_only, self.order)
+
+    def rerank(self, score_key):
+        """These teams ranked by score_key; ties keep their current order."""
+        scores = column(self.size_results, score_key)
+        rows = self.rows[~np.isnan(scores[self.rows])]
+        order = rows[np.argsort(-scores[rows], kind="stable")]
+        return Leaderboard(self.size_results, score_key, self.min_runs, self.active_only, order)
+
+    def ranked(self):
+        """Eligible teams, best first."""
+        return [self.teams[row] for row in self.rows.tolist()]
+
+    def ranked_team_ids(self):
+        """Team ids of the eligible teams, best first."""
+        return [self.team_ids[row] for row in self.rows.tolist()]
+
+    def top(self, n):
+        return [self.teams[row] for row in self.rows[:n].tolist()]
+
+    def page(self, number, per_page):
+        """Teams on 1-based page number."""
+        start = (number - 1) * per_page
+        return [self.teams[row] for row in self.rows[start:start + per_page].tolist()]
+
+    def rank_of(self, team_id):
+        """1-based rank of team_id, or None when it is not ranked."""
+        if self._row_of is None:
+            self._row_of = {team_id: row for row, team_id in enumerate(self.team_ids)}
+        row = self._row_of.get(team_id)
+        if row is None or not self.ranks[row]:
+            return None
+        return int(self.ranks[row])
+
+    def _country_index(self):
+        if self._country_rows is None:
+            index = {}
+            for row in self.rows.tolist():
+                index.setdefault(self.teams[row]["country"], []).append(row)
+            self._country_rows = index
+        return self._country_rows
+
+    def countries(self):
+        """Sorted non-empty countries of the ranked teams."""
+        return sorted(country for country in self._country_index() if country)
+
+    def by_country(self, country):
+        """(rank, team) pairs of one country, best first."""
+        return [
+            (int(self.ranks[row]), self.teams[row])
+            for row in self._country_index().get(country, [])
+        ]
+
+
+def leaderboards(all_ratings, score_key, min_runs=0, active_only=False):
+    """{size: Leaderboard} of every size."""
+    return {
+        size: Leaderboard(size_results, score_key, min_runs, active_only)
+        for size, size_results in all_ratings.items()
+    }
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Live leaderboard of one size as it stood on a past date.
+
+as_of() rates the live window ending on that date ([date -
+LIVE_WINDOW_DAYS, date]) with LiveFinalStrategy and applies the same
+post-processing as calculate_rating_live_final.py (podium boost,
+normalization, tiers). With rating checkpoints the window's series is
+binary-searched for the newest checkpoint at or before the date and only
+the competitions after it are replayed (RatingPipeline.rate_size_as_of());
+the first query for a window start builds that series.
+
+Usage:
+  python scripts/live_as_of.py --date 2025-07-20 --size Large [--top 20]
+"""
+
+import sys
+import time
+from datetime import date, timedelta
+
+import calculate_rating as base
+import calculate_rating_live_final as live_final
+from leaderboard import Leaderboard
+
+DEFAULT_TOP = 20
+
+
+def as_of(pipeline, profiles, as_of_date, size):
+    """Live payloads {team_id: {...}} of size as of as_of_date (inclusive)."""
+    if isinstance(as_of_date, str):
+        as_of_date = date.fromisoformat(as_of_date)
+    since = as_of_date - timedelta(days=live_final.LIVE_WINDOW_DAYS)
+    state = pipeline.rate_size_as_of(size, live_final.LiveFinalStrategy(), as_of_date, since=since)
+    size_ratings = {size: live_final.live_size_results(state, profiles)}
+    live_final.normalize_live_ratings(size_ratings)
+    live_final.assign_live_tiers(size_ratings)
+    return size_ratings[size]
+
+
+def ranked(size_results):
+    """Teams eligible for the live ranking, best first."""
+    return Leaderboard(size_results, "rating", live_final.MIN_RUNS_FOR_LIVE_RANKING).ranked()
+
+
+def main():
+    parser = base.build_arg_parser("Live leaderboard of one size as of a past date.")
+    parser.add_argument("--date", required=True, type=date.fromisoformat, help="as-of date (YYYY-MM-DD)")
+    parser.add_argument("--size", required=True, help="size label, e.g. Large")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"rows to print (default: {DEFAULT_TOP})")
+    args = parser.parse_args()
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    profiles = base.build_team_profiles(runs)
+    pipeline = base.pipeline_from_args(runs, args)
+
+    t0 = time.perf_counter()
+    size_results = as_of(pipeline, profiles, args.date, args.size)
+    elapsed = time.perf_counter() - t0
+
+    teams = ranked(size_results)
+    print(f"\n{args.size} live leaderboard as of {args.date.isoformat()} "
+          f"({len(teams)} ranked of {len(size_results)} rated teams, {elapsed * 1000:.0f} ms)")
+    for rank, team in enumerate(teams[:args.top], 1):
+        print(f"  {rank:>3}. {team['rating']:7.1f}  {team['handler']} / {team['dog']} "
+              f"({team['country']})  {team['skill_tier']}  {team['num_runs']} runs")
+    if pipeline.checkpoints is not None:
+        print(pipeline.checkpoints.summary())
+    return 0 if size_results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Checkpoint planning for the sliding live window.
+
+calculate_live_ratings() rates [latest_date - LIVE_WINDOW_DAYS, latest_date].
+Rating checkpoint series are keyed by window start, snapped to the first
+competition date on or after it (RatingPipeline.window_start()). While new
+data does not push the start past a competition date, a rebuild resumes from
+the previous run and replays only the new competitions. Once the start
+passes a competition date, the window needs a series that has only seen
+data from the new start on, and without one it is rated from scratch.
+
+LiveWindowPlanner keeps those series ready: after rating the current window
+it also advances the series of every competition date the window start will
+reach within lookahead_days. When the window slides onto one of them, its
+series is already rated up to the previous build and only the new rounds
+are replayed. summary() reports the replay work against full rebuilds.
+
+The lookahead only runs once the current window itself resumed from
+checkpoints in every size: a cold build (empty or outdated store) would
+otherwise rate every upcoming start from scratch on top of the window,
+for series a warm store builds up over the following runs anyway.
+Without a CheckpointStore on the pipeline the planner only rates the
+current window.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+# How far ahead (in days of window slide) start series are kept rated.
+LOOKAHEAD_DAYS = 30
+
+
+class LiveWindowPlanner:
+    """Rates a sliding window and keeps upcoming window starts' series warm."""
+
+    def __init__(self, pipeline, window_days, lookahead_days=LOOKAHEAD_DAYS):
+        self.pipeline = pipeline
+        self.window_days = window_days
+        self.lookahead_days = lookahead_days
+        self.stats = {}
+
+    def window_start(self, latest_date):
+        return latest_date - timedelta(days=self.window_days)
+
+    def lookahead_starts(self, latest_date):
+        """Window starts (competition dates) reached within lookahead_days."""
+        since = self.window_start(latest_date)
+        first = self.pipeline.window_start(since)
+        last = self.pipeline.window_start(since + timedelta(days=self.lookahead_days))
+        if first is None or last is None:
+            return []
+        ordinals = np.unique(self.pipeline.runs.comps.date_ordinal)
+        return [
+            date.fromordinal(int(ordinal)) for ordinal in ordinals
+            if first.toordinal() < ordinal <= last.toordinal()
+        ]
+
+    def rate(self, strategy, make_strategy, latest_date):
+        """{size: SizeState} of the window ending at latest_date.
+
+        strategy rates the current window (and keeps its accumulators);
+        make_strategy() builds a fresh one per lookahead series.
+        """
+        checkpoints = self.pipeline.checkpoints
+        before = _counts(checkpoints)
+        states = self.pipeline.rate(strategy, since=self.window_start(latest_date))
+        after = _counts(checkpoints)
+        self.stats = {
+            "window": _delta(before, after),
+            "lookahead": (0, 0, 0, 0),
+            "lookahead_series": 0,
+        }
+        if checkpoints is None or self.pipeline.record_history:
+            return states
+        series, resumed, _, _ = self.stats["window"]
+        if not series or resumed < series:
+            return states
+
+        starts = self.lookahead_starts(latest_date)
+        for start in starts:
+            self.pipeline.advance([make_strategy()], since=start)
+        self.stats["lookahead"] = _delta(after, _counts(checkpoints))
+        self.stats["lookahead_series"] = len(starts)
+        return states
+
+    def summary(self):
+        if not self.stats:
+            return "Live window planner: not run"
+        series, resumed, competitions, replayed = self.stats["window"]
+        text = (
+            f"Live window planner: window replayed {replayed}/{competitions} competitions "
+            f"({resumed}/{series} sizes resumed, {competitions - replayed} saved)"
+        )
+        if self.stats["lookahead_series"]:
+            _, _, ahead_total, ahead_replayed = self.stats["lookahead"]
+            text += (
+                f"; {self.stats['lookahead_series']} upcoming window starts kept warm, "
+                f"replayed {ahead_replayed}/{ahead_total}"
+            )
+        return text
+
+
+def _counts(checkpoints):
+    if checkpoints is None:
+        return (0, 0, 0, 0)
+    return (checkpoints.series, checkpoints.resumed, checkpoints.competitions, checkpoints.replayed)
+
+
+def _delta(before, after):
+    return tuple(b - a for a, b in zip(before, after))
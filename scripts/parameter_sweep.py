@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Sweep rating constants and compare the resulting leaderboards.
+
+Tuning a constant used to mean editing it and rerunning the whole script.
+This runner evaluates many configurations from one load:
+
+  - a configuration overrides some of the PARAMETERS below (module
+    constants the strategies and post-processing read at call time); it is
+    applied by setting them on their modules for the duration of one
+    evaluation, so the variants run their regular calculate_* code,
+  - only the variants a swept parameter affects are evaluated,
+  - the default configuration is rated first in the parent. That prepares
+    every variant's round stream in the RatingPipeline, which the pool
+    workers then receive once through the pool initializer (inherited
+    without copying where processes fork), as in build_all.py,
+  - a variant is evaluated once per distinct setting of the parameters that
+    affect it: rows whose configurations differ only in parameters of other
+    variants share one evaluation (a grid over SIGMA_DECAY and
+    INACTIVITY_TAU rates wow once per SIGMA_DECAY value, not once per pair),
+  - the distinct (variant, setting) tasks run in parallel with --workers; no
+    checkpoints are read or written.
+
+Each row of the comparison table (printed, and written to --out as CSV)
+reports rating time, ranked teams, agreement with the default
+configuration's leaderboard (Spearman rank correlation over the teams
+ranked in both, team-weighted across sizes, and the mean top-10 overlap)
+and the walk-forward backtest of the rounds of the last --backtest-days
+(rating_backtest.py): Plackett-Luce log-likelihood per entry, its gain over
+chance, Kendall tau and top-3 hit rate. Higher is better for all four.
+
+Grid: the product of every --grid NAME=v1,v2,... list.
+Random search: --random N samples, each parameter drawn uniformly from its
+--range NAME=lo:hi (rounded to 4 decimals), reproducible with --seed.
+
+Usage:
+  python scripts/parameter_sweep.py --grid SIGMA_DECAY=0.9,0.95,0.99 --workers 4
+  python scripts/parameter_sweep.py --random 200 --range PODIUM_BOOST_BASE=0.8:0.95 \\
+      --range LIVE_SIGMA_DECAY=0.97:1 --workers 8
+"""
+
+import contextlib
+import csv
+import io
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+import calculate_rating as base
+import calculate_rating_disfocus_variant as disfocus
+import calculate_rating_live_final as live_final
+import calculate_rating_live_variant as live_variant
+import calculate_rating_wow_variant as wow
+from leaderboard import leaderboards
+from rating_backtest import DEFAULT_BACKTEST_DAYS, Backtest
+from rating_pipeline import RatingPipeline
+
+DEFAULT_OUT = os.path.join(base.OUTPUT_DIR, "sweep.csv")
+DEFAULT_SEED = 0
+TOP_N = 10
+
+# Table columns after config, variant and the swept parameters.
+RESULT_COLUMNS = ["seconds", "ranked", "spearman", "top10_overlap", "loglik", "gain", "tau", "top3"]
+
+
+def _base_boards(runs, profiles, pipeline):
+    return leaderboards(base.calculate_ratings(runs, profiles, pipeline=pipeline),
+                        "displayed_rating", base.MIN_RUNS_FOR_RANKING)
+
+
+def _wow_boards(runs, profiles, pipeline):
+    return leaderboards(wow.calculate_ratings_wow(runs, profiles, pipeline=pipeline),
+                        "displayed_rating", wow.MIN_CLEAN_RUNS_FOR_RANKING)
+
+
+def _disfocus_boards(runs, profiles, pipeline):
+    return leaderboards(disfocus.calculate_ratings_disfocus(runs, profiles, pipeline=pipeline),
+                        "displayed_rating", base.MIN_RUNS_FOR_RANKING)
+
+
+def _live_final_boards(runs, profiles, pipeline):
+    all_ratings = live_final.calculate_live_ratings(runs, profiles, pipeline=pipeline)[0]
+    return leaderboards(all_ratings, "rating", live_final.MIN_RUNS_FOR_LIVE_RANKING)
+
+
+def _live_variant_boards(runs, profiles, pipeline):
+    return live_variant.active_leaderboards(live_variant.calculate_active(runs, profiles, pipeline))
+
+
+# Variant name -> published leaderboards {size: Leaderboard} from (runs, profiles, pipeline).
+VARIANTS = {
+    "base": _base_boards,
+    "wow": _wow_boards,
+    "disfocus": _disfocus_boards,
+    "live_final": _live_final_boards,
+    "live_variant": _live_variant_boards,
+}
+
+# Sweepable constant -> (module it lives in, variants it affects).
+# Per-entry weights (MAJOR_EVENT_WEIGHT, ELIM_WEIGHT_BASE) are not listed:
+# the Plackett-Luce update normalizes a one-player team's weight to the
+# upper weight bound, so their values do not change the ratings.
+PARAMETERS = {
+    "SIGMA_DECAY": (base, ("base", "wow", "disfocus", "live_variant")),
+    "LIVE_SIGMA_DECAY": (live_final, ("live_final",)),
+    "PODIUM_BOOST_BASE": (live_final, ("live_final",)),
+    "PODIUM_BOOST_RANGE": (live_final, ("live_final",)),
+    "PODIUM_BOOST_TARGET": (live_final, ("live_final",)),
+    "INACTIVITY_TAU": (live_variant, ("live_variant",)),
+}
+
+
+@contextlib.contextmanager
+def applied(config):
+    """Set config's {parameter: value} on their modules, restoring on exit."""
+    saved = {name: getattr(PARAMETERS[name][0], name) for name in config}
+    try:
+        for name, value in config.items():
+            setattr(PARAMETERS[name][0], name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(PARAMETERS[name][0], name, value)
+
+
+def variant_config(config, variant):
+    """The part of config that affects variant, as a hashable tuple of (name, value)."""
+    return tuple((name, value) for name, value in config.items() if variant in PARAMETERS[name][1])
+
+
+def affected_variants(names):
+    """Variants (in VARIANTS order) affected by any of the parameter names."""
+    affected = {variant for name in names for variant in PARAMETERS[name][1]}
+    return [variant for variant in VARIANTS if variant in affected]
+
+
+def grid_configs(grid):
+    """Configurations of the product of grid {name: [values]}."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_configs(ranges, samples, seed=DEFAULT_SEED):
+    """samples configurations drawn uniformly from ranges {name: (lo, hi)}."""
+    rng = np.random.default_rng(seed)
+    return [
+        {name: round(float(rng.uniform(lo, hi)), 4) for name, (lo, hi) in ranges.items()}
+        for _ in range(samples)
+    ]
+
+
+def evaluate(runs, profiles, pipeline, config, variant, score_from=None):
+    """({size: ranked team ids}, seconds, backtest summary) of variant rated under config.
+
+    The backtest scores the rounds from score_from (date, None for all).
+    """
+    saved_backtest = pipeline.backtest
+    pipeline.backtest = Backtest(score_from)
+    t0 = time.perf_counter()
+    try:
+        with applied(config), contextlib.redirect_stdout(io.StringIO()):
+            boards = VARIANTS[variant](runs, profiles, pipeline)
+        elapsed = time.perf_counter() - t0
+        scores = pipeline.backtest.summary()
+    finally:
+        pipeline.backtest = saved_backtest
+    return {size: board.ranked_team_ids() for size, board in boards.items()}, elapsed, scores
+
+
+def backtest_start(runs, days):
+    """First scored date for a backtest of the last days (None: every round)."""
+    return runs.latest_date() - timedelta(days=days) if days else None
+
+
+def rank_agreement(reference_ids, ranked_ids, top_n=TOP_N):
+    """(spearman rho, top_n overlap fraction, teams compared) of two rankings of one size.
+
+    rho is computed over the teams ranked in both, re-ranked among
+    themselves; None when fewer than two are shared.
+    """
+    position = {team_id: idx for idx, team_id in enumerate(ranked_ids)}
+    common = [position[team_id] for team_id in reference_ids if team_id in position]
+    top = len(set(reference_ids[:top_n]) & set(ranked_ids[:top_n])) / top_n if reference_ids else None
+    n = len(common)
+    if n < 2:
+        return None, top, n
+    # common is in reference order; its ranks within itself give the other ranking.
+    ranks = np.empty(n, dtype=np.float64)
+    ranks[np.argsort(common, kind="stable")] = np.arange(n)
+    d = ranks - np.arange(n)
+    rho = 1.0 - 6.0 * float(np.dot(d, d)) / (n * (n * n - 1))
+    return rho, top, n
+
+
+def compare(reference, result):
+    """Agreement of result {size: ids} with reference, aggregated over sizes."""
+    rho_sum = 0.0
+    rho_teams = 0
+    tops = []
+    for size, reference_ids in reference.items():
+        rho, top, n = rank_agreement(reference_ids, result.get(size, []))
+        if rho is not None:
+            rho_sum += rho * n
+            rho_teams += n
+        if top is not None:
+            tops.append(top)
+    return {
+        "spearman": rho_sum / rho_teams if rho_teams else None,
+        "top10_overlap": sum(tops) / len(tops) if tops else None,
+    }
+
+
+# Loaded data of the current process (parent when serial, else each worker).
+_SWEEP_STATE = {}
+
+
+def _init_sweep(runs, profiles, pipeline, score_from):
+    _SWEEP_STATE["runs"] = runs
+    _SWEEP_STATE["profiles"] = profiles
+    _SWEEP_STATE["pipeline"] = pipeline
+    _SWEEP_STATE["score_from"] = score_from
+
+
+def _evaluate_task(task):
+    variant, config = task
+    return evaluate(_SWEEP_STATE["runs"], _SWEEP_STATE["profiles"], _SWEEP_STATE["pipeline"], dict(config),
+                    variant, _SWEEP_STATE["score_from"])
+
+
+def sweep(runs, profiles, configs, variants, engine=base.DEFAULT_RATING_ENGINE, workers=1,
+          backtest_days=DEFAULT_BACKTEST_DAYS):
+    """Evaluate every configuration on variants; returns the table rows.
+
+    The first row of each variant is the default configuration (the reference).
+    """
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE, engine=engine)
+    score_from = backtest_start(runs, backtest_days)
+    _init_sweep(runs, profiles, pipeline, score_from)
+    # (variant, variant_config) -> outcome; the empty setting is the reference.
+    outcomes = {(variant, ()): _evaluate_task((variant, ())) for variant in variants}
+
+    tasks = list(dict.fromkeys(
+        (variant, variant_config(config, variant)) for config in configs for variant in variants
+    ))
+    tasks = [task for task in tasks if task not in outcomes]
+    if workers > 1 and len(tasks) > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_init_sweep,
+            initargs=(runs, profiles, pipeline, score_from),
+        )
+        with pool:
+            outcomes.update(zip(tasks, pool.map(_evaluate_task, tasks)))
+    else:
+        outcomes.update((task, _evaluate_task(task)) for task in tasks)
+
+    rows = []
+    for variant in variants:
+        reference = outcomes[(variant, ())]
+        rows.append(_row("default", {}, variant, reference, reference[0]))
+    for idx, config in enumerate(configs, 1):
+        for variant in variants:
+            outcome = outcomes[(variant, variant_config(config, variant))]
+            rows.append(_row(idx, config, variant, outcome, outcomes[(variant, ())][0]))
+    return rows
+
+
+def _row(config_id, config, variant, outcome, reference):
+    result, elapsed, scores = outcome
+    row = {"config": config_id, "variant": variant}
+    row.update(config)
+    row["seconds"] = round(elapsed, 3)
+    row["ranked"] = sum(len(ids) for ids in result.values())
+    row.update(compare(reference, result))
+    row.update((key, scores[key]) for key in ("loglik", "gain", "tau", "top3"))
+    return row
+
+
+def _parse_assignments(values, parser, flag):
+    parsed = {}
+    for value in values:
+        name, sep, rest = value.partition("=")
+        if not sep or not rest:
+            parser.error(f"{flag} expects NAME=..., got {value!r}")
+        if name not in PARAMETERS:
+            parser.error(f"unknown parameter {name!r} (expected one of {', '.join(PARAMETERS)})")
+        parsed[name] = rest
+    return parsed
+
+
+def _fmt(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4f}" if abs(value) < 10 else f"{value:.1f}"
+    return str(value)
+
+
+def write_table(rows, outpath, parameter_names):
+    columns = ["config", "variant", *parameter_names, *RESULT_COLUMNS]
+    os.makedirs(os.path.dirname(outpath) or ".", exist_ok=True)
+    with open(outpath, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(["" if row.get(key) is None else row.get(key, "") for key in columns])
+
+    widths = {key: max(len(key), *(len(_fmt(row.get(key))) for row in rows)) for key in columns}
+    print("\n" + "  ".join(f"{key:>{widths[key]}}" for key in columns))
+    for row in rows:
+        print("  ".join(f"{_fmt(row.get(key)):>{widths[key]}}" for key in columns))
+    print(f"\nSweep table written to {outpath}")
+
+
+def main():
+    parser = base.build_arg_parser("Sweep rating constants and compare the resulting leaderboards.")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="values of one parameter; the grid is the product of all --grid; repeatable")
+    parser.add_argument("--random", type=int, default=0, metavar="N",
+                        help="random search: N configurations drawn from the --range bounds")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=LO:HI",
+                        help="uniform range of one parameter for --random; repeatable")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"random search seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--variant", action="append", choices=list(VARIANTS), default=[],
+                        help="variant to evaluate; repeatable (default: every variant a swept parameter affects)")
+    parser.add_argument("--backtest-days", type=int, default=DEFAULT_BACKTEST_DAYS,
+                        help=f"backtest the rounds of the last N days, 0 for all (default: {DEFAULT_BACKTEST_DAYS})")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"comparison table CSV (default: {DEFAULT_OUT})")
+    args = parser.parse_args()
+
+    if bool(args.grid) == bool(args.random):
+        parser.error("give either --grid or --random")
+    if args.grid:
+        grid = _parse_assignments(args.grid, parser, "--grid")
+        try:
+            grid = {name: [float(value) for value in values.split(",")] for name, values in grid.items()}
+        except ValueError as exc:
+            parser.error(f"--grid: {exc}")
+        configs = grid_configs(grid)
+    else:
+        ranges = _parse_assignments(args.range, parser, "--range")
+        if not ranges:
+            parser.error("--random needs at least one --range")
+        try:
+            ranges = {name: tuple(float(bound) for bound in bounds.split(":")) for name, bounds in ranges.items()}
+        except ValueError as exc:
+            parser.error(f"--range: {exc}")
+        if any(len(bounds) != 2 for bounds in ranges.values()):
+            parser.error("--range expects NAME=LO:HI")
+        configs = random_configs(ranges, args.random, args.seed)
+    variants = args.variant or affected_variants(configs[0])
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    if not len(runs):
+        print("No runs loaded. Exiting.")
+        return 1
+    profiles = base.build_team_profiles(runs)
+
+    print(f"\nSweeping {len(configs)} configurations x {len(variants)} variants ({', '.join(variants)}) "
+          f"with {args.workers} worker(s)")
+    t0 = time.perf_counter()
+    rows = sweep(runs, profiles, configs, variants, engine=args.engine, workers=args.workers,
+                 backtest_days=args.backtest_days)
+    elapsed = time.perf_counter() - t0
+    write_table(rows, args.out, list(configs[0]))
+    print(f"{len(configs)} configurations in {elapsed:.1f}s ({len(configs) * 3600 / elapsed:.0f} per hour)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+NumPy Plackett-Luce update for rounds of single-player teams.
+
+openskill's PlackettLuce.rate() works on lists of rating objects: it deep
+copies every team, builds per-team wrapper objects and loops over all
+(team, team) pairs in Python, so a 100-entry AWC round costs 10k inner
+iterations plus a few hundred allocations. The calculators only ever rate
+one-player teams, which reduces the model to a few prefix/suffix sums over
+the entries sorted by rank. rate_round() evaluates those sums with NumPy and
+updates contiguous mu/sigma arrays in place.
+
+The update follows openskill 6.x (Weng & Lin, Algorithm 4) step by step:
+
+  - sigma is widened by tau before the update (sigma' = sqrt(sigma^2 + tau^2)),
+  - c = sqrt(sum(sigma'^2 + beta^2)),
+  - sum_q[q] = sum of exp(mu_i / c) over entries ranked at or below q,
+  - a[q] = number of entries sharing q's rank,
+  - omega/delta sum over the entries ranked at or above i, scaled by
+    sigma'^2 / c and sigma'^2 / c^2 * gamma (gamma = sigma' / c),
+  - weights multiply omega/delta when omega >= 0 and divide them otherwise,
+  - sigma is floored via kappa; with limit_sigma it never exceeds its value
+    before the round.
+
+Two openskill details matter for equivalence:
+
+  - Weights are normalized per team into weight_bounds (default (1, 2)). A
+    one-player team normalizes to the upper bound, so *any* weights list
+    means weight 2.0 for every entry; only weights=None means 1.0.
+  - The tie-group mu averaging at the end of _compute() is a no-op (it
+    compares each result with the same, already updated object), so tied
+    entries keep their individual mu updates. rate_round() does not average.
+
+Sums are evaluated in a different order than openskill's loops, so results
+agree to rounding error: EQUIVALENCE_TOLERANCE bounds the absolute mu/sigma
+difference after a full calculator run (bench_plackett_luce.py checks it).
+"""
+
+import numpy as np
+
+# Max absolute mu/sigma difference accepted between the NumPy and openskill
+# engines after rating the whole data set.
+EQUIVALENCE_TOLERANCE = 1e-9
+
+
+def rate_round(mu, sigma, slots, ranks, weights=None, *, beta, kappa, tau,
+               weight_bounds=(1.0, 2.0), limit_sigma=False):
+    """Update mu[slots] / sigma[slots] in place for one ranked round.
+
+    slots: distinct indices into mu/sigma, one per entry; ranks: lower is
+    better, equal ranks tie; weights: one float per entry or None (see the
+    module docstring for openskill's normalization).
+    """
+    slots = np.asarray(slots, dtype=np.intp)
+    ranks = np.asarray(ranks)
+    order = np.argsort(ranks, kind="stable")
+    slots = slots[order]
+    ranks = ranks[order]
+    n = len(slots)
+
+    old_sigma = sigma[slots]
+    team_sigma = np.sqrt(old_sigma * old_sigma + tau * tau)
+    sigma_sq = team_sigma * team_sigma
+    team_mu = mu[slots]
+
+    c = np.sqrt(np.sum(sigma_sq + beta * beta))
+    exp_mu = np.exp(team_mu / c)
+
+    # Tie groups over the rank-sorted entries: [first, last] position of the
+    # group each entry belongs to, and its size.
+    new_group = np.empty(n, dtype=bool)
+    new_group[0] = True
+    np.not_equal(ranks[1:], ranks[:-1], out=new_group[1:])
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], n) - 1
+    group = np.cumsum(new_group) - 1
+    first = starts[group]
+    last = ends[group]
+    tie_count = (ends - starts + 1)[group].astype(np.float64)
+
+    # sum_q: exp(mu/c) summed over every entry ranked at or below q.
+    suffix = np.cumsum(exp_mu[::-1])[::-1]
+    sum_q = suffix[first]
+
+    # Prefix sums over q ranked at or above i (i's whole tie group included).
+    inv_q = 1.0 / (tie_count * sum_q)
+    prefix1 = np.cumsum(inv_q)[last]
+    prefix2 = np.cumsum(inv_q / sum_q)[last]
+
+    omega = 1.0 / tie_count - exp_mu * prefix1
+    delta = exp_mu * prefix1 - exp_mu * exp_mu * prefix2
+    omega *= sigma_sq / c
+    delta *= sigma_sq / (c * c)
+    delta *= team_sigma / c
+
+    if weights is None:
+        new_mu = team_mu + omega
+        shrink = delta
+    else:
+        if weight_bounds is not None:
+            w = np.full(n, float(weight_bounds[1]))
+        else:
+            w = np.asarray(weights, dtype=np.float64)[order]
+        positive = omega >= 0
+        new_mu = team_mu + np.where(positive, omega * w, omega / w)
+        shrink = np.where(positive, delta * w, delta / w)
+
+    new_sigma = team_sigma * np.sqrt(np.maximum(1.0 - shrink, kappa))
+    if limit_sigma:
+        np.minimum(new_sigma, old_sigma, out=new_sigma)
+
+    mu[slots] = new_mu
+    sigma[slots] = new_sigma
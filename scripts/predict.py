@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Win, podium and final odds of a startlist from the live ratings.
+
+The startlist is a CSV in the target 22-column format (normalize_csv.py)
+of which only handler, dog and size need to be filled; country is used for
+display when present. Teams are resolved with make_team_id(); a team id the
+live ratings do not know is also tried against the dog name variants of the
+same handler (dog_variants.py), as the loader merges them. Teams still
+unknown start as new teams (the model's initial mu/sigma).
+
+Each size is one field. Every sampled finishing order draws each team's
+skill from its posterior N(mu, sigma) and adds Gumbel performance noise with
+the model's per-run variance beta^2 (scale beta * sqrt(6) / pi); ordering by
+skill / scale + Gumbel is Gumbel-max sampling, so given the skill draw the
+order is Plackett-Luce with strengths exp(skill / scale). (openskill's
+update normalizes by c = sqrt(sum(sigma^2 + beta^2)) over the whole field,
+which makes a 100+ team field nearly uniform, so it is not used here.) A
+batch of orders is one (samples, teams) matrix; the top TOP_PLACES of each
+order come from one argpartition and a sort of those few.
+
+Usage:
+  python scripts/predict.py startlist.csv [--samples 100000] [--as-of 2025-07-20] [--out output/predictions.csv]
+"""
+
+import csv
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+import calculate_rating as base
+import calculate_rating_live_final as live_final
+from dog_variants import dog_variant_merge_map
+from live_as_of import as_of
+from rank_intervals import size_rng
+
+DEFAULT_SAMPLES = 100_000
+# Sampled finishing orders per batch (bounds memory to batch x teams floats).
+SAMPLE_BATCH = 10_000
+PREDICT_SEED = 20240601
+# Finishing places reported, as (column, places).
+TOP_PLACES = (("p_win", 1), ("p_top3", 3), ("p_top10", 10))
+DEFAULT_TOP = 10
+
+PREDICTION_COLUMNS = [
+    "size", "handler", "dog", "country", "known", "mu", "sigma", "rating",
+    *(name for name, _ in TOP_PLACES),
+]
+
+
+def read_startlist(path):
+    """{size: [(team_id, handler, dog, country), ...]} in startlist order.
+
+    Rows without handler, dog or size are skipped; a team listed twice in a
+    size is kept once.
+    """
+    fields = {}
+    seen = set()
+    skipped = 0
+    with open(path, newline="", encoding="utf-8") as startlist_file:
+        for row in csv.DictReader(startlist_file):
+            handler = (row.get("handler") or "").strip()
+            dog = (row.get("dog") or "").strip()
+            size = (row.get("size") or "").strip()
+            if not handler or not dog or not size:
+                skipped += 1
+                continue
+            team_id = base.make_team_id(handler, dog)
+            if (size, team_id) in seen:
+                skipped += 1
+                continue
+            seen.add((size, team_id))
+            fields.setdefault(size, []).append((team_id, handler, dog, (row.get("country") or "").strip()))
+    if skipped:
+        print(f"Skipped {skipped} startlist rows (no handler/dog/size or listed twice)")
+    return fields
+
+
+def variant_matches(runs, fields, ratings):
+    """{(size, team_id): rated team_id} for unknown startlist ids that are a
+    dog name variant of a team rated in the same size."""
+    handler_dogs, handler_dog_regnames = base._collect_handler_dogs(runs, base.IDENTITY_RESOLVER)
+    unknown = [
+        (size, team_id, dog)
+        for size, teams in fields.items()
+        for team_id, _, dog, _ in teams
+        if team_id not in ratings.get(size, {})
+    ]
+    startlist_dogs = {}
+    for _, team_id, dog in unknown:
+        handler, dog_id = team_id.split("|||", 1)
+        startlist_dogs.setdefault(handler, set(handler_dogs.get(handler, ()))).add(dog_id)
+        _, reg = base.IDENTITY_RESOLVER.parse_dog_name(dog)
+        if reg:
+            handler_dog_regnames[(handler, dog_id)].add(reg)
+    merge_map = dog_variant_merge_map(startlist_dogs, handler_dog_regnames)
+
+    matches = {}
+    for size, team_id, _ in unknown:
+        canonical = merge_map.get(team_id, team_id)
+        handler = team_id.split("|||", 1)[0]
+        for dog_id in sorted(startlist_dogs[handler]):
+            rated_id = f"{handler}|||{dog_id}"
+            if rated_id in ratings.get(size, {}) and merge_map.get(rated_id, rated_id) == canonical:
+                matches[(size, team_id)] = rated_id
+                break
+    return matches
+
+
+def finish_probabilities(mu, sigma, beta, samples, rng, batch=SAMPLE_BATCH):
+    """{column: probability array} of finishing in the TOP_PLACES of the field."""
+    num_teams = len(mu)
+    scale = beta * np.sqrt(6.0) / np.pi
+    places = min(max(top for _, top in TOP_PLACES), num_teams)
+    counts = {name: np.zeros(num_teams, dtype=np.int64) for name, _ in TOP_PLACES}
+
+    for start in range(0, samples, batch):
+        shape = (min(batch, samples - start), num_teams)
+        skill = mu + sigma * rng.standard_normal(shape)
+        # Lowest key first: -(skill / scale + Gumbel).
+        keys = -(skill / scale + rng.gumbel(size=shape))
+        if places < num_teams:
+            leaders = np.argpartition(keys, places - 1, axis=1)[:, :places]
+        else:
+            leaders = np.broadcast_to(np.arange(num_teams), keys.shape)
+        order = np.argsort(np.take_along_axis(keys, leaders, axis=1), axis=1)
+        leaders = np.take_along_axis(leaders, order, axis=1)
+        for name, top in TOP_PLACES:
+            counts[name] += np.bincount(leaders[:, :top].ravel(), minlength=num_teams)
+    return {name: counts[name] / samples for name in counts}
+
+
+def predict(fields, ratings, matches, model, samples, seed=PREDICT_SEED):
+    """{size: [row dict, ...]} best chance to win first."""
+    predictions = {}
+    for size in base.ordered_sizes(fields.keys()):
+        size_ratings = ratings.get(size, {})
+        rows = []
+        resolved = set()
+        for team_id, handler, dog, country in fields[size]:
+            team_id = matches.get((size, team_id), team_id)
+            if team_id in resolved:
+                continue
+            resolved.add(team_id)
+            team = size_ratings.get(team_id)
+            if team is None:
+                rows.append({"size": size, "handler": handler, "dog": dog, "country": country,
+                             "known": False, "mu": model.mu, "sigma": model.sigma, "rating": None})
+            else:
+                rows.append({"size": size, "handler": team["handler"], "dog": team["dog"],
+                             "country": country or team["country"], "known": True,
+                             "mu": team["mu"], "sigma": team["sigma"], "rating": team["rating"]})
+
+        mu = np.array([row["mu"] for row in rows], dtype=np.float64)
+        sigma = np.array([row["sigma"] for row in rows], dtype=np.float64)
+        probabilities = finish_probabilities(mu, sigma, model.beta, samples, size_rng(size, seed))
+        for name, values in probabilities.items():
+            for row, value in zip(rows, values.tolist()):
+                row[name] = value
+        predictions[size] = sorted(rows, key=lambda row: tuple(-row[name] for name, _ in TOP_PLACES))
+    return predictions
+
+
+def write_predictions(predictions, outpath):
+    os.makedirs(os.path.dirname(outpath) or ".", exist_ok=True)
+    with open(outpath, "w", newline="", encoding="utf-8") as out_file:
+        writer = csv.writer(out_file)
+        writer.writerow(PREDICTION_COLUMNS)
+        for rows in predictions.values():
+            for row in rows:
+                writer.writerow([
+                    row["size"],
+                    row["handler"],
+                    row["dog"],
+                    row["country"],
+                    str(row["known"]).lower(),
+                    round(row["mu"], 4),
+                    round(row["sigma"], 4),
+                    "" if row["rating"] is None else row["rating"],
+                    *(round(row[name], 4) for name, _ in TOP_PLACES),
+                ])
+    print(f"\nCSV written to {outpath}")
+
+
+def main():
+    parser = base.build_arg_parser("Win / top-3 / top-10 odds of a startlist from the live ratings.")
+    parser.add_argument("startlist", help="startlist CSV (handler, dog, size columns)")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help=f"sampled finishing orders per size (default: {DEFAULT_SAMPLES})")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="rate the live window ending on this date (default: latest competition)")
+    parser.add_argument("--seed", type=int, default=PREDICT_SEED, help=f"random seed (default: {PREDICT_SEED})")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"rows to print per size (default: {DEFAULT_TOP})")
+    parser.add_argument("--out", default=os.path.join(base.OUTPUT_DIR, "predictions.csv"),
+                        help="output CSV (default: output/predictions.csv)")
+    args = parser.parse_args()
+
+    fields = read_startlist(args.startlist)
+    if not fields:
+        print("No teams in the startlist. Exiting.")
+        return 1
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    profiles = base.build_team_profiles(runs)
+    pipeline = base.pipeline_from_args(runs, args)
+    as_of_date = args.as_of or runs.latest_date()
+    ratings = {
+        size: as_of(pipeline, profiles, as_of_date, size)
+        for size in fields
+        if size in pipeline.size_labels()
+    }
+    matches = variant_matches(runs, fields, ratings)
+    model = live_final.LiveFinalStrategy().make_model()
+
+    t0 = time.perf_counter()
+    predictions = predict(fields, ratings, matches, model, args.samples, args.seed)
+    elapsed = time.perf_counter() - t0
+
+    print(f"\nLive ratings as of {as_of_date.isoformat()}, {args.samples} sampled finishing orders per size "
+          f"({elapsed:.2f}s)")
+    for size, rows in predictions.items():
+        known = sum(row["known"] for row in rows)
+        print(f"\n{size}: {len(rows)} teams ({known} rated, {len(rows) - known} new, "
+              f"{sum(size == key[0] for key in matches)} matched by dog name variant)")
+        print(f"  {'win':>6} {'top3':>6} {'top10':>6}  team")
+        for row in rows[:args.top]:
+            print(f"  {row['p_win']:6.1%} {row['p_top3']:6.1%} {row['p_top10']:6.1%}  "
+                  f"{row['handler']} / {row['dog']} ({row['country']})" + ("" if row["known"] else "  NEW"))
+    write_predictions(predictions, args.out)
+    if pipeline.checkpoints is not None:
+        print(pipeline.checkpoints.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Monte Carlo rank uncertainty of a leaderboard.
+
+The provisional flag is one sigma cutoff; it does not say how far a team
+could really move. Here each ranked team's skill is drawn from its posterior
+N(mu, sigma) RANK_SAMPLES times and the leaderboard is re-ranked per draw.
+A draw is scored the way the leaderboard scores teams, so the caller passes
+per team the score at mu (center) and its change per sigma of skill
+(spread), e.g. mu - 3 * sigma and sigma for the baseline: the sampled score
+is center + spread * z with z ~ N(0, 1).
+
+Per team:
+
+  rank_low, rank_high   central RANK_INTERVAL_LEVEL interval of the sampled ranks
+  p_elite               share of draws inside the Elite count of the size
+                        (the top ELITE_TOP_PERCENT, counted as tier_thresholds()
+                        counts it)
+
+A size is sampled as one (draws, teams) matrix per RANK_SAMPLE_CHUNK draws
+and ranked with one argsort per chunk; sizes run in a process pool with
+workers > 1. Every size has its own generator seeded from RANK_SEED and the
+size name, so the output is reproducible and the same serial or parallel.
+"""
+
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Posterior draws per size.
+RANK_SAMPLES = 4000
+# Draws ranked per argsort batch (bounds memory to chunk x teams floats).
+RANK_SAMPLE_CHUNK = 500
+# Central interval of the sampled ranks.
+RANK_INTERVAL_LEVEL = 0.90
+RANK_SEED = 20240601
+
+
+def elite_count(num_teams, elite_top_percent):
+    """Teams at or above the Elite cutoff of rating_postprocess.tier_thresholds()."""
+    if not num_teams:
+        return 0
+    return num_teams - int((num_teams - 1) * (1.0 - elite_top_percent))
+
+
+def size_rng(size, seed=RANK_SEED):
+    """Generator of one size, independent of the other sizes and their order."""
+    return np.random.default_rng([seed, zlib.crc32(size.encode("utf-8"))])
+
+
+def sample_ranks(center, spread, samples, rng, chunk=RANK_SAMPLE_CHUNK):
+    """(samples, teams) int32 matrix of 1-based ranks of sampled scores."""
+    num_teams = len(center)
+    ranks = np.empty((samples, num_teams), dtype=np.int32)
+    positions = np.arange(1, num_teams + 1, dtype=np.int32)
+    for start in range(0, samples, chunk):
+        stop = min(start + chunk, samples)
+        scores = center + spread * rng.standard_normal((stop - start, num_teams))
+        order = np.argsort(-scores, axis=1)
+        np.put_along_axis(ranks[start:stop], order, np.broadcast_to(positions, order.shape), axis=1)
+    return ranks
+
+
+def rank_intervals(center, spread, elite, rng, samples=RANK_SAMPLES, level=RANK_INTERVAL_LEVEL):
+    """(rank_low, rank_high, p_elite) arrays of one size's ranked teams."""
+    ranks = sample_ranks(center, spread, samples, rng)
+    tail = (1.0 - level) / 2.0
+    low, high = np.quantile(ranks, [tail, 1.0 - tail], axis=0, method="inverted_cdf")
+    p_elite = np.count_nonzero(ranks <= elite, axis=0) / samples
+    return low.astype(np.int64), high.astype(np.int64), p_elite
+
+
+def _rank_intervals_task(args):
+    size, center, spread, elite, samples, level = args
+    return rank_intervals(center, spread, elite, size_rng(size), samples, level)
+
+
+def attach_rank_intervals(boards, scores, elite_top_percent, workers=1,
+                          samples=RANK_SAMPLES, level=RANK_INTERVAL_LEVEL):
+    """Set rank_low, rank_high and p_elite on every ranked team, in place.
+
+    boards: {size: Leaderboard}; scores: {size: (center, spread)} arrays in
+    the board's rank order (board.rows).
+    """
+    tasks = [
+        (size, center, spread, elite_count(len(boards[size]), elite_top_percent), samples, level)
+        for size, (center, spread) in scores.items()
+        if len(boards[size])
+    ]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            outcomes = list(pool.map(_rank_intervals_task, tasks))
+    else:
+        outcomes = [_rank_intervals_task(task) for task in tasks]
+
+    for task, (low, high, p_elite) in zip(tasks, outcomes):
+        for team, rank_low, rank_high, share in zip(
+            boards[task[0]].ranked(), low.tolist(), high.tolist(), p_elite.tolist(),
+        ):
+            team["rank_low"] = rank_low
+            team["rank_high"] = rank_high
+            team["p_elite"] = share
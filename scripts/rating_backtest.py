@@ -0,0 +1,166 @@
+"""
+Walk-forward predictive backtest of a rating run.
+
+With RatingPipeline(backtest=Backtest(...)) every rated size gets a
+RoundScorer. Just before a round is applied, the scorer predicts it from the
+ratings available at that moment and scores the prediction against the real
+result; then the round is rated as usual. Each variant is scored on every
+round of the prepared stream (rnd.entries, eliminated teams sharing last
+place), whatever its strategy rates. Ratings are the ones the strategy would
+rate the round with (RatingStrategy.effective_rating(), e.g. live_variant's
+pending inactivity inflation applied); teams not rated yet predict with the
+model's initial mu/sigma. Rounds before score_from are rated but not scored,
+so variants with different windows can be compared over the same period.
+
+Per round, vectorized over its entries:
+
+  loglik     Plackett-Luce log-likelihood of the result with strengths
+             exp(mu / scale), scale = beta * sqrt(6) / pi (Gumbel noise of
+             the model's per-run variance beta^2, as in predict.py), tied
+             ranks sharing one denominator. openskill's update-time
+             c = sqrt(sum(sigma^2 + beta^2)) over the field would make a
+             100+ team round nearly uniform and the variants hard to tell
+             apart.
+  uniform    the same for a model that knows nothing (all mu equal), so
+             loglik - uniform is the information gained over chance
+             (negative when the mu spread is overconfident for beta)
+  tau        Kendall tau-b between predicted (mu) and actual order
+  top3       share of the real top 3 the predicted top 3 contains; teams
+             tied on mu at the cut count fractionally, so the ranked entry
+             order cannot leak into the prediction
+
+Backtest keeps one scorer per (strategy config(), size), so two
+configurations of one strategy class rated into the same Backtest stay
+apart. summary() totals the log-likelihoods per entry and averages tau and
+top3 over rounds.
+"""
+
+import math
+from datetime import date
+
+import numpy as np
+
+# Default scoring period of the command-line backtests (days before the latest date).
+DEFAULT_BACKTEST_DAYS = 365
+
+BACKTEST_COLUMNS = ("loglik", "uniform", "tau", "top3", "entries")
+
+
+class RoundScorer:
+    """Prediction scores of one size's rounds, in rating order."""
+
+    def __init__(self, model, score_from=0):
+        self.default_mu = model.mu
+        self.default_sigma = model.sigma
+        self.scale = model.beta * math.sqrt(6.0) / math.pi
+        self.score_from = score_from
+        self.rows = {name: [] for name in BACKTEST_COLUMNS}
+
+    def score(self, state, comp, rnd):
+        """Score the prediction of rnd from state's current ratings."""
+        entries = rnd.entries
+        if len(entries) < 2 or state.comps.date_ordinal[comp] < self.score_from:
+            return
+        ratings = state.ratings
+        strategy = state.strategy
+        mu = np.empty(len(entries))
+        ranks = np.empty(len(entries))
+        for idx, (team_id, rank, _) in enumerate(entries):
+            if team_id in ratings:
+                mu[idx] = strategy.effective_rating(state, team_id)[0]
+            else:
+                mu[idx] = self.default_mu
+            ranks[idx] = rank
+
+        loglik, uniform = plackett_luce_loglik(mu, ranks, self.scale)
+        rows = self.rows
+        rows["loglik"].append(loglik)
+        rows["uniform"].append(uniform)
+        rows["tau"].append(kendall_tau_b(mu, ranks))
+        rows["top3"].append(top_k_hit(mu, ranks, 3))
+        rows["entries"].append(len(entries))
+
+    def __len__(self):
+        return len(self.rows["entries"])
+
+
+def plackett_luce_loglik(mu, ranks, scale):
+    """(log-likelihood, uniform-model log-likelihood) of ranks given strengths exp(mu / scale)."""
+    order = np.argsort(ranks, kind="stable")
+    strength = mu[order] / scale
+    sorted_ranks = ranks[order]
+    # Teams at or below each rank: a suffix of the sorted entries starting
+    # at the first team of that rank.
+    first = np.searchsorted(sorted_ranks, sorted_ranks, side="left")
+    shift = strength.max()
+    suffix = np.cumsum(np.exp(strength - shift)[::-1])[::-1]
+    loglik = float(np.sum(strength - shift - np.log(suffix[first])))
+    uniform = -float(np.sum(np.log(len(mu) - first)))
+    return loglik, uniform
+
+
+def kendall_tau_b(mu, ranks):
+    """Kendall tau-b of predicted (higher mu first) vs actual order; NaN if undefined."""
+    n = len(mu)
+    predicted = np.sign(mu[:, None] - mu[None, :])
+    actual = np.sign(ranks[None, :] - ranks[:, None])
+    concordance = float(np.sum(predicted * actual)) / 2.0
+    pairs = n * (n - 1) / 2.0
+    predicted_ties = (np.count_nonzero(predicted == 0) - n) / 2.0
+    actual_ties = (np.count_nonzero(actual == 0) - n) / 2.0
+    denominator = math.sqrt((pairs - predicted_ties) * (pairs - actual_ties))
+    return concordance / denominator if denominator else float("nan")
+
+
+def top_k_hit(mu, ranks, k):
+    """Expected share of the actual top k inside the predicted top k."""
+    k = min(k, len(mu))
+    cutoff = np.sort(mu)[::-1][k - 1]
+    above = mu > cutoff
+    at_cutoff = mu == cutoff
+    picked = above.astype(np.float64)
+    picked[at_cutoff] = (k - np.count_nonzero(above)) / np.count_nonzero(at_cutoff)
+    return float(np.sum(picked[ranks <= k])) / k
+
+
+def config_key(strategy):
+    """Scorer key of a strategy: its config(), order-independent."""
+    return repr(sorted(strategy.config().items()))
+
+
+class Backtest:
+    """Round scorers of a pipeline's rating runs, keyed by (strategy config, size)."""
+
+    def __init__(self, score_from=None):
+        self.score_from = score_from    # date or None (score every round)
+        self.scorers = {}
+
+    def new_scorer(self, model):
+        score_from = self.score_from.toordinal() if isinstance(self.score_from, date) else 0
+        return RoundScorer(model, score_from)
+
+    def add(self, size, state):
+        """Collect the scorer of a rated SizeState."""
+        self.scorers[(config_key(state.strategy), size)] = state.backtest
+
+    def summary(self, strategy=None):
+        """{rounds, entries, loglik, gain, tau, top3} over every size (or one strategy's config)."""
+        key = None if strategy is None else config_key(strategy)
+        rows = {name: [] for name in BACKTEST_COLUMNS}
+        for (name, _), scorer in self.scorers.items():
+            if key is None or name == key:
+                for column, values in scorer.rows.items():
+                    rows[column].extend(values)
+        entries = float(np.sum(rows["entries"])) if rows["entries"] else 0.0
+        if not entries:
+            return {"rounds": 0, "entries": 0, "loglik": None, "gain": None, "tau": None, "top3": None}
+        tau = np.asarray(rows["tau"])
+        tau = tau[~np.isnan(tau)]
+        return {
+            "rounds": len(rows["entries"]),
+            "entries": int(entries),
+            "loglik": float(np.sum(rows["loglik"])) / entries,
+            "gain": (float(np.sum(rows["loglik"])) - float(np.sum(rows["uniform"]))) / entries,
+            "tau": float(np.mean(tau)) if len(tau) else None,
+            "top3": float(np.mean(rows["top3"])),
+        }
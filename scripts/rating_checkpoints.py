@@ -0,0 +1,362 @@
+"""
+On-disk rating checkpoints for RatingPipeline.
+
+Rating a size replays every competition from the first one; adding a single
+new competition re-rates the whole history. With a CheckpointStore, the
+pipeline saves the rating state of each (strategy, size, window) after every
+competition date and, on the next run, resumes from the newest checkpoint
+that is still valid.
+
+A checkpoint is valid while the prepared rounds up to its date are
+unchanged. competition_chain() hashes the prepared competitions in order
+(competition metadata plus every round's ranked entries), each hash covering
+everything before it, so:
+
+  - data appended after the last checkpoint keeps every checkpoint valid,
+  - a results CSV changed in the past (or an identity/merge change that
+    alters team ids there) invalidates exactly the checkpoints from the
+    first affected date onward,
+  - rating only up to an earlier date (RatingPipeline.rate_size_as_of())
+    resumes from the newest checkpoint at or before it and leaves the later
+    ones in place.
+
+A checkpoint holds the state after one date: team ids in rating order, mu
+and sigma as float64 arrays indexed by team, per-team stats and the
+strategy's own accumulators. A series is two files:
+
+  <name>.log   append-only records, one per checkpoint: a full snapshot
+               every FULL_CHECKPOINT_INTERVAL checkpoints (and first), else
+               a delta against the previous checkpoint: the teams added,
+               the indexes and mu/sigma of teams whose rating changed, the
+               stats of teams that entered a round or changed rating, and
+               per strategy attribute the appended list tail, the changed
+               dict items or the new value
+  <name>.idx   the series key and (date, chain_hash, full, offset, length)
+               per checkpoint, rewritten atomically on every save
+
+Resuming reads the index and the records from the last full snapshot at or
+before the checkpoint to resume from, nothing else. Saving appends the new
+records (after cutting off the ones that no longer match) and rewrites the
+index. Strategies must only change the stats of teams entering a round (as
+every hook does), since unchanged teams are not saved again.
+
+Series are keyed by checkpoint_key(): strategy config, engine, model
+parameters, window and CHECKPOINT_VERSION, so changing any rating constant
+starts a fresh series.
+"""
+
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+# Bump when the rating loop or the checkpoint layout changes.
+CHECKPOINT_VERSION = 5
+# Checkpoints per full snapshot; the rest are deltas, so resuming replays
+# at most this many records.
+FULL_CHECKPOINT_INTERVAL = 32
+
+
+def competition_chain(prepared, comps):
+    """Checkpoint marks for prepared [(comp, [Round, ...]), ...].
+
+    Returns [(position, date, chain_hash), ...], one per competition date:
+    position of the date's last competition in prepared, and a hash covering
+    every competition up to and including it.
+    """
+    marks = []
+    digest = hashlib.sha256()
+    for pos, (comp, rounds) in enumerate(prepared):
+        digest.update(repr((
+            comps.dirs[comp], comps.names[comp], comps.dates[comp], comps.tiers[comp],
+        )).encode("utf-8"))
+        for rnd in rounds:
+            digest.update(repr((rnd.round, rnd.field_size, rnd.num_clean, rnd.entries)).encode("utf-8"))
+        date = comps.dates[comp]
+        if pos + 1 == len(prepared) or comps.dates[prepared[pos + 1][0]] != date:
+            marks.append((pos, date, digest.copy().hexdigest()))
+    return marks
+
+
+def usable_checkpoints(saved, marks):
+    """Number of leading saved checkpoints that still match marks.
+
+    saved: [(date, chain_hash, ...), ...]. Each chain hash covers everything
+    before it, so once one checkpoint matches all earlier ones do too:
+    binary search for the first mismatch.
+    """
+    lo, hi = 0, min(len(saved), len(marks))
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if saved[mid][:2] == marks[mid][1:]:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def checkpoint_key(strategy, engine, size, since, until, min_field_size):
+    """Identity of one checkpoint series (everything the ratings depend on)."""
+    model = strategy.make_model()
+    model_params = (model.mu, model.sigma, model.beta, model.kappa, model.tau,
+                    model.weight_bounds, model.limit_sigma)
+    return repr((
+        CHECKPOINT_VERSION, strategy.config(), engine, model_params,
+        size, str(since), str(until), min_field_size,
+    ))
+
+
+class CheckpointStore:
+    """Checkpoint series on disk, one log + index per (strategy, size, window)."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.series = 0
+        self.resumed = 0
+        self.competitions = 0
+        self.replayed = 0
+
+    def _path(self, key, ext):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{name}.{ext}")
+
+    def index(self, key):
+        """Saved [(date, chain_hash, full, offset, length), ...] for key, oldest first."""
+        try:
+            with open(self._path(key, "idx"), "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return []
+        if entry.get("key") != key:
+            return []
+        return entry["checkpoints"]
+
+    def load(self, key, index, position):
+        """Checkpoint position of index as a checkpoint_snapshot(), or None
+        when the log does not hold it."""
+        first = position
+        while not index[first][2]:
+            first -= 1
+        offset = index[first][3]
+        end = index[position][3] + index[position][4]
+        try:
+            with open(self._path(key, "log"), "rb") as f:
+                f.seek(offset)
+                data = f.read(end - offset)
+            if len(data) != end - offset:
+                return None
+            saved = None
+            for _, _, full, start, length in index[first:position + 1]:
+                record = pickle.loads(data[start - offset:start - offset + length])
+                saved = record if full else _apply_delta(saved, record)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        saved["stats"] = dict(zip(saved["team_ids"], saved["stats"]))
+        return saved
+
+    def writer(self, key, index, base=None):
+        """CheckpointWriter appending to the series after index (the saved
+        checkpoints kept); base: snapshot of the last of them."""
+        return CheckpointWriter(self, key, index, base)
+
+    def _write_index(self, key, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key, "idx")
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"key": key, "checkpoints": index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def record(self, resumed, competitions, replayed):
+        """Count one rated series (resumed from a checkpoint or not)."""
+        self.series += 1
+        self.resumed += int(resumed)
+        self.competitions += competitions
+        self.replayed += replayed
+
+    def fork(self):
+        """Same store with zeroed counters, for a worker process."""
+        return CheckpointStore(self.cache_dir)
+
+    def merge_counts(self, other):
+        """Add the counters of a fork() returned by a worker."""
+        self.series += other.series
+        self.resumed += other.resumed
+        self.competitions += other.competitions
+        self.replayed += other.replayed
+
+    def summary(self):
+        return (
+            f"Rating checkpoints: {self.resumed}/{self.series} series resumed, "
+            f"{self.replayed}/{self.competitions} competitions replayed ({self.cache_dir})"
+        )
+
+
+def checkpoint_snapshot(team_ids, mu, sigma, stats, strategy_vars):
+    """Checkpoint contents: team ids in rating order, mu/sigma arrays aligned
+    with them, {team_id: stats} and the strategy's attributes."""
+    return {"team_ids": team_ids, "mu": mu, "sigma": sigma, "stats": stats, "strategy": strategy_vars}
+
+
+class CheckpointWriter:
+    """Appends the checkpoints of one series as they are rated.
+
+    Records go to the log as soon as they are encoded; close() publishes
+    them in the index. Bytes past the indexed end (an interrupted save) are
+    cut off by the next writer.
+    """
+
+    def __init__(self, store, key, index, base):
+        self.store = store
+        self.key = key
+        self.index = list(index)
+        self.since_full = 0
+        for entry in reversed(self.index):
+            if entry[2]:
+                break
+            self.since_full += 1
+        self._file = None
+        self._team_index = {}
+        self._prev = None
+        if base is not None:
+            self._remember(base)
+
+    def _remember(self, snapshot):
+        for team_id in snapshot["team_ids"][len(self._team_index):]:
+            self._team_index[team_id] = len(self._team_index)
+        self._prev = {
+            "count": len(snapshot["team_ids"]),
+            "mu": snapshot["mu"],
+            "sigma": snapshot["sigma"],
+            "strategy": {name: _fingerprint(value) for name, value in snapshot["strategy"].items()},
+        }
+
+    def _open(self):
+        path = self.store._path(self.key, "log")
+        end = self.index[-1][3] + self.index[-1][4] if self.index else 0
+        os.makedirs(self.store.cache_dir, exist_ok=True)
+        # Publish the cut-down index first, so a crash below never leaves an
+        # index pointing past the log.
+        self.store._write_index(self.key, self.index)
+        self._file = open(path, "r+b" if end and os.path.exists(path) else "wb")
+        self._file.truncate(end)
+        self._file.seek(end)
+
+    def append(self, date, chain, snapshot, touched):
+        """Add the checkpoint after date; touched: ids of the teams that
+        entered a round since the previous checkpoint."""
+        if self._file is None:
+            self._open()
+        full = self._prev is None or self.since_full + 1 >= FULL_CHECKPOINT_INTERVAL
+        if full:
+            record = dict(snapshot, stats=[snapshot["stats"][team_id] for team_id in snapshot["team_ids"]])
+            self.since_full = 0
+        else:
+            record = self._delta(snapshot, touched)
+            self.since_full += 1
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        offset = self._file.tell()
+        self._file.write(data)
+        self.index.append((date, chain, full, offset, len(data)))
+        self._remember(snapshot)
+
+    def _delta(self, snapshot, touched):
+        prev = self._prev
+        count = prev["count"]
+        team_ids = snapshot["team_ids"]
+        mu, sigma = snapshot["mu"], snapshot["sigma"]
+        changed = np.flatnonzero((mu[:count] != prev["mu"]) | (sigma[:count] != prev["sigma"]))
+        changed = np.r_[changed, np.arange(count, len(team_ids))]
+        # changed covers the new teams; touched ones not known yet are new.
+        stats_index = set(changed.tolist())
+        stats_index.update(self._team_index[team_id] for team_id in touched if team_id in self._team_index)
+        stats_index = sorted(stats_index)
+        strategy = {}
+        for name, value in snapshot["strategy"].items():
+            change = _diff(prev["strategy"].get(name), value)
+            if change is not None:
+                strategy[name] = change
+        return {
+            "new_team_ids": team_ids[count:],
+            "index": changed,
+            "mu": mu[changed],
+            "sigma": sigma[changed],
+            "stats_index": stats_index,
+            "stats": [snapshot["stats"][team_ids[idx]] for idx in stats_index],
+            "strategy": strategy,
+            "removed": [name for name in prev["strategy"] if name not in snapshot["strategy"]],
+        }
+
+    def close(self):
+        """Publish the appended checkpoints."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self.store._write_index(self.key, self.index)
+
+
+_SCALARS = (int, float, str, bool)
+
+
+def _fingerprint(value):
+    # What _diff() compares the next value of an attribute against: lists
+    # by a copy (they usually only grow), dicts by their pickled items
+    # (values change in place), anything else by its pickle.
+    if type(value) is list and all(type(item) in _SCALARS for item in value):
+        return ("list", list(value))
+    if type(value) is dict:
+        return ("dict", {key: pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL) for key, item in value.items()})
+    return ("value", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _diff(fingerprint, value):
+    """Change of a strategy attribute since fingerprint, or None."""
+    if fingerprint is not None:
+        kind, prev = fingerprint
+        if kind == "list" and type(value) is list:
+            if value[:len(prev)] == prev:
+                return ("tail", len(prev), value[len(prev):]) if len(value) > len(prev) else None
+        elif kind == "dict" and type(value) is dict:
+            kept = [key for key in prev if key in value]
+            # New keys only ever go to the end of a dict; anything else is
+            # stored whole so the key order is restored exactly.
+            if list(value)[:len(kept)] == kept:
+                items = {}
+                for key, item in value.items():
+                    data = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+                    if prev.get(key) != data:
+                        items[key] = item
+                removed = [key for key in prev if key not in value]
+                return ("items", items, removed) if items or removed else None
+        elif kind == "value" and pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) == prev:
+            return None
+    return ("value", value)
+
+
+def _apply_delta(saved, delta):
+    """Checkpoint record saved (stats as a list) moved on by one delta."""
+    team_ids = saved["team_ids"] + delta["new_team_ids"]
+    mu = np.resize(saved["mu"], len(team_ids))
+    sigma = np.resize(saved["sigma"], len(team_ids))
+    mu[delta["index"]] = delta["mu"]
+    sigma[delta["index"]] = delta["sigma"]
+    stats = saved["stats"]
+    stats.extend([None] * len(delta["new_team_ids"]))
+    for idx, team_stats in zip(delta["stats_index"], delta["stats"]):
+        stats[idx] = team_stats
+    strategy = saved["strategy"]
+    for name in delta["removed"]:
+        del strategy[name]
+    for name, change in delta["strategy"].items():
+        if change[0] == "tail":
+            strategy[name] = strategy[name][:change[1]] + change[2]
+        elif change[0] == "items":
+            value = strategy[name]
+            for key in change[2]:
+                del value[key]
+            value.update(change[1])
+        else:
+            strategy[name] = change[1]
+    return checkpoint_snapshot(team_ids, mu, sigma, stats, strategy)
@@ -0,0 +1,106 @@
+"""
+Per-team rating history: mu/sigma after every rated round.
+
+A SizeState keeps only each team's current rating (plus the prev_mu /
+prev_sigma snapshot live_final takes for trend arrows). With
+RatingPipeline(record_history=True) every state also gets a
+RatingHistoryBuilder that appends one row per rated entry right after the
+round update:
+
+  round       index of the round in the size's rated round stream
+  date        competition date as a proleptic ordinal (date.toordinal())
+  mu, sigma   rating after the round
+  rank        placement in the round
+
+Rows arrive in rating order. RatingHistoryBuilder.build() sorts them by team
+(stable, so each team's rows stay chronological) into a RatingHistory:
+struct-of-arrays columns plus an offset index, team i owning rows
+offsets[i]:offsets[i + 1]. trajectory(team_id) is therefore a slice, O(that
+team's history), and save()/load() round-trip the arrays through one .npz.
+
+team_history.py records and prints histories from the command line.
+"""
+
+import os
+
+import numpy as np
+
+from run_table import StringPool
+
+# History columns and their dtypes (besides the team offset index).
+HISTORY_COLUMNS = {
+    "round": np.int32,
+    "date": np.int32,
+    "mu": np.float64,
+    "sigma": np.float64,
+    "rank": np.int32,
+}
+
+
+class RatingHistoryBuilder:
+    """Append-only rows of one size's rating run."""
+
+    def __init__(self):
+        self.team_ids = StringPool()
+        self.rounds = 0
+        self._team = []
+        self._columns = {name: [] for name in HISTORY_COLUMNS}
+
+    def record(self, date_ordinal, team_ids, ranks, ratings):
+        """Append one rated round: entries aligned with their updated ratings."""
+        cols = self._columns
+        num = len(team_ids)
+        self._team.extend(self.team_ids.intern(team_id) for team_id in team_ids)
+        cols["round"].extend([self.rounds] * num)
+        cols["date"].extend([date_ordinal] * num)
+        cols["mu"].extend(rating.mu for rating in ratings)
+        cols["sigma"].extend(rating.sigma for rating in ratings)
+        cols["rank"].extend(ranks)
+        self.rounds += 1
+
+    def build(self):
+        """Freeze into a RatingHistory grouped by team."""
+        team = np.asarray(self._team, dtype=np.int64)
+        order = np.argsort(team, kind="stable")
+        counts = np.bincount(team, minlength=len(self.team_ids))
+        offsets = np.zeros(len(self.team_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        columns = {
+            name: np.asarray(values, dtype=HISTORY_COLUMNS[name])[order]
+            for name, values in self._columns.items()
+        }
+        return RatingHistory(list(self.team_ids.values), offsets, columns)
+
+
+class RatingHistory:
+    """Rating rows grouped by team: team_ids[i] owns rows offsets[i]:offsets[i + 1]."""
+
+    def __init__(self, team_ids, offsets, columns):
+        self.team_ids = team_ids
+        self.offsets = offsets
+        self.columns = columns
+        self.index = {team_id: idx for idx, team_id in enumerate(team_ids)}
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __contains__(self, team_id):
+        return team_id in self.index
+
+    def trajectory(self, team_id):
+        """{column: array} of one team's rows in rating order ({} if unrated)."""
+        idx = self.index.get(team_id)
+        if idx is None:
+            return {}
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return {name: values[start:end] for name, values in self.columns.items()}
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, team_ids=np.asarray(self.team_ids, dtype=str), offsets=self.offsets, **self.columns)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in HISTORY_COLUMNS}
+            return cls(data["team_ids"].tolist(), data["offsets"], columns)
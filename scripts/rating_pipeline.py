@@ -0,0 +1,612 @@
+"""
+Shared rating loop for the calculators.
+
+Every calculator rates the same round stream: per size, competitions in
+chronological order, rounds deduplicated and ranked by
+RunTable.iter_competitions(). What differs is a handful of policies, which a
+RatingStrategy supplies:
+
+  round_entries()        elimination policy (which entries are rated)
+  weights()              per-entry OpenSkill weights
+  sigma_decay/sigma_min  sigma shrink after every rated round
+  start_competition()    pre-competition hooks (e.g. inactivity inflation)
+  new_team_stats() / record_entry() / before_rate() / end_competition()
+                         per-team and per-competition stat collectors
+  finish()               settles lazily applied updates after the last round
+
+RatingPipeline prepares the rounds of a (size, window) once and keeps them,
+so several strategies rated in the same process share the preparation.
+rate_size_multi() goes further and advances several strategies side by side
+in one walk over the rounds. Sizes never interact, so rate_sizes() can rate
+them in worker processes (workers > 1). With a rating_checkpoints
+CheckpointStore, each (strategy, size, window) resumes from the newest
+checkpoint still matching the prepared rounds and only replays what follows.
+With record_history, every state also records each team's rating after
+every round (rating_history.RatingHistory in state.history). With a
+rating_backtest Backtest, every state scores each round's prediction before
+applying it (state.backtest), and the pipeline collects the scorers. With
+head_to_head, every state indexes who met whom in each round
+(head_to_head.HeadToHead in state.head_to_head).
+
+Two engines apply the round updates:
+
+  openskill  PlackettLuce.rate() on rating objects (reference)
+  numpy      plackett_luce_kernel.rate_round() on contiguous mu/sigma arrays;
+             ratings are ArrayRating views into those arrays
+
+Strategies only touch ratings through .mu/.sigma, so they work with both.
+"""
+
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+from openskill.models import PlackettLuce
+
+from plackett_luce_kernel import rate_round
+from head_to_head import HeadToHeadBuilder
+from rating_checkpoints import checkpoint_key, checkpoint_snapshot, competition_chain, usable_checkpoints
+from rating_history import RatingHistoryBuilder
+
+
+class OpenSkillEngine:
+    """Round updates through openskill's PlackettLuce.rate()."""
+
+    name = "openskill"
+
+    def __init__(self, model):
+        self.model = model
+
+    def new_rating(self, mu=None, sigma=None):
+        return self.model.rating(mu=mu, sigma=sigma)
+
+    def rate(self, ratings, team_ids, round_ratings, ranks, weights, sigma_decay, sigma_min):
+        teams = [[rating] for rating in round_ratings]
+        result = self.model.rate(teams, ranks=ranks, weights=weights)
+        for idx, team_id in enumerate(team_ids):
+            new_rating = result[idx][0]
+            new_rating.sigma = max(sigma_min, new_rating.sigma * sigma_decay)
+            ratings[team_id] = new_rating
+
+
+class ArrayRating:
+    """Rating of one team stored in a NumpyEngine's mu/sigma arrays."""
+
+    __slots__ = ("engine", "slot")
+
+    def __init__(self, engine, slot):
+        self.engine = engine
+        self.slot = slot
+
+    @property
+    def mu(self):
+        return float(self.engine.mu[self.slot])
+
+    @mu.setter
+    def mu(self, value):
+        self.engine.mu[self.slot] = value
+
+    @property
+    def sigma(self):
+        return float(self.engine.sigma[self.slot])
+
+    @sigma.setter
+    def sigma(self, value):
+        self.engine.sigma[self.slot] = value
+
+
+class NumpyEngine:
+    """Round updates through the NumPy kernel, same parameters as model."""
+
+    name = "numpy"
+
+    def __init__(self, model, capacity=1024):
+        self.model = model
+        self.mu = np.empty(capacity)
+        self.sigma = np.empty(capacity)
+        self.size = 0
+
+    def new_rating(self, mu=None, sigma=None):
+        if self.size == len(self.mu):
+            self.mu = np.concatenate([self.mu, np.empty(len(self.mu))])
+            self.sigma = np.concatenate([self.sigma, np.empty(len(self.sigma))])
+        slot = self.size
+        self.size += 1
+        self.mu[slot] = self.model.mu if mu is None else mu
+        self.sigma[slot] = self.model.sigma if sigma is None else sigma
+        return ArrayRating(self, slot)
+
+    def rate(self, ratings, team_ids, round_ratings, ranks, weights, sigma_decay, sigma_min):
+        model = self.model
+        slots = np.fromiter((rating.slot for rating in round_ratings), dtype=np.intp,
+                            count=len(round_ratings))
+        if weights is not None:
+            weights = [team_weights[0] for team_weights in weights]
+        rate_round(
+            self.mu, self.sigma, slots, ranks, weights,
+            beta=model.beta, kappa=model.kappa, tau=model.tau,
+            weight_bounds=model.weight_bounds, limit_sigma=model.limit_sigma,
+        )
+        self.sigma[slots] = np.maximum(sigma_min, self.sigma[slots] * sigma_decay)
+
+
+# --engine choices: name -> engine class taking the strategy's model.
+ENGINES = {
+    "openskill": OpenSkillEngine,
+    "numpy": NumpyEngine,
+}
+
+
+class SizeState:
+    """Ratings and per-team stats of one size while (and after) rating it."""
+
+    def __init__(self, size, engine, comps, strategy):
+        self.size = size
+        self.engine = engine
+        self.comps = comps
+        self.strategy = strategy
+        self.ratings = {}    # team_id -> rating (.mu/.sigma)
+        self.stats = {}      # team_id -> strategy-defined stats dict
+        self.history = None  # RatingHistoryBuilder while rating, then RatingHistory
+        self.backtest = None  # rating_backtest.RoundScorer or None
+        self.head_to_head = None  # HeadToHeadBuilder while rating, then HeadToHead
+
+    def __getstate__(self):
+        # Rating objects do not pickle (openskill's are compiled classes,
+        # ArrayRating points into its engine), so ship plain mu/sigma values
+        # and rebuild them with a fresh engine. comps is reattached by the
+        # receiving RatingPipeline.
+        return {
+            "size": self.size,
+            "engine": self.engine.name,
+            "strategy": self.strategy,
+            "team_ids": list(self.ratings),
+            "mu": [rating.mu for rating in self.ratings.values()],
+            "sigma": [rating.sigma for rating in self.ratings.values()],
+            "stats": self.stats,
+            "history": self.history,
+            "backtest": self.backtest,
+            "head_to_head": self.head_to_head,
+        }
+
+    def __setstate__(self, data):
+        self.size = data["size"]
+        self.strategy = data["strategy"]
+        self.engine = ENGINES[data["engine"]](self.strategy.make_model())
+        self.comps = None
+        self.ratings = {
+            team_id: self.engine.new_rating(mu=mu, sigma=sigma)
+            for team_id, mu, sigma in zip(data["team_ids"], data["mu"], data["sigma"])
+        }
+        self.stats = data["stats"]
+        self.history = data["history"]
+        self.backtest = data.get("backtest")
+        self.head_to_head = data.get("head_to_head")
+
+
+class RatingStrategy:
+    """Round-update policy. The defaults rate every entry unweighted."""
+
+    def __init__(self, sigma_decay=1.0, sigma_min=0.0):
+        self.sigma_decay = sigma_decay
+        self.sigma_min = sigma_min
+
+    def make_model(self):
+        return PlackettLuce()
+
+    def config(self):
+        """Settings the ratings depend on besides the model (checkpoint key).
+
+        Subclasses extend it with every constant their hooks read.
+        """
+        return {
+            "strategy": type(self).__name__,
+            "sigma_decay": self.sigma_decay,
+            "sigma_min": self.sigma_min,
+        }
+
+    def round_entries(self, rnd):
+        """Entries (team_id, rank, eliminated) to rate, or None to skip the round."""
+        return rnd.entries
+
+    def weights(self, state, comp, rnd, entries):
+        """OpenSkill weights ([[w], ...] aligned with entries) or None."""
+        return None
+
+    def new_team_stats(self):
+        return {"num_runs": 0, "last_comp": "", "last_comp_date": ""}
+
+    def record_entry(self, state, stats, entry, comp):
+        """Update one team's stats for an entry that is about to be rated.
+
+        Hooks only change the stats of teams in the round's entries;
+        checkpoints do not save the others again.
+        """
+        comp_date = state.comps.dates[comp]
+        stats["num_runs"] += 1
+        if comp_date >= stats["last_comp_date"]:
+            stats["last_comp"] = state.comps.names[comp]
+            stats["last_comp_date"] = comp_date
+
+    def start_competition(self, state, comp, rounds):
+        pass
+
+    def before_rate(self, state, comp, rnd, entries):
+        """Called after all entries of a round are recorded, before rating."""
+
+    def effective_rating(self, state, team_id):
+        """(mu, sigma) a rated team would enter the next round with, without
+        applying anything to state (e.g. pending lazy adjustments)."""
+        rating = state.ratings[team_id]
+        return rating.mu, rating.sigma
+
+    def end_competition(self, state, comp, rounds):
+        pass
+
+    def finish(self, state):
+        """Called once after the last competition, before results are read."""
+
+    def split(self):
+        """Strategy to rate one size in a worker process (pickled there).
+
+        Strategies accumulating across sizes return a copy with empty
+        accumulators; join() folds its results back.
+        """
+        return self
+
+    def join(self, size, other):
+        """Fold in the cross-size results of a split() copy that rated size."""
+
+
+class RatingPipeline:
+    """Rates sizes of a RunTable with pluggable strategies."""
+
+    def __init__(self, runs, min_field_size, engine="openskill", workers=1, checkpoints=None,
+                 record_history=False, backtest=None, head_to_head=False):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown rating engine {engine!r} (expected one of {', '.join(ENGINES)})")
+        self.runs = runs
+        self.min_field_size = min_field_size
+        self.engine = engine
+        self.workers = workers
+        self.checkpoints = checkpoints    # rating_checkpoints.CheckpointStore or None
+        self.record_history = record_history
+        self.backtest = backtest          # rating_backtest.Backtest or None
+        self.head_to_head = head_to_head
+        self._prepared = {}
+        self._comp_ordinals = None
+
+    def size_labels(self, since=None, until=None):
+        return self.runs.size_labels(since=since, until=until)
+
+    def num_runs(self, size, since=None, until=None):
+        return len(self.runs.size_rows(size, since=since, until=until))
+
+    def competitions(self, size, since=None, until=None):
+        """Prepared [(comp_idx, [Round, ...]), ...] for one size and window."""
+        key = (size, since, until)
+        prepared = self._prepared.get(key)
+        if prepared is None:
+            prepared = list(self.runs.iter_competitions(
+                size, since=since, until=until, min_field_size=self.min_field_size,
+            ))
+            self._prepared[key] = prepared
+        return prepared
+
+    def rate_size(self, size, strategy, since=None, until=None, engine=None):
+        """Rate one size chronologically with strategy; returns its SizeState.
+
+        engine overrides the pipeline's engine name for this call.
+        """
+        return self.rate_size_multi(size, [strategy], since, until, engine)[0]
+
+    def rate_size_multi(self, size, strategies, since=None, until=None, engine=None):
+        """Rate one size with several independent strategies in a single pass.
+
+        Walks the prepared rounds once and advances one state per strategy
+        round by round. Strategies must not share mutable state; each result
+        equals rate_size() with that strategy alone. Each strategy rates
+        through a split() copy that is joined back, as in rate_sizes()
+        workers, so a state resumed from a checkpoint carries only this
+        size's accumulators. Returns [SizeState, ...] in strategies order.
+        """
+        engine = engine or self.engine
+        parts = [strategy.split() for strategy in strategies]
+        states = _rate_prepared(size, self.competitions(size, since, until), self.runs.comps, parts, engine,
+                                self._checkpoint_store(), self._checkpoint_keys(size, parts, since, until, engine),
+                                self.record_history, self.backtest, self.head_to_head)
+        return self._join(size, strategies, states)
+
+    def rate_sizes(self, strategies, since=None, until=None, engine=None):
+        """rate_size_multi() for every size: {size: [SizeState, ...]}.
+
+        With workers > 1 the sizes are rated concurrently, each worker
+        receiving only its size's prepared rounds and split() copies of the
+        strategies. The results are joined back in size order, so states and
+        strategies end up exactly as in the serial loop.
+        """
+        sizes = self.size_labels(since, until)
+        if self.workers <= 1 or len(sizes) < 2:
+            return {
+                size: self.rate_size_multi(size, strategies, since, until, engine)
+                for size in sizes
+            }
+
+        engine = engine or self.engine
+        tasks = {}
+        for size in sizes:
+            parts = [strategy.split() for strategy in strategies]
+            checkpoints = self._checkpoint_store()
+            if checkpoints is not None:
+                checkpoints = checkpoints.fork()
+            tasks[size] = (size, self.competitions(size, since, until), self.runs.comps, parts, engine,
+                           checkpoints, self._checkpoint_keys(size, parts, since, until, engine),
+                           self.record_history, self.backtest, self.head_to_head)
+        # Longest sizes first so the pool is not left waiting on one of them.
+        order = sorted(sizes, key=lambda size: -sum(len(rounds) for _, rounds in tasks[size][1]))
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(sizes))) as pool:
+            futures = {size: pool.submit(_rate_prepared_task, tasks[size]) for size in order}
+            outcomes = {size: futures[size].result() for size in sizes}
+
+        rated = {}
+        for size in sizes:
+            states, checkpoints = outcomes[size]
+            if checkpoints is not None:
+                self.checkpoints.merge_counts(checkpoints)
+            for state in states:
+                state.comps = self.runs.comps
+            rated[size] = self._join(size, strategies, states)
+        return rated
+
+    def advance(self, strategies, since=None, until=None, engine=None):
+        """Bring the checkpoint series of strategies up to date for every size.
+
+        Like rate_sizes() but nothing is returned, and series that already
+        cover the data are only checked, not loaded. Serial; no-op without
+        checkpoints.
+        """
+        checkpoints = self._checkpoint_store()
+        if checkpoints is None:
+            return
+        engine = engine or self.engine
+        for size in self.size_labels(since, until):
+            parts = [strategy.split() for strategy in strategies]
+            _rate_prepared(size, self.competitions(size, since, until), self.runs.comps, parts, engine,
+                           checkpoints, self._checkpoint_keys(size, parts, since, until, engine),
+                           results=False)
+
+    def rate_size_as_of(self, size, strategy, as_of, since=None, engine=None):
+        """rate_size() over the window starting at since, stopped after as_of.
+
+        Uses the checkpoint series of the open-ended window (the one regular
+        rate_size() calls save), so with checkpoints this resumes from the
+        newest checkpoint at or before as_of and replays only the
+        competitions between it and as_of.
+        """
+        engine = engine or self.engine
+        prepared = self.competitions(size, since)
+        comps = self.runs.comps
+        as_of = as_of.toordinal() if isinstance(as_of, date) else date.fromisoformat(as_of).toordinal()
+        cut = bisect_right([int(comps.date_ordinal[comp]) for comp, _ in prepared], as_of)
+        parts = [strategy.split()]
+        states = _rate_prepared(size, prepared[:cut], comps, parts, engine, self._checkpoint_store(),
+                                self._checkpoint_keys(size, parts, since, None, engine), self.record_history,
+                                self.backtest, self.head_to_head)
+        return self._join(size, [strategy], states)[0]
+
+    def window_start(self, since):
+        """since moved forward to the first competition date on or after it.
+
+        Windows starting anywhere between two competition dates select the
+        same runs, so they share one checkpoint series.
+        """
+        if since is None:
+            return None
+        if self._comp_ordinals is None:
+            self._comp_ordinals = np.unique(self.runs.comps.date_ordinal)
+        idx = np.searchsorted(self._comp_ordinals, since.toordinal())
+        if idx == len(self._comp_ordinals):
+            return since
+        return date.fromordinal(int(self._comp_ordinals[idx]))
+
+    def _checkpoint_store(self):
+        # Histories, backtests and head-to-head indexes need every round, so
+        # those pipelines never resume.
+        if self.record_history or self.backtest is not None or self.head_to_head:
+            return None
+        return self.checkpoints
+
+    def _checkpoint_keys(self, size, strategies, since, until, engine):
+        if self._checkpoint_store() is None:
+            return None
+        since = self.window_start(since)
+        return [checkpoint_key(strategy, engine, size, since, until, self.min_field_size)
+                for strategy in strategies]
+
+    def _join(self, size, strategies, states):
+        for strategy, state in zip(strategies, states):
+            strategy.join(size, state.strategy)
+            state.strategy = strategy
+            if self.backtest is not None:
+                self.backtest.add(size, state)
+            # Built here rather than in the worker: round labels need the RunTable.
+            if isinstance(state.head_to_head, HeadToHeadBuilder):
+                state.head_to_head = state.head_to_head.build(self.runs)
+        return states
+
+    def rate(self, strategy, since=None, until=None, engine=None):
+        """Every size rated with one strategy: {size: SizeState}."""
+        rated = self.rate_sizes([strategy], since, until, engine)
+        return {size: states[0] for size, states in rated.items()}
+
+
+def _rate_prepared_task(args):
+    # The worker's CheckpointStore copy carries its counters back.
+    return _rate_prepared(*args), args[5]
+
+
+def _rate_prepared(size, prepared, comps, strategies, engine_name, checkpoints=None, keys=None,
+                   record_history=False, backtest=None, head_to_head=False, results=True):
+    """Rate prepared [(comp, [Round, ...]), ...] of one size with each strategy.
+
+    With checkpoints (a CheckpointStore, keys aligned with strategies), each
+    strategy resumes from its newest valid checkpoint and the state after
+    every later competition date is appended to its series. Saved
+    checkpoints past the end of prepared are kept (prepared may stop early,
+    see rate_size_as_of()); the first mismatching one and everything after
+    it are replaced.
+
+    record_history gives every state a history of all its rounds and a
+    backtest (rating_backtest.Backtest) a RoundScorer; head_to_head gives
+    every state a HeadToHeadBuilder (checkpoints must then be None for all
+    three). results=False only brings the
+    checkpoint series up to date: strategies whose series already covers
+    prepared are not restored and get None instead of a state.
+    """
+    engine_cls = ENGINES[engine_name]
+    states = [
+        SizeState(size, engine_cls(strategy.make_model()), comps, strategy)
+        for strategy in strategies
+    ]
+    if checkpoints is None:
+        if record_history:
+            for state in states:
+                state.history = RatingHistoryBuilder()
+        if backtest is not None:
+            for state in states:
+                state.backtest = backtest.new_scorer(state.strategy.make_model())
+        if head_to_head:
+            for state in states:
+                state.head_to_head = HeadToHeadBuilder()
+        for comp, rounds in prepared:
+            _rate_competition(states, comp, rounds)
+        for state in states:
+            state.strategy.finish(state)
+        if record_history:
+            for state in states:
+                state.history = state.history.build()
+        return states
+
+    marks = competition_chain(prepared, comps)
+    lanes = []    # [state, start position, CheckpointWriter]
+    for idx, key in enumerate(keys):
+        saved = checkpoints.index(key)
+        valid = usable_checkpoints(saved, marks)
+        start = 0
+        base = None
+        if valid:
+            start = marks[valid - 1][0] + 1
+            if results or start < len(prepared):
+                base = checkpoints.load(key, saved, valid - 1)
+                if base is None:
+                    valid = start = 0
+                else:
+                    states[idx] = _restore(base, size, engine_name, strategies[idx], comps)
+            else:
+                states[idx] = None
+        lanes.append([states[idx], start, checkpoints.writer(key, saved[:valid], base)])
+        checkpoints.record(valid > 0, len(prepared), len(prepared) - start)
+
+    mark_at = {pos: (date, chain) for pos, date, chain in marks}
+    touched = set()    # teams entered since the last mark
+    for pos in range(min((lane[1] for lane in lanes), default=len(prepared)), len(prepared)):
+        comp, rounds = prepared[pos]
+        active = [lane for lane in lanes if lane[1] <= pos]
+        _rate_competition([lane[0] for lane in active], comp, rounds)
+        for rnd in rounds:
+            touched.update(team_id for team_id, _, _ in rnd.entries)
+        if pos in mark_at:
+            date, chain = mark_at[pos]
+            for lane in active:
+                lane[2].append(date, chain, _snapshot(lane[0]), touched)
+            touched = set()
+
+    # Checkpoints above hold unfinished states, so resuming stays exact.
+    for state in states:
+        if state is not None:
+            state.strategy.finish(state)
+
+    # Writers only touch the files when a saved checkpoint mismatched or
+    # prepared extends past the saved series.
+    for lane in lanes:
+        lane[2].close()
+    return states
+
+
+def _snapshot(state):
+    """Checkpoint snapshot of state.
+
+    The strategy is stored as its attributes only: strategies defined in a
+    script run as __main__ would not unpickle in another program.
+    """
+    engine = state.engine
+    if isinstance(engine, NumpyEngine):
+        # Slots are assigned in rating order.
+        mu = engine.mu[:engine.size].copy()
+        sigma = engine.sigma[:engine.size].copy()
+    else:
+        mu = np.fromiter((rating.mu for rating in state.ratings.values()), dtype=np.float64,
+                         count=len(state.ratings))
+        sigma = np.fromiter((rating.sigma for rating in state.ratings.values()), dtype=np.float64,
+                            count=len(state.ratings))
+    return checkpoint_snapshot(list(state.ratings), mu, sigma, state.stats, vars(state.strategy))
+
+
+def _restore(saved, size, engine_name, strategy, comps):
+    """SizeState of a loaded snapshot, its attributes loaded into strategy."""
+    strategy.__dict__.update(saved["strategy"])
+    state = SizeState(size, ENGINES[engine_name](strategy.make_model()), comps, strategy)
+    state.ratings = {
+        team_id: state.engine.new_rating(mu=mu, sigma=sigma)
+        for team_id, mu, sigma in zip(saved["team_ids"], saved["mu"].tolist(), saved["sigma"].tolist())
+    }
+    state.stats = saved["stats"]
+    return state
+
+
+def _rate_competition(states, comp, rounds):
+    for state in states:
+        state.strategy.start_competition(state, comp, rounds)
+    for rnd in rounds:
+        for state in states:
+            _rate_round(state, comp, rnd)
+    for state in states:
+        state.strategy.end_competition(state, comp, rounds)
+
+
+def _rate_round(state, comp, rnd):
+    """Apply one round to one state with its strategy."""
+    if state.backtest is not None:
+        state.backtest.score(state, comp, rnd)
+    if state.head_to_head is not None:
+        state.head_to_head.record(rnd, state.comps.date_ordinal[comp])
+    strategy = state.strategy
+    entries = strategy.round_entries(rnd)
+    if entries is None:
+        return
+
+    ratings = state.ratings
+    team_stats = state.stats
+    engine = state.engine
+    round_ratings = []
+    ranks = []
+    entry_order = []
+    for entry in entries:
+        team_id, rank, _ = entry
+        rating = ratings.get(team_id)
+        if rating is None:
+            rating = ratings[team_id] = engine.new_rating()
+            team_stats[team_id] = strategy.new_team_stats()
+        round_ratings.append(rating)
+        ranks.append(rank)
+        entry_order.append(team_id)
+        strategy.record_entry(state, team_stats[team_id], entry, comp)
+
+    strategy.before_rate(state, comp, rnd, entries)
+    weights = strategy.weights(state, comp, rnd, entries)
+    engine.rate(ratings, entry_order, round_ratings, ranks, weights,
+                strategy.sigma_decay, strategy.sigma_min)
+    if state.history is not None:
+        state.history.record(state.comps.date_ordinal[comp], entry_order, ranks,
+                             [ratings[team_id] for team_id in entry_order])
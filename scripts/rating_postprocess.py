@@ -0,0 +1,131 @@
+"""
+Post-processing of rated sizes, shared by every calculator.
+
+Each calculator turns a size's SizeState into payload dicts {team_id: {...}}.
+The steps after that work on one float64 column per size instead of looping
+over the dicts:
+
+  - podium_boost_factors(): live podium quality factor from top-3 rates,
+  - normalize_sizes(): z-score each size to a common mean/std (several
+    columns, e.g. rating and prev_rating, against one size's statistics),
+  - assign_tiers(): percentile tier cutoffs (np.partition at the
+    nearest-rank indexes instead of a full sort per percentile), tier labels
+    and provisional flags.
+
+The arithmetic is elementwise float64 and sums are accumulated in team
+order, so every value equals the per-team scalar formula bit for bit.
+Rounding to the published precision stays with the callers (Python round()
+on the values written back), which keeps the CSV/HTML output unchanged.
+"""
+
+import numpy as np
+
+# Tier labels from the top cutoff down; teams below every cutoff get the last.
+TIER_LABELS = ("Elite", "Champion", "Expert", "Competitor")
+TIER_THRESHOLD_KEYS = ("elite_min", "champion_min", "expert_min")
+
+
+def column(size_results, key):
+    """float64 array of one payload field in team order (None -> NaN)."""
+    return np.array(
+        [np.nan if team[key] is None else team[key] for team in size_results.values()],
+        dtype=np.float64,
+    )
+
+
+def ranked_mask(size_results, min_runs):
+    """Teams with at least min_runs runs, in team order."""
+    return np.fromiter(
+        (team["num_runs"] >= min_runs for team in size_results.values()),
+        dtype=bool, count=len(size_results),
+    )
+
+
+def tier_thresholds(scores, top_percents):
+    """{elite_min, champion_min, expert_min} of scores.
+
+    top_percents are the (elite, champion, expert) top fractions; each cutoff
+    is the value at nearest-rank index int((n - 1) * (1 - top_percent)) of
+    the sorted scores, inf when there are none.
+    """
+    if not len(scores):
+        return {key: float("inf") for key in TIER_THRESHOLD_KEYS}
+    n = len(scores)
+    indexes = [int((n - 1) * (1.0 - top_percent)) for top_percent in top_percents]
+    partitioned = np.partition(scores, sorted(set(indexes)))
+    return {key: float(partitioned[idx]) for key, idx in zip(TIER_THRESHOLD_KEYS, indexes)}
+
+
+def tier_labels(scores, thresholds):
+    """Tier label per score (see TIER_LABELS)."""
+    conditions = [scores >= thresholds[key] for key in TIER_THRESHOLD_KEYS]
+    return np.select(conditions, TIER_LABELS[:-1], TIER_LABELS[-1]).tolist()
+
+
+def compute_tier_thresholds(all_ratings, score_key, min_runs, top_percents):
+    """{size: thresholds} over the teams with at least min_runs runs."""
+    thresholds_by_size = {}
+    for size in sorted(all_ratings.keys()):
+        size_results = all_ratings[size]
+        scores = column(size_results, score_key)[ranked_mask(size_results, min_runs)]
+        thresholds_by_size[size] = tier_thresholds(scores, top_percents)
+    return thresholds_by_size
+
+
+def assign_tiers(all_ratings, score_key, min_runs, top_percents, provisional_sigma):
+    """Set skill_tier and provisional on every team, in place.
+
+    Cutoffs come from the teams with at least min_runs runs; every team is
+    labelled. provisional is sigma >= provisional_sigma.
+    """
+    for size in sorted(all_ratings.keys()):
+        size_results = all_ratings[size]
+        scores = column(size_results, score_key)
+        thresholds = tier_thresholds(scores[ranked_mask(size_results, min_runs)], top_percents)
+        labels = tier_labels(scores, thresholds)
+        provisional = (column(size_results, "sigma") >= provisional_sigma).tolist()
+        for team, label, flag in zip(size_results.values(), labels, provisional):
+            team["skill_tier"] = label
+            team["provisional"] = flag
+
+
+def podium_boost_factors(top3_pct, boost_base, boost_range, boost_target):
+    """boost_base + boost_range * clamp01(top3_pct / boost_target), per team."""
+    return boost_base + boost_range * np.clip(top3_pct / boost_target, 0.0, 1.0)
+
+
+def zscore_stats(values):
+    """(mean, population std) of values, summed in order like sum()."""
+    n = len(values)
+    mean = float(np.add.accumulate(values)[-1]) / n
+    deviations = values - mean
+    std = (float(np.add.accumulate(deviations * deviations)[-1]) / n) ** 0.5
+    return mean, std
+
+
+def normalize_sizes(all_ratings, keys, min_runs, target_mean, target_std, min_std=1.0):
+    """Map each size's keys columns to target_mean / target_std in place.
+
+    The statistics come from keys[0] of the teams with at least min_runs
+    runs; sizes with fewer than two of them or a std below min_std are left
+    as they are. None values stay None. Results are rounded to 0.1.
+
+    Returns [(size, mean, std), ...] of the sizes that were normalized.
+    """
+    normalized = []
+    for size in sorted(all_ratings.keys()):
+        size_results = all_ratings[size]
+        qualified = column(size_results, keys[0])[ranked_mask(size_results, min_runs)]
+        if len(qualified) < 2:
+            continue
+        size_mean, size_std = zscore_stats(qualified)
+        if size_std < min_std:
+            continue
+        for key in keys:
+            values = column(size_results, key)
+            scaled = (target_mean + target_std * ((values - size_mean) / size_std)).tolist()
+            for team, value in zip(size_results.values(), scaled):
+                if team[key] is not None:
+                    team[key] = round(value, 1)
+        normalized.append((size, size_mean, size_std))
+    return normalized
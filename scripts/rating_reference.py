@@ -0,0 +1,102 @@
+"""
+Reference strategies, comparison helpers and synthetic inputs for
+equivalence checks.
+
+The bench_*.py scripts time an optimized path against its reference and the
+tests in scripts/tests assert that they agree; both use these helpers, so
+benchmark internals can change without breaking the tests.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+import calculate_rating as base
+import calculate_rating_disfocus_variant as disfocus
+import calculate_rating_live_final as live_final
+import calculate_rating_live_variant as live_variant
+import calculate_rating_wow_variant as wow
+
+
+class EagerInflationStrategy(live_variant.LiveVariantStrategy):
+    """Reference: inflate every rated team at the start of every competition."""
+
+    def __init__(self):
+        super().__init__(True)
+        self.calls = 0
+
+    def record_entry(self, state, stats, entry, comp):
+        comp_date = state.comps.date(comp)
+        stats["num_runs"] += 1
+        stats["run_dates"].append(comp_date)
+        stats["last_run_date"] = comp_date
+        if state.comps.dates[comp] >= stats["last_comp_date"]:
+            stats["last_comp"] = state.comps.names[comp]
+            stats["last_comp_date"] = state.comps.dates[comp]
+
+    def start_competition(self, state, comp, rounds):
+        comp_date = state.comps.date(comp)
+        for team_id, rating in state.ratings.items():
+            self.calls += 1
+            live_variant._inflate_sigma_for_gap(rating, state.stats[team_id]["last_run_date"], comp_date)
+
+    def finish(self, state):
+        pass
+
+    def split(self):
+        return self
+
+
+def calculator_strategies(runs):
+    """[(name, make_strategy, since), ...]: the strategy of each calculator and
+    the window it rates (live_final its live window, the others everything)."""
+    live_cutoff = runs.latest_date() - timedelta(days=live_final.LIVE_WINDOW_DAYS)
+    return [
+        ("baseline", base.BaselineStrategy, None),
+        ("wow", wow.WowStrategy, None),
+        ("disfocus", disfocus.DisfocusStrategy, None),
+        ("live_final", live_final.LiveFinalStrategy, live_cutoff),
+        ("live_variant", lambda: live_variant.LiveVariantStrategy(True), None),
+    ]
+
+
+def rate_all(pipeline, strategy, since=None, engine=None):
+    """{size: ratings} of every size rated with strategy."""
+    return {
+        size: pipeline.rate_size(size, strategy, since=since, engine=engine).ratings
+        for size in pipeline.size_labels(since=since)
+    }
+
+
+def max_rating_diff(reference, candidate):
+    """Largest absolute mu/sigma difference of two rate_all() results (inf if
+    their teams or team order differ)."""
+    worst = 0.0
+    for size, ratings in reference.items():
+        other = candidate[size]
+        if list(ratings) != list(other):
+            return float("inf")
+        for team_id, rating in ratings.items():
+            worst = max(worst, abs(rating.mu - other[team_id].mu), abs(rating.sigma - other[team_id].sigma))
+    return worst
+
+
+def scaled_handler_dogs(handler_dogs, handler_dog_regnames, scale):
+    """Give every handler `scale` copies of their dogs.
+
+    Copy k prefixes every word with a fixed-width tag, so prefix and word
+    relations inside a copy are preserved and copies never match each other.
+    """
+    def tag_words(text, k):
+        return " ".join(f"x{k:02d}{w}" for w in text.split())
+
+    scaled_dogs = defaultdict(set)
+    scaled_regs = defaultdict(set)
+    for handler, dogs in handler_dogs.items():
+        for k in range(scale):
+            for d in dogs:
+                d_k = tag_words(d, k)
+                scaled_dogs[handler].add(d_k)
+                regs = handler_dog_regnames.get((handler, d))
+                if regs:
+                    scaled_regs[(handler, d_k)] = {tag_words(r, k) for r in regs}
+    return scaled_dogs, scaled_regs
@@ -0,0 +1,60 @@
+"""
+On-disk cache of parsed competition CSVs for load_all_runs().
+
+Each results CSV is stored as one pickled chunk (see run_table.ChunkBuilder)
+holding the resolved runs of that file after handler_id/start_no recovery and
+team id construction. An entry is valid only while both of these match:
+
+  - SHA-256 of the CSV bytes,
+  - the identity-rules fingerprint passed in by the caller (hash of the alias
+    tables and the parser version), so editing DOG_ALIASES & co. re-parses
+    every file.
+
+Dog-variant merging is global across files and is not cached here.
+"""
+
+import hashlib
+import os
+import pickle
+
+
+class RunCache:
+    """Per-file chunk cache with hit/miss counters."""
+
+    def __init__(self, cache_dir, fingerprint):
+        self.cache_dir = cache_dir
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, filepath):
+        comp_dir = os.path.basename(os.path.dirname(filepath))
+        return os.path.join(self.cache_dir, f"{comp_dir}__{os.path.basename(filepath)}.pkl")
+
+    def key(self, data):
+        """Cache key for one file's raw bytes."""
+        return f"{hashlib.sha256(data).hexdigest()}:{self.fingerprint}"
+
+    def get(self, filepath, key):
+        """Return the cached chunk for filepath, or None when missing or stale."""
+        try:
+            with open(self._entry_path(filepath), "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            entry = None
+        if not entry or entry.get("key") != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["chunk"]
+
+    def put(self, filepath, key, chunk):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(filepath)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"key": key, "chunk": chunk}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        return f"Run cache: {self.hits} hits, {self.misses} misses ({self.cache_dir})"
@@ -0,0 +1,439 @@
+"""
+Columnar run storage shared by the rating calculators.
+
+load_all_runs() used to return one dict per run, each repeating the
+competition name/date/tier strings and a "handler|||dog" team id. A RunTable
+keeps the same information as NumPy columns of small integers:
+
+  team        index into team_ids (interned "handler|||dog" strings)
+  size        index into sizes ("Large", "Small", ...)
+  comp        index into the competition side table (name/date/tier)
+  round       index into round_keys
+  rank        placement, NO_RANK when the source row has none
+  eliminated  bool
+  date        competition date as a proleptic ordinal (date.toordinal())
+  handler, dog, country
+              indices into pools of the raw (recovered) source strings,
+              used only for display metadata in build_team_profiles().
+
+Row order is load order (sorted CSV files, rows in file order), which is what
+the calculators rely on for "keep first occurrence" deduplication.
+
+Each CSV is first parsed into a chunk (ChunkBuilder.build()): the same
+columns against file-local string pools, without competition metadata.
+Chunks are small, picklable and independent of other files, so they can be
+cached on disk and appended to a RunTableBuilder in file order.
+
+Calculators consume the table through RunTable.iter_competitions() /
+iter_rounds(), which yield deduplicated, ranked Round records in
+chronological order and only ever sort the rows inside the requested size
+and date window.
+"""
+
+from datetime import date
+
+import numpy as np
+
+# Ranks in the source data are positive placements; rows without a parseable
+# rank (eliminated, DIS, empty) carry this sentinel instead of None.
+NO_RANK = np.iinfo(np.int32).min
+
+
+class StringPool:
+    """Append-only list of distinct strings with a reverse index."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.index = {}
+        for value in values:
+            self.intern(value)
+
+    def intern(self, value):
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self.index[value] = idx
+            self.values.append(value)
+        return idx
+
+    def __getitem__(self, idx):
+        return self.values[idx]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class CompetitionTable:
+    """Side table with competition metadata, indexed by RunTable.comp."""
+
+    def __init__(self):
+        self.dirs = []
+        self.names = []
+        self.dates = []        # "YYYY-MM-DD" strings, as in COMPETITIONS
+        self.tiers = []
+        self.index = {}
+        self.date_ordinal = np.zeros(0, dtype=np.int32)
+        self.tier = np.zeros(0, dtype=np.int8)
+
+    def add(self, comp_dir, meta):
+        idx = self.index.get(comp_dir)
+        if idx is not None:
+            return idx
+        idx = len(self.dirs)
+        self.index[comp_dir] = idx
+        self.dirs.append(comp_dir)
+        self.names.append(meta["name"])
+        self.dates.append(meta["date"])
+        self.tiers.append(meta["tier"])
+        self.date_ordinal = np.append(
+            self.date_ordinal, np.int32(date.fromisoformat(meta["date"]).toordinal())
+        )
+        self.tier = np.append(self.tier, np.int8(meta["tier"]))
+        return idx
+
+    def date(self, idx):
+        return date.fromordinal(int(self.date_ordinal[idx]))
+
+    def __len__(self):
+        return len(self.dirs)
+
+
+# Chunk columns and the pool each one indexes (None = plain values).
+CHUNK_COLUMNS = {
+    "team": "team_ids",
+    "size": "sizes",
+    "round": "round_keys",
+    "rank": None,
+    "eliminated": None,
+    "handler": "handlers",
+    "dog": "dogs",
+    "country": "countries",
+}
+
+
+class ChunkBuilder:
+    """Accumulates the runs of one CSV file against file-local string pools."""
+
+    def __init__(self):
+        self.pools = {pool: StringPool() for pool in CHUNK_COLUMNS.values() if pool}
+        self._columns = {name: [] for name in CHUNK_COLUMNS}
+
+    def append(self, round_key, size, team_id, handler, dog, country, rank, eliminated):
+        cols = self._columns
+        pools = self.pools
+        cols["team"].append(pools["team_ids"].intern(team_id))
+        cols["size"].append(pools["sizes"].intern(size))
+        cols["round"].append(pools["round_keys"].intern(round_key))
+        cols["rank"].append(NO_RANK if rank is None else rank)
+        cols["eliminated"].append(eliminated)
+        cols["handler"].append(pools["handlers"].intern(handler))
+        cols["dog"].append(pools["dogs"].intern(dog))
+        cols["country"].append(pools["countries"].intern(country))
+
+    def build(self, stats=None):
+        """Return the chunk dict: {"pools", "columns", "stats"}."""
+        return {
+            "pools": {name: pool.values for name, pool in self.pools.items()},
+            "columns": {
+                name: np.asarray(values, dtype=RunTable.COLUMNS[name])
+                for name, values in self._columns.items()
+            },
+            "stats": dict(stats or {}),
+        }
+
+
+class RunTableBuilder:
+    """Concatenates per-file chunks (in file order) into a RunTable."""
+
+    def __init__(self):
+        self.comps = CompetitionTable()
+        self.team_ids = StringPool()
+        self.sizes = StringPool()
+        self.round_keys = StringPool()
+        self.handlers = StringPool()
+        self.dogs = StringPool()
+        self.countries = StringPool()
+        self._columns = {name: [] for name in RunTable.COLUMNS}
+
+    def add_competition(self, comp_dir, meta):
+        return self.comps.add(comp_dir, meta)
+
+    def add_chunk(self, comp, chunk):
+        """Append one file's chunk, translating its local pools to global ones."""
+        columns = chunk["columns"]
+        num_rows = len(columns["team"])
+        for name, pool_name in CHUNK_COLUMNS.items():
+            values = columns[name]
+            if pool_name:
+                pool = getattr(self, pool_name)
+                local_to_global = np.asarray(
+                    [pool.intern(v) for v in chunk["pools"][pool_name]],
+                    dtype=RunTable.COLUMNS[name],
+                )
+                values = local_to_global[values]
+            self._columns[name].append(values)
+        self._columns["comp"].append(np.full(num_rows, comp, dtype=RunTable.COLUMNS["comp"]))
+        self._columns["date"].append(
+            np.full(num_rows, self.comps.date_ordinal[comp], dtype=RunTable.COLUMNS["date"])
+        )
+
+    def build(self, round_sort_key):
+        """Freeze into a RunTable. round_sort_key orders rounds inside a competition."""
+        columns = {
+            name: np.concatenate(parts).astype(RunTable.COLUMNS[name], copy=False)
+            if parts else np.zeros(0, dtype=RunTable.COLUMNS[name])
+            for name, parts in self._columns.items()
+        }
+        return RunTable(
+            columns,
+            comps=self.comps,
+            team_ids=self.team_ids,
+            sizes=self.sizes,
+            round_keys=self.round_keys,
+            handlers=self.handlers,
+            dogs=self.dogs,
+            countries=self.countries,
+            round_sort_key=round_sort_key,
+        )
+
+
+class Round:
+    """One ready-to-rate round of a single size.
+
+    entries is a list of (team_id, rank, eliminated) in OpenSkill order: clean
+    runs sorted by placement with ranks 1..num_clean, then eliminated runs
+    sharing rank num_clean + 1. field_size counts the deduplicated rows,
+    including runs that are neither ranked nor eliminated.
+    """
+
+    __slots__ = ("size", "comp", "round", "rows", "field_size", "entries",
+                 "num_clean", "num_eliminated")
+
+    def __init__(self, size, comp, round_idx, rows, entries, num_clean):
+        self.size = size
+        self.comp = comp
+        self.round = round_idx
+        self.rows = rows
+        self.field_size = len(rows)
+        self.entries = entries
+        self.num_clean = num_clean
+        self.num_eliminated = len(entries) - num_clean
+
+    def clean_entries(self):
+        """Entries without eliminated runs."""
+        return self.entries[:self.num_clean]
+
+
+class RunTable:
+    """Column-oriented set of individual runs (see module docstring)."""
+
+    COLUMNS = {
+        "team": np.int32,
+        "size": np.int8,
+        "comp": np.int16,
+        "round": np.int32,
+        "rank": np.int32,
+        "eliminated": np.bool_,
+        "date": np.int32,
+        "handler": np.int32,
+        "dog": np.int32,
+        "country": np.int32,
+    }
+
+    def __init__(self, columns, *, comps, team_ids, sizes, round_keys,
+                 handlers, dogs, countries, round_sort_key=None, round_rank=None):
+        self.team = columns["team"]
+        self.size = columns["size"]
+        self.comp = columns["comp"]
+        self.round = columns["round"]
+        self.rank = columns["rank"]
+        self.eliminated = columns["eliminated"]
+        self.date = columns["date"]
+        self.handler = columns["handler"]
+        self.dog = columns["dog"]
+        self.country = columns["country"]
+
+        self.comps = comps
+        self.team_ids = team_ids
+        self.sizes = sizes
+        self.round_keys = round_keys
+        self.handlers = handlers
+        self.dogs = dogs
+        self.countries = countries
+
+        if round_rank is None:
+            # Position of every round key in natural order; comparing these
+            # integers is equivalent to comparing the keys themselves.
+            order = sorted(range(len(round_keys)), key=lambda i: round_sort_key(round_keys[i]))
+            round_rank = np.empty(len(round_keys), dtype=np.int32)
+            round_rank[order] = np.arange(len(round_keys), dtype=np.int32)
+        self.round_rank = round_rank
+
+    def __len__(self):
+        return len(self.team)
+
+    def columns(self):
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def select(self, rows):
+        """Return a RunTable with only the given rows (bool mask or index array).
+
+        Pools and the competition table are shared with the original.
+        """
+        return RunTable(
+            {name: col[rows] for name, col in self.columns().items()},
+            comps=self.comps,
+            team_ids=self.team_ids,
+            sizes=self.sizes,
+            round_keys=self.round_keys,
+            handlers=self.handlers,
+            dogs=self.dogs,
+            countries=self.countries,
+            round_rank=self.round_rank,
+        )
+
+    def since(self, start_date):
+        """Rows with competition date >= start_date (inclusive)."""
+        return self.select(self.date >= start_date.toordinal())
+
+    def latest_date(self):
+        """Date of the most recent competition in the table, or None if empty."""
+        if not len(self):
+            return None
+        return date.fromordinal(int(self.date.max()))
+
+    def window_mask(self, since=None, until=None):
+        """Bool mask of rows with since <= competition date <= until (either optional)."""
+        mask = np.ones(len(self), dtype=bool)
+        if since is not None:
+            mask &= self.date >= since.toordinal()
+        if until is not None:
+            mask &= self.date <= until.toordinal()
+        return mask
+
+    def size_labels(self, since=None, until=None):
+        """Size labels present in the table (or date window), sorted alphabetically."""
+        codes = self.size
+        if since is not None or until is not None:
+            codes = codes[self.window_mask(since, until)]
+        return sorted(self.sizes[code] for code in np.unique(codes))
+
+    def size_rows(self, size, since=None, until=None):
+        """Row indices of one size category (inside the date window), in load order."""
+        code = self.sizes.index.get(size)
+        if code is None:
+            return np.zeros(0, dtype=np.intp)
+        mask = self.size == code
+        if since is not None or until is not None:
+            mask &= self.window_mask(since, until)
+        return np.flatnonzero(mask)
+
+    def _round_groups(self, rows):
+        """Sort rows chronologically and split them into rounds.
+
+        Rows are ordered by competition date (ties by load order of the
+        competition), size label, natural round key and finally load order.
+        Yields (comp_idx, size_code, round_idx, rows) per round.
+        """
+        if not len(rows):
+            return
+        comp = self.comp[rows]
+        rnd = self.round[rows]
+        size = self.size[rows]
+        size_order = np.argsort(np.argsort(self.sizes.values, kind="stable"))
+        order = np.lexsort((
+            rows, self.round_rank[rnd], size_order[size], comp, self.comps.date_ordinal[comp],
+        ))
+        rows, comp, rnd, size = rows[order], comp[order], rnd[order], size[order]
+
+        changed = (comp[1:] != comp[:-1]) | (rnd[1:] != rnd[:-1]) | (size[1:] != size[:-1])
+        bounds = np.concatenate(([0], np.flatnonzero(changed) + 1, [len(rows)]))
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            yield int(comp[start]), int(size[start]), int(rnd[start]), rows[start:end]
+
+    def _make_round(self, size, comp, round_idx, rows, min_field_size):
+        """Deduplicate and rank one round; None when the field is too small."""
+        rows = self.unique_team_rows(rows)
+        if len(rows) < min_field_size:
+            return None
+        clean, elim = self.split_round(rows)
+        if len(clean) + len(elim) < min_field_size:
+            return None
+        entries = [(tid, idx + 1, False) for idx, tid in enumerate(self.team_id_list(clean))]
+        last_rank = len(clean) + 1
+        entries.extend((tid, last_rank, True) for tid in self.team_id_list(elim))
+        return Round(size, comp, round_idx, rows, entries, len(clean))
+
+    def iter_competitions(self, size, since=None, until=None, min_field_size=0):
+        """Chronological competitions of one size with their ready-to-rate rounds.
+
+        Yields (comp_idx, [Round, ...]) for every competition that has runs of
+        this size inside the window, even when none of its rounds reaches
+        min_field_size (callers that track per-competition state need those).
+        """
+        current_comp = None
+        comp_rounds = []
+        for comp, _, round_idx, rows in self._round_groups(self.size_rows(size, since, until)):
+            if comp != current_comp:
+                if current_comp is not None:
+                    yield current_comp, comp_rounds
+                current_comp = comp
+                comp_rounds = []
+            rnd = self._make_round(size, comp, round_idx, rows, min_field_size)
+            if rnd is not None:
+                comp_rounds.append(rnd)
+        if current_comp is not None:
+            yield current_comp, comp_rounds
+
+    def iter_rounds(self, size=None, since=None, until=None, min_field_size=0):
+        """Ready-to-rate rounds in chronological order, generated lazily.
+
+        size=None walks every size; rounds of one competition are then grouped
+        by size label. Rounds whose deduplicated field, or ranked/eliminated
+        entries, are smaller than min_field_size are skipped.
+        """
+        if size is None:
+            rows = np.flatnonzero(self.window_mask(since, until))
+        else:
+            rows = self.size_rows(size, since, until)
+        for comp, size_code, round_idx, group in self._round_groups(rows):
+            rnd = self._make_round(self.sizes[size_code], comp, round_idx, group, min_field_size)
+            if rnd is not None:
+                yield rnd
+
+    def unique_team_rows(self, rows):
+        """Drop repeated team entries from a round, keeping the first occurrence."""
+        _, first = np.unique(self.team[rows], return_index=True)
+        if len(first) == len(rows):
+            return rows
+        return rows[np.sort(first)]
+
+    def split_round(self, rows):
+        """Split round rows into (clean rows sorted by rank, eliminated rows).
+
+        Rows that are neither eliminated nor ranked belong to neither group.
+        """
+        elim_mask = self.eliminated[rows]
+        clean = rows[~elim_mask & (self.rank[rows] != NO_RANK)]
+        clean = clean[np.argsort(self.rank[clean], kind="stable")]
+        return clean, rows[elim_mask]
+
+    def team_id_list(self, rows):
+        """team_id strings for the given rows."""
+        pool = self.team_ids.values
+        return [pool[t] for t in self.team[rows].tolist()]
+
+    def remap_teams(self, mapping):
+        """Redirect team ids in place: mapping is {team_id: canonical_team_id}.
+
+        Returns the number of rows that changed.
+        """
+        if not mapping:
+            return 0
+        targets = {src: self.team_ids.intern(dst) for src, dst in mapping.items()}
+        remap = np.arange(len(self.team_ids), dtype=np.int32)
+        for src, dst_idx in targets.items():
+            remap[self.team_ids.index[src]] = dst_idx
+        changed = int(np.count_nonzero(remap[self.team] != self.team))
+        self.team = remap[self.team]
+        return changed
@@ -0,0 +1,64 @@
+"""
+Command-line scaffolding for per-size .npz files (team_history.py,
+team_rivals.py).
+
+Such a script either records: rates every size with some per-team structure
+enabled and saves one file per size as <dir>/<prefix><size>.npz, or, given
+--team, queries: loads the saved files back and prints the teams found in
+them, so a lookup does not re-run the model.
+"""
+
+import os
+
+
+def saved_path(directory, size, prefix=""):
+    return os.path.join(directory, f"{prefix}{size.lower()}.npz")
+
+
+def saved_sizes(directory, prefix=""):
+    """Sizes with a saved file in directory, sorted."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name[len(prefix):-len(".npz")] for name in os.listdir(directory)
+        if name.startswith(prefix) and name.endswith(".npz")
+    )
+
+
+def add_query_arguments(parser, what, dir_flag, default_dir):
+    """Add --team, --size and dir_flag (the directory of the saved files) to parser."""
+    parser.add_argument("--team", action="append", default=[],
+                        help=f'team id ("handler|||dog") to query from saved {what}; repeatable')
+    parser.add_argument("--size", action="append", default=[],
+                        help="size to query with --team; repeatable (default: every saved size)")
+    parser.add_argument(dir_flag, default=default_dir,
+                        help=f"directory of the {what} .npz files (default: {default_dir})")
+
+
+def query_saved(team_ids, sizes, directory, load, show, prefix="", what="file"):
+    """Call show(saved, size, team_id) for every team found in the saved file
+    of each size (every saved size when sizes is empty).
+
+    load(path) reads one file. Returns the exit code: 0 when some team was
+    found, else 1.
+    """
+    found = False
+    for size in sizes or saved_sizes(directory, prefix):
+        path = saved_path(directory, size, prefix)
+        if not os.path.exists(path):
+            print(f"No saved {what} {path}")
+            continue
+        saved = load(path)
+        for team_id in team_ids:
+            if team_id in saved:
+                found = True
+                show(saved, size, team_id)
+    return 0 if found else 1
+
+
+def record_saved(by_size, directory, describe, prefix=""):
+    """Save {size: structure} to their files, printing describe(structure) for each."""
+    for size, saved in by_size.items():
+        path = saved_path(directory, size, prefix)
+        saved.save(path)
+        print(f"{size}: {describe(saved)} -> {path}")
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Suggest HANDLER_ALIASES entries for near-duplicate handler names.
+
+The same person appears under slightly different normalized names
+("katka tercova" vs "katerina tercova", "adrian alonso bajo" vs
+"adrian bajo"). Comparing every pair of handlers is O(n^2), so handlers are
+first grouped by blocking keys:
+
+  - a token of 3+ characters (surname or given name; normalized names have
+    sorted tokens) plus the initial of another token,
+  - the first 3 characters of a pair of tokens (token-sorted prefix),
+  - the Soundex codes of a pair of tokens (phonetic spelling variants).
+
+Only handlers sharing a block are scored. Blocks larger than MAX_BLOCK_SIZE
+(very common tokens) are skipped. A candidate pair is rejected outright when
+both handlers ran in the same round (they are different people) or have
+different known countries; the rest get a similarity score from the edit
+distance of the normalized names, with a bonus when one name's tokens are a
+subset of the other's.
+
+Review decisions are kept in data/handler_alias_reviews.json:
+
+  {"accepted": [["alias", "canonical"], ...], "rejected": [["a", "b"], ...]}
+
+Rejected pairs are never suggested again. Accepted pairs are listed until
+they are added to HANDLER_ALIASES (at which point the alias disappears from
+the data).
+
+Usage:
+  python scripts/suggest_handler_aliases.py
+  python scripts/suggest_handler_aliases.py --accept "katka tercova=katerina tercova"
+  python scripts/suggest_handler_aliases.py --reject "jan novak=jana novakova"
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from itertools import combinations, permutations
+
+import numpy as np
+
+import calculate_rating as base
+
+REVIEWS_FILE = os.path.join(base.DATA_DIR, "handler_alias_reviews.json")
+
+# Blocks with more handlers than this are too unspecific to be useful.
+MAX_BLOCK_SIZE = 200
+# Minimum token length for token blocking keys.
+MIN_BLOCK_TOKEN_LEN = 3
+# Characters per token in the token-sorted prefix key.
+PREFIX_KEY_CHARS = 3
+# Pairs scoring at least this are suggested.
+MIN_SUGGEST_SCORE = 0.75
+# Differing tokens must share this many leading characters (or be one typo apart).
+VARIANT_PREFIX_CHARS = 3
+# Score given when all tokens of the shorter name appear in the longer one.
+TOKEN_SUBSET_SCORE = 0.9
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def soundex(token):
+    """American Soundex code of a lowercase ASCII token ('tercova' -> 't621')."""
+    letters = [c for c in token if c.isalpha()]
+    if not letters:
+        return ""
+    code = letters[0]
+    prev = _SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = _SOUNDEX_CODES.get(c, "")
+        if digit and digit != prev:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in "hw":
+            prev = digit
+    return code.ljust(4, "0")
+
+
+def blocking_keys(handler):
+    """Blocking keys of one normalized handler name.
+
+    Keys combine two tokens so blocks stay small as the handler count grows:
+    a shared token plus the initial of another token, the prefixes of a
+    token pair, and the Soundex codes of a token pair.
+    """
+    tokens = handler.split()
+    if len(tokens) == 1:
+        return {("token", tokens[0]), ("soundex", soundex(tokens[0]))}
+    keys = set()
+    for t, u in permutations(tokens, 2):
+        if len(t) >= MIN_BLOCK_TOKEN_LEN:
+            keys.add(("token", t, u[0]))
+        if t < u:
+            keys.add(("prefix", t[:PREFIX_KEY_CHARS], u[:PREFIX_KEY_CHARS]))
+            keys.add(("soundex", soundex(t), soundex(u)))
+    return keys
+
+
+def levenshtein(a, b, max_dist=None):
+    """Edit distance between a and b, or max_dist + 1 if it exceeds max_dist.
+
+    Only the diagonal band of width max_dist is computed.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_dist is None:
+        max_dist = len(a)
+    too_far = max_dist + 1
+    if len(a) - len(b) > max_dist:
+        return too_far
+    prev = [j if j <= max_dist else too_far for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        lo = max(1, i - max_dist)
+        hi = min(len(b), i + max_dist)
+        cur = [too_far] * (len(b) + 1)
+        if i <= max_dist:
+            cur[0] = i
+        for j in range(lo, hi + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != b[j - 1]))
+        if min(cur[lo - 1:hi + 1]) > max_dist:
+            return too_far
+        prev = cur
+    return min(prev[-1], too_far)
+
+
+def similarity(a, b):
+    """Similarity in [0, 1] of two normalized handler names.
+
+    When the names differ in exactly one token, that token pair must look
+    like a variant of one name (shared prefix, e.g. "katka"/"katerina", or a
+    single typo); otherwise two people sharing a first name and a surname of
+    similar length would score high.
+    """
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    if min(len(tokens_a), len(tokens_b)) >= 2 and (tokens_a <= tokens_b or tokens_b <= tokens_a):
+        return TOKEN_SUBSET_SCORE
+    only_a, only_b = tokens_a - tokens_b, tokens_b - tokens_a
+    if len(only_a) == 1 and len(only_b) == 1:
+        x, y = only_a.pop(), only_b.pop()
+        prefix_len = len(os.path.commonprefix([x, y]))
+        if prefix_len < min(VARIANT_PREFIX_CHARS, len(x), len(y)) and levenshtein(x, y, 1) > 1:
+            return 0.0
+    longest = max(len(a), len(b))
+    max_dist = int(longest * (1.0 - MIN_SUGGEST_SCORE))
+    return 1.0 - levenshtein(a, b, max_dist) / longest
+
+
+def collect_handlers(runs):
+    """Per normalized handler: runs, rounds entered, countries and raw names.
+
+    "country" and "name" hold the most common country and raw spelling.
+    """
+    handler_of_team = np.asarray(
+        [team_id.split("|||", 1)[0] for team_id in runs.team_ids.values], dtype=object
+    )
+    handlers = defaultdict(lambda: {
+        "runs": 0, "rounds": set(), "countries": Counter(), "names": Counter(),
+    })
+    round_keys = runs.comp.astype(np.int64) * len(runs.round_keys) + runs.round
+    for team, round_key, country, raw in zip(
+        runs.team.tolist(), round_keys.tolist(), runs.country.tolist(), runs.handler.tolist()
+    ):
+        info = handlers[handler_of_team[team]]
+        info["runs"] += 1
+        info["rounds"].add(round_key)
+        if runs.countries[country]:
+            info["countries"][runs.countries[country]] += 1
+        info["names"][runs.handlers[raw]] += 1
+    for info in handlers.values():
+        info["country"] = info["countries"].most_common(1)[0][0] if info["countries"] else ""
+        info["name"] = info["names"].most_common(1)[0][0]
+    return dict(handlers)
+
+
+def candidate_pairs(names):
+    """Pairs of names sharing at least one blocking key (each pair once)."""
+    blocks = defaultdict(list)
+    for name in names:
+        for key in blocking_keys(name):
+            blocks[key].append(name)
+    pairs = set()
+    skipped = 0
+    for members in blocks.values():
+        if len(members) > MAX_BLOCK_SIZE:
+            skipped += 1
+            continue
+        for a, b in combinations(sorted(members), 2):
+            pairs.add((a, b))
+    return pairs, len(blocks), skipped
+
+
+def load_reviews(path=REVIEWS_FILE):
+    if not os.path.exists(path):
+        return {"accepted": [], "rejected": []}
+    with open(path, encoding="utf-8") as f:
+        reviews = json.load(f)
+    reviews.setdefault("accepted", [])
+    reviews.setdefault("rejected", [])
+    return reviews
+
+
+def save_reviews(reviews, path=REVIEWS_FILE):
+    for decision in ("accepted", "rejected"):
+        reviews[decision] = sorted({tuple(pair) for pair in reviews[decision]})
+    # One pair per line keeps review diffs readable.
+    sections = []
+    for decision in ("accepted", "rejected"):
+        pairs = ",\n".join(f"    {json.dumps(list(pair), ensure_ascii=False)}" for pair in reviews[decision])
+        sections.append(f'  "{decision}": [\n{pairs}\n  ]' if pairs else f'  "{decision}": []')
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("{\n" + ",\n".join(sections) + "\n}\n")
+    os.replace(tmp_path, path)
+
+
+def _pair_key(a, b):
+    return tuple(sorted((a, b)))
+
+
+def _parse_pair(text):
+    alias, sep, canonical = text.partition("=")
+    if not sep or not alias.strip() or not canonical.strip():
+        raise SystemExit(f"Expected 'alias=canonical', got {text!r}")
+    return [alias.strip(), canonical.strip()]
+
+
+def suggest_aliases(handlers, reviews):
+    """Score candidate pairs; returns (suggestions, stats)."""
+    reviewed = {_pair_key(*pair) for pair in reviews["accepted"] + reviews["rejected"]}
+    pairs, num_blocks, skipped_blocks = candidate_pairs(handlers)
+    stats = Counter(candidates=len(pairs), blocks=num_blocks, skipped_blocks=skipped_blocks)
+
+    suggestions = []
+    for a, b in sorted(pairs):
+        if (a, b) in reviewed:
+            stats["reviewed"] += 1
+            continue
+        info_a, info_b = handlers[a], handlers[b]
+        if not info_a["rounds"].isdisjoint(info_b["rounds"]):
+            stats["same_round"] += 1
+            continue
+        country_a, country_b = info_a["country"], info_b["country"]
+        if country_a and country_b and country_a != country_b:
+            stats["country_mismatch"] += 1
+            continue
+        score = similarity(a, b)
+        if score < MIN_SUGGEST_SCORE:
+            continue
+        # The more frequent spelling becomes the canonical name.
+        canonical, alias = sorted((a, b), key=lambda h: (-handlers[h]["runs"], -len(h), h))
+        suggestions.append({
+            "alias": alias,
+            "canonical": canonical,
+            "score": round(score, 3),
+            "alias_runs": handlers[alias]["runs"],
+            "canonical_runs": handlers[canonical]["runs"],
+            "alias_name": handlers[alias]["name"],
+            "canonical_name": handlers[canonical]["name"],
+            "country": country_a or country_b,
+        })
+    suggestions.sort(key=lambda s: (-s["score"], s["canonical"], s["alias"]))
+    return suggestions, stats
+
+
+def main():
+    # Only loads runs (no rating), so none of build_arg_parser's rating options.
+    parser = argparse.ArgumentParser(description="Suggest HANDLER_ALIASES entries for near-duplicate handlers.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-parse every results CSV instead of using the parsed-run cache")
+    parser.add_argument("--workers", type=int, default=base.DEFAULT_LOAD_WORKERS,
+                        help="processes used to parse results CSVs (default: all cores; 1 = serial)")
+    parser.add_argument("--accept", action="append", default=[], metavar="ALIAS=CANONICAL",
+                        help="record an accepted alias pair")
+    parser.add_argument("--reject", action="append", default=[], metavar="A=B",
+                        help="record a rejected pair (never suggested again)")
+    parser.add_argument("--csv", metavar="PATH", help="also write suggestions to a CSV file")
+    args = parser.parse_args()
+
+    reviews = load_reviews()
+    if args.accept or args.reject:
+        reviews["accepted"].extend(_parse_pair(p) for p in args.accept)
+        reviews["rejected"].extend(_parse_pair(p) for p in args.reject)
+        save_reviews(reviews)
+        print(f"Recorded {len(args.accept)} accepted, {len(args.reject)} rejected pairs in {REVIEWS_FILE}")
+        return
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    handlers = collect_handlers(runs)
+
+    t0 = time.perf_counter()
+    suggestions, stats = suggest_aliases(handlers, reviews)
+    elapsed = time.perf_counter() - t0
+    print(f"\n{len(handlers)} handlers, {stats['blocks']} blocks "
+          f"({stats['skipped_blocks']} oversized skipped), {stats['candidates']} candidate pairs "
+          f"scored in {elapsed:.2f}s")
+    print(f"Rejected: {stats['same_round']} ran in the same round, "
+          f"{stats['country_mismatch']} country mismatch, {stats['reviewed']} already reviewed")
+
+    pending_accepted = [pair for pair in reviews["accepted"] if pair[0] in handlers]
+    if pending_accepted:
+        print("\nAccepted but not yet in HANDLER_ALIASES:")
+        for alias, canonical in pending_accepted:
+            print(f'    "{alias}": "{canonical}",')
+
+    print(f"\n{len(suggestions)} suggested aliases (review, then --accept/--reject):")
+    for s in suggestions:
+        print(f'    "{s["alias"]}": "{s["canonical"]}",  '
+              f'# {s["score"]:.2f} {s["alias_name"]} ({s["alias_runs"]}) -> '
+              f'{s["canonical_name"]} ({s["canonical_runs"]}) {s["country"]}')
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(suggestions[0]) if suggestions else ["alias"])
+            writer.writeheader()
+            writer.writerows(suggestions)
+        print(f"Wrote {args.csv}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Record or print per-team rating trajectories (see rating_history.py).
+
+Recording rates every size of one variant with history enabled and writes one
+RatingHistory per size to output/history/<variant>_<size>.npz. Printing reads
+those files back, so looking up a team does not re-run the model.
+
+Usage:
+  python scripts/team_history.py [--variant base]
+  python scripts/team_history.py [--variant base] --team "handler|||dog" [--size Large]
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+import calculate_rating as base
+import calculate_rating_disfocus_variant as disfocus
+import calculate_rating_live_final as live_final
+import calculate_rating_live_variant as live_variant
+import calculate_rating_wow_variant as wow
+from rating_history import RatingHistory
+from rating_pipeline import RatingPipeline
+from saved_by_size import add_query_arguments, query_saved, record_saved
+
+HISTORY_DIR = os.path.join(base.OUTPUT_DIR, "history")
+
+
+def _live_final_since(runs):
+    return runs.latest_date() - timedelta(days=live_final.LIVE_WINDOW_DAYS)
+
+
+# --variant choices: name -> (strategy factory, window start from runs or None).
+VARIANTS = {
+    "base": (base.BaselineStrategy, None),
+    "wow": (wow.WowStrategy, None),
+    "disfocus": (disfocus.DisfocusStrategy, None),
+    "live_final": (live_final.LiveFinalStrategy, _live_final_since),
+    "live_variant": (lambda: live_variant.LiveVariantStrategy(True), None),
+}
+
+
+def rate_histories(pipeline, variant):
+    """{size: RatingHistory} of every size rated with the variant's strategy.
+
+    pipeline must be created with record_history=True.
+    """
+    make_strategy, window_start = VARIANTS[variant]
+    since = window_start(pipeline.runs) if window_start else None
+    states = pipeline.rate(make_strategy(), since=since)
+    return {size: state.history for size, state in states.items()}
+
+
+def _print_trajectory(history, size, team_id):
+    rows = history.trajectory(team_id)
+    print(f"\n{team_id} ({size}, {len(rows['mu'])} rated runs)")
+    print(f"  {'date':<12}{'round':>7}{'rank':>6}{'mu':>10}{'sigma':>9}")
+    for idx in range(len(rows["mu"])):
+        print(
+            f"  {date.fromordinal(int(rows['date'][idx])).isoformat():<12}"
+            f"{rows['round'][idx]:>7}{rows['rank'][idx]:>6}"
+            f"{rows['mu'][idx]:>10.3f}{rows['sigma'][idx]:>9.3f}"
+        )
+
+
+def main():
+    parser = base.build_arg_parser("Record or print per-team rating trajectories.")
+    parser.add_argument("--variant", choices=list(VARIANTS), default="base",
+                        help="rating variant (default: base)")
+    add_query_arguments(parser, "histories", "--history-dir", HISTORY_DIR)
+    args = parser.parse_args()
+    prefix = f"{args.variant}_"
+
+    if args.team:
+        return query_saved(args.team, args.size, args.history_dir, RatingHistory.load, _print_trajectory,
+                           prefix=prefix, what="history")
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE, engine=args.engine, workers=args.workers,
+                              record_history=True)
+    record_saved(rate_histories(pipeline, args.variant), args.history_dir,
+                 lambda history: f"{len(history)} rows, {len(history.team_ids)} teams", prefix=prefix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
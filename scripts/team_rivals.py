@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Record or query the head-to-head index (see head_to_head.py).
+
+Recording rates every size over the full history (the baseline pass) with
+the index enabled and writes one HeadToHead per size to
+output/head_to_head/<size>.npz. Queries read those files back: --vs prints
+one pair's record and the rounds they met in, otherwise the team's top
+rivals are listed.
+
+Usage:
+  python scripts/team_rivals.py
+  python scripts/team_rivals.py --team "handler|||dog" [--vs "handler|||dog"] [--size Large] [--top 10]
+"""
+
+import os
+import sys
+from datetime import date
+
+import calculate_rating as base
+from head_to_head import HeadToHead
+from rating_pipeline import RatingPipeline
+from saved_by_size import add_query_arguments, query_saved, record_saved
+
+HEAD_TO_HEAD_DIR = os.path.join(base.OUTPUT_DIR, "head_to_head")
+DEFAULT_TOP = 10
+
+
+def rate_indexes(pipeline):
+    """{size: HeadToHead} of every size; pipeline must be created with head_to_head=True."""
+    states = pipeline.rate(base.BaselineStrategy())
+    return {size: state.head_to_head for size, state in states.items()}
+
+
+def _print_pair(index, size, team_id, opponent_id):
+    record = index.pair(team_id, opponent_id)
+    if record is None:
+        print(f"\n{team_id} vs {opponent_id} ({size}): never met")
+        return
+    print(f"\n{team_id} vs {opponent_id} ({size}): {record['meetings']} meetings, "
+          f"{record['wins']} ahead, {record['losses']} behind, {record['ties']} tied")
+    for round_id in record["rounds"]:
+        comp, round_key, date_ordinal = index.round_label(round_id)
+        print(f"  {date.fromordinal(date_ordinal).isoformat():<12}{comp:<36}{round_key}")
+
+
+def _print_rivals(index, size, team_id, top):
+    rivals = index.rivals(team_id, top)
+    print(f"\n{team_id} ({size}): top {len(rivals)} rivals")
+    print(f"  {'met':>5}{'ahead':>7}{'behind':>8}{'tied':>6}  opponent")
+    for record in rivals:
+        print(f"  {record['meetings']:>5}{record['wins']:>7}{record['losses']:>8}{record['ties']:>6}  "
+              f"{record['opponent']}")
+
+
+def main():
+    parser = base.build_arg_parser("Record or query the head-to-head index.")
+    add_query_arguments(parser, "indexes", "--index-dir", HEAD_TO_HEAD_DIR)
+    parser.add_argument("--vs", default=None, help="opponent team id: print that pair instead of rivals")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"rivals to print (default: {DEFAULT_TOP})")
+    args = parser.parse_args()
+
+    if args.team:
+        def show(index, size, team_id):
+            if args.vs:
+                _print_pair(index, size, team_id, args.vs)
+            else:
+                _print_rivals(index, size, team_id, args.top)
+        return query_saved(args.team, args.size, args.index_dir, HeadToHead.load, show, what="index")
+
+    runs = base.load_all_runs(use_cache=not args.no_cache, workers=args.workers)
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE, engine=args.engine, workers=args.workers,
+                              head_to_head=True)
+    record_saved(rate_indexes(pipeline), args.index_dir,
+                 lambda index: f"{len(index)} pairs, {len(index.rounds)} encounters, {len(index.team_ids)} teams")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Shared fixtures of the rating script tests.
+
+The scripts import each other as top-level modules (run from scripts/), so
+scripts/ goes on sys.path. Fixtures loading data/ are session-scoped and go
+through the run cache like the scripts themselves.
+
+Run with: python -m pytest scripts/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calculate_rating as base  # noqa: E402
+from rating_pipeline import RatingPipeline  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def runs():
+    """Every run of data/, dog name variants merged."""
+    return base.load_all_runs()
+
+
+@pytest.fixture(scope="session")
+def pipeline(runs):
+    """RatingPipeline over runs (no checkpoints), shared so rounds are prepared once."""
+    return RatingPipeline(runs, base.MIN_FIELD_SIZE)
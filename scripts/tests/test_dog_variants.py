@@ -0,0 +1,65 @@
+"""Indexed dog-variant merging against the pairwise reference."""
+
+import pytest
+
+import calculate_rating as base
+from dog_variants import INDEXED_MERGE_MIN_DOGS, dog_variant_merge_map, dog_variant_merge_map_pairwise
+from rating_reference import scaled_handler_dogs
+
+# One handler with a case of every merge strategy and dog ids that must stay
+# apart (a kennel suffix shared by registered names is not a match).
+HANDLER_DOGS = {
+    "ann": {
+        "day", "daylight neverending force",
+        "alpha beta gamma", "dr alpha beta gamma delta",
+        "fido", "ch fido of kennel",
+        "zeta", "eta theta iota", "kappa",
+    },
+}
+HANDLER_DOG_REGNAMES = {
+    ("ann", "alpha beta gamma"): {"alpha beta gamma"},
+    ("ann", "dr alpha beta gamma delta"): {"dr alpha beta gamma delta"},
+    ("ann", "ch fido of kennel"): {"ch fido of kennel"},
+    ("ann", "eta theta iota"): {"eta theta iota from the land"},
+    ("ann", "kappa"): {"lambda mu nu from the land"},
+}
+EXPECTED = {
+    "ann|||daylight neverending force": "ann|||day",
+    "ann|||dr alpha beta gamma delta": "ann|||alpha beta gamma",
+    "ann|||ch fido of kennel": "ann|||fido",
+}
+
+MERGE_MAPS = {
+    "pairwise": dog_variant_merge_map_pairwise,
+    "indexed all": lambda dogs, regnames: dog_variant_merge_map(dogs, regnames, min_indexed_dogs=2),
+    "default": dog_variant_merge_map,
+}
+
+
+@pytest.fixture(scope="module")
+def handler_dogs():
+    """(handler_dogs, handler_dog_regnames) of data/ loaded without merging."""
+    runs = base.load_all_runs(merge_variants=False)
+    return base._collect_handler_dogs(runs, base.IDENTITY_RESOLVER)
+
+
+def test_handcrafted_handler_is_indexed_by_default():
+    assert len(HANDLER_DOGS["ann"]) >= INDEXED_MERGE_MIN_DOGS
+
+
+@pytest.mark.parametrize("name", list(MERGE_MAPS))
+def test_each_strategy_merges(name):
+    assert MERGE_MAPS[name](HANDLER_DOGS, HANDLER_DOG_REGNAMES) == EXPECTED
+
+
+@pytest.mark.parametrize("name", ["indexed all", "default"])
+def test_data_matches_pairwise(handler_dogs, name):
+    reference = dog_variant_merge_map_pairwise(*handler_dogs)
+    assert reference
+    assert MERGE_MAPS[name](*handler_dogs) == reference
+
+
+@pytest.mark.parametrize("name", ["indexed all", "default"])
+def test_scaled_data_matches_pairwise(handler_dogs, name):
+    scaled = scaled_handler_dogs(*handler_dogs, 3)
+    assert MERGE_MAPS[name](*scaled) == dog_variant_merge_map_pairwise(*scaled)
@@ -0,0 +1,119 @@
+"""Head-to-head index against a naive pairwise count of the same rounds."""
+
+from itertools import combinations
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import calculate_rating as base
+from head_to_head import PAIR_COLUMNS, HeadToHead, HeadToHeadBuilder
+from rating_pipeline import RatingPipeline
+from run_table import Round
+
+SEED = 20240601
+
+
+def _naive(rounds):
+    """{(a, b): [meetings, a ahead, b ahead, [round ids]]} over every pair of
+    team ids in each round, a < b."""
+    counts = {}
+    for round_id, entries in enumerate(rounds):
+        for (team_a, rank_a, _), (team_b, rank_b, _) in combinations(entries, 2):
+            if team_a > team_b:
+                team_a, rank_a, team_b, rank_b = team_b, rank_b, team_a, rank_a
+            record = counts.setdefault((team_a, team_b), [0, 0, 0, []])
+            record[0] += 1
+            record[1] += rank_a < rank_b
+            record[2] += rank_b < rank_a
+            record[3].append(round_id)
+    return counts
+
+
+def _naive_record(counts, team, opponent):
+    """pair(team, opponent) computed from the naive counts."""
+    meetings, ahead_a, ahead_b, rounds = counts[(min(team, opponent), max(team, opponent))]
+    wins, losses = (ahead_a, ahead_b) if team < opponent else (ahead_b, ahead_a)
+    return {"opponent": opponent, "meetings": meetings, "wins": wins, "losses": losses,
+            "ties": meetings - wins - losses, "rounds": rounds}
+
+
+def _assert_matches_naive(index, rounds):
+    counts = _naive(rounds)
+    assert len(index) == len(counts)
+    opponents = {team_id: [] for team_id in index.team_ids}
+    for team_a, team_b in counts:
+        assert index.pair(team_a, team_b) == _naive_record(counts, team_a, team_b)
+        assert index.pair(team_b, team_a) == _naive_record(counts, team_b, team_a)
+        opponents[team_a].append(team_b)
+        opponents[team_b].append(team_a)
+
+    for team_id, team_opponents in opponents.items():
+        # Meetings desc, closest win/loss balance, then opponent index.
+        records = [_naive_record(counts, team_id, opponent) for opponent in team_opponents]
+        records.sort(key=lambda r: (-r["meetings"], abs(r["wins"] - r["losses"]), index.index[r["opponent"]]))
+        for record in records:
+            del record["rounds"]
+        assert index.rivals(team_id, top=len(records)) == records
+        assert index.rivals(team_id, top=3) == records[:3]
+
+
+def _assert_round_trip(index, tmp_path):
+    path = tmp_path / "index.npz"
+    index.save(str(path))
+    loaded = HeadToHead.load(str(path))
+    assert loaded.team_ids == index.team_ids
+    assert loaded.round_comp == index.round_comp and loaded.round_key == index.round_key
+    for name in PAIR_COLUMNS:
+        np.testing.assert_array_equal(loaded.columns[name], index.columns[name])
+    for name in ("round_offsets", "rounds", "offsets", "opponent", "edge_pair", "slots", "round_date"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(index, name))
+    return loaded
+
+
+def _synthetic_index(num_teams, num_rounds, rng):
+    """HeadToHead of random rounds (ties, single-entry rounds, repeat meetings)
+    and their entries."""
+    builder = HeadToHeadBuilder()
+    rounds = []
+    for round_id in range(num_rounds):
+        size = int(rng.integers(1, min(num_teams, 8) + 1))
+        teams = rng.choice(num_teams, size, replace=False)
+        ranks = rng.integers(1, size + 1, size)
+        entries = [(f"team {team:03d}", int(rank), False) for team, rank in zip(teams.tolist(), ranks.tolist())]
+        builder.record(Round("Large", round_id % 5, round_id % 3, [], entries, size), 738000 + round_id)
+        rounds.append(entries)
+    runs = SimpleNamespace(comps=SimpleNamespace(dirs=[f"comp {comp}" for comp in range(5)]),
+                           round_keys=["agility", "jumping", "final"])
+    return builder.build(runs), rounds
+
+
+@pytest.mark.parametrize("num_teams, num_rounds", [(2, 1), (3, 4), (12, 60), (200, 400)])
+def test_synthetic_matches_naive(num_teams, num_rounds, tmp_path):
+    rng = np.random.default_rng([SEED, num_teams])
+    index, rounds = _synthetic_index(num_teams, num_rounds, rng)
+    _assert_matches_naive(index, rounds)
+    _assert_matches_naive(_assert_round_trip(index, tmp_path), rounds)
+    assert index.round_label(0) == ("comp 0", "agility", 738000)
+
+
+def test_empty_index():
+    index = HeadToHeadBuilder().build(SimpleNamespace(comps=SimpleNamespace(dirs=[]), round_keys=[]))
+    assert len(index) == 0
+    assert index.pair("a", "b") is None and index.rivals("a") == []
+
+
+def test_data_matches_naive(runs, tmp_path):
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE, head_to_head=True)
+    size = min(pipeline.size_labels(), key=lambda label: len(pipeline.competitions(label)))
+    index = pipeline.rate_size(size, base.BaselineStrategy()).head_to_head
+    rounds = [rnd.entries for _, comp_rounds in pipeline.competitions(size) for rnd in comp_rounds]
+    assert len(index) > 0
+    _assert_matches_naive(index, rounds)
+
+    loaded = _assert_round_trip(index, tmp_path)
+    for team_id in index.team_ids[:50]:
+        assert loaded.rivals(team_id) == index.rivals(team_id)
+    first, second = index.team_ids[:2]
+    assert loaded.pair(first, second) == index.pair(first, second)
+    assert index.pair(first, "nobody") is None and index.pair(first, first) is None
@@ -0,0 +1,110 @@
+"""Lazy inactivity inflation (LiveVariantStrategy) against the per-competition loop."""
+
+import math
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import calculate_rating_live_variant as live_variant
+from plackett_luce_kernel import EQUIVALENCE_TOLERANCE
+from rating_reference import EagerInflationStrategy, max_rating_diff, rate_all
+
+GRACE = live_variant.INACTIVITY_GRACE_DAYS
+TAU = live_variant.INACTIVITY_TAU
+SIGMA_MAX = live_variant.SIGMA_MAX
+FIRST_DAY = date(2024, 1, 6)
+TEAM_ID = "handler|||dog"
+
+
+def _sigma_reaching_cap(gap_days):
+    """Sigma that one inflation over gap_days takes exactly to SIGMA_MAX."""
+    return math.sqrt(SIGMA_MAX * SIGMA_MAX - TAU * TAU * gap_days / 30.0)
+
+
+class _Comps:
+    """The competition columns the live variant reads, one competition per day offset."""
+
+    def __init__(self, days):
+        self.days = [FIRST_DAY + timedelta(days=day) for day in days]
+        self.dates = [day.isoformat() for day in self.days]
+        self.names = [f"comp {idx}" for idx in range(len(days))]
+        self.date_ordinal = np.array([day.toordinal() for day in self.days], dtype=np.int32)
+
+    def date(self, comp):
+        return self.days[comp]
+
+
+def _rate(strategy, sigma, schedule):
+    """Run strategy's hooks over schedule [(day, team runs), ...].
+
+    The team runs in competition 0 on day 0 with the given sigma; returns
+    its sigma after every later run and after finish().
+    """
+    comps = _Comps([day for day, _ in schedule])
+    rating = SimpleNamespace(mu=25.0, sigma=sigma)
+    stats = strategy.new_team_stats()
+    state = SimpleNamespace(comps=comps, ratings={TEAM_ID: rating}, stats={TEAM_ID: stats})
+    sigmas = []
+    for comp, (_, runs) in enumerate(schedule):
+        strategy.start_competition(state, comp, [])
+        if runs:
+            strategy.record_entry(state, stats, (TEAM_ID, 1, False), comp)
+            if comp:
+                sigmas.append(rating.sigma)
+    strategy.finish(state)
+    sigmas.append(rating.sigma)
+    return sigmas
+
+
+def _assert_same(sigma, schedule):
+    eager = _rate(EagerInflationStrategy(), sigma, schedule)
+    lazy = _rate(live_variant.LiveVariantStrategy(True), sigma, schedule)
+    assert len(lazy) == len(eager)
+    for eager_sigma, lazy_sigma in zip(eager, lazy):
+        assert lazy_sigma <= SIGMA_MAX
+        assert lazy_sigma == pytest.approx(eager_sigma, abs=EQUIVALENCE_TOLERANCE)
+        # The cap is applied with min(), so a capped sigma is exact either way.
+        assert (lazy_sigma == SIGMA_MAX) == (eager_sigma == SIGMA_MAX)
+    return eager
+
+
+@pytest.mark.parametrize("gap", [GRACE - 1, GRACE, GRACE + 1, 2 * GRACE])
+def test_single_gap_around_grace(gap):
+    sigmas = _assert_same(3.0, [(0, True), (gap, True)])
+    assert (sigmas[0] > 3.0) == (gap > GRACE)
+
+
+@pytest.mark.parametrize("offset", [-1e-3, -1e-12, 0.0, 1e-12, 1e-3])
+def test_single_gap_around_cap(offset):
+    gap = 90
+    _assert_same(_sigma_reaching_cap(gap) + offset, [(0, True), (gap, True)])
+
+
+@pytest.mark.parametrize("offset", [-1e-3, 0.0, 1e-3])
+def test_cap_reached_between_competitions(offset):
+    # Gaps of 40, 80 and 120 days from the run on day 0: the eager loop hits
+    # the cap at the second competition, the lazy one adds all three at once.
+    schedule = [(0, True), (40, False), (80, False), (120, True)]
+    sigma = _sigma_reaching_cap(40 + 80) + offset
+    sigmas = _assert_same(sigma, schedule)
+    assert sigmas[0] == SIGMA_MAX
+
+
+@pytest.mark.parametrize("sigma", [1.0, _sigma_reaching_cap(200), SIGMA_MAX])
+def test_pending_inflation_applied_on_finish(sigma):
+    schedule = [(0, True), (15, False), (45, False), (75, False), (100, False)]
+    sigmas = _assert_same(sigma, schedule)
+    assert sigmas[-1] > sigma or sigma == SIGMA_MAX
+
+
+def test_run_between_gaps_restarts_the_gap():
+    schedule = [(0, True), (20, False), (60, True), (85, False), (130, False), (200, True), (240, False)]
+    _assert_same(4.0, schedule)
+
+
+def test_full_history_matches_eager_loop(pipeline):
+    reference = rate_all(pipeline, EagerInflationStrategy())
+    candidate = rate_all(pipeline, live_variant.LiveVariantStrategy(True))
+    assert max_rating_diff(reference, candidate) <= EQUIVALENCE_TOLERANCE
@@ -0,0 +1,66 @@
+"""NumPy Plackett-Luce kernel and engine against openskill."""
+
+import numpy as np
+import pytest
+from openskill.models import PlackettLuce
+
+from plackett_luce_kernel import EQUIVALENCE_TOLERANCE, rate_round
+from rating_reference import calculator_strategies, max_rating_diff, rate_all
+
+# Per-round tolerance: one update, no accumulated rounding.
+ROUND_TOLERANCE = 1e-12
+SEED = 20240601
+
+
+def _openskill_round(model, mu, sigma, ranks, weights):
+    teams = [[model.rating(mu=m, sigma=s)] for m, s in zip(mu.tolist(), sigma.tolist())]
+    result = model.rate(teams, ranks=ranks, weights=None if weights is None else [[w] for w in weights])
+    return np.array([team[0].mu for team in result]), np.array([team[0].sigma for team in result])
+
+
+def _kernel_round(model, mu, sigma, ranks, weights):
+    # Entries live at scattered slots of larger arrays, as in NumpyEngine.
+    slots = np.arange(len(mu)) * 3 + 1
+    all_mu = np.full(len(mu) * 3 + 2, np.nan)
+    all_sigma = np.full(len(mu) * 3 + 2, np.nan)
+    all_mu[slots] = mu
+    all_sigma[slots] = sigma
+    rate_round(all_mu, all_sigma, slots, ranks, weights, beta=model.beta, kappa=model.kappa, tau=model.tau,
+               weight_bounds=model.weight_bounds, limit_sigma=model.limit_sigma)
+    untouched = np.ones(len(all_mu), dtype=bool)
+    untouched[slots] = False
+    assert np.isnan(all_mu[untouched]).all() and np.isnan(all_sigma[untouched]).all()
+    return all_mu[slots], all_sigma[slots]
+
+
+@pytest.mark.parametrize("limit_sigma", [False, True])
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("ties", ["none", "some", "eliminated", "all"])
+@pytest.mark.parametrize("num", [2, 7, 60])
+def test_round_matches_openskill(num, ties, weighted, limit_sigma):
+    rng = np.random.default_rng([SEED, num])
+    model = PlackettLuce(limit_sigma=limit_sigma)
+    mu = rng.normal(25.0, 5.0, num)
+    sigma = rng.uniform(0.5, 25.0 / 3.0, num)
+    ranks = rng.permutation(num) + 1
+    if ties == "some":
+        ranks = (ranks + 1) // 2
+    elif ties == "eliminated":
+        ranks = np.minimum(ranks, num // 2 + 1)
+    elif ties == "all":
+        ranks = np.ones(num, dtype=np.int64)
+    ranks = ranks.tolist()
+    weights = rng.uniform(0.5, 3.0, num).tolist() if weighted else None
+
+    ref_mu, ref_sigma = _openskill_round(model, mu, sigma, ranks, weights)
+    new_mu, new_sigma = _kernel_round(model, mu, sigma, ranks, weights)
+    np.testing.assert_allclose(new_mu, ref_mu, rtol=0, atol=ROUND_TOLERANCE)
+    np.testing.assert_allclose(new_sigma, ref_sigma, rtol=0, atol=ROUND_TOLERANCE)
+
+
+@pytest.mark.parametrize("name", ["baseline", "wow", "disfocus", "live_final", "live_variant"])
+def test_engines_agree_on_data(runs, pipeline, name):
+    make_strategy, since = {label: rest for label, *rest in calculator_strategies(runs)}[name]
+    reference = rate_all(pipeline, make_strategy(), since, "openskill")
+    candidate = rate_all(pipeline, make_strategy(), since, "numpy")
+    assert max_rating_diff(reference, candidate) <= EQUIVALENCE_TOLERANCE
@@ -0,0 +1,148 @@
+"""Ratings resumed from checkpoints against rating from scratch.
+
+Every calculator strategy rates its largest size once with a CheckpointStore
+in a temporary directory and once without; the resumed state must equal the
+from-scratch one exactly (team order, mu, sigma, stats and the strategy's
+accumulators).
+"""
+
+import pickle
+
+import pytest
+
+import calculate_rating as base
+import calculate_rating_live_variant as live_variant
+import rating_checkpoints
+from rating_checkpoints import CheckpointStore
+from rating_pipeline import RatingPipeline
+from rating_reference import calculator_strategies
+from run_table import Round
+
+STRATEGY_NAMES = ["baseline", "wow", "disfocus", "live_final", "live_variant", "live_variant_form"]
+
+
+class _EditedPipeline(RatingPipeline):
+    """RatingPipeline whose prepared rounds go through edit([(comp, [Round, ...]), ...])."""
+
+    def __init__(self, runs, edit=None, checkpoints=None):
+        super().__init__(runs, base.MIN_FIELD_SIZE, checkpoints=checkpoints)
+        self.edit = edit
+
+    def competitions(self, size, since=None, until=None):
+        prepared = super().competitions(size, since, until)
+        return prepared if self.edit is None else self.edit(prepared)
+
+
+def _drop_last(prepared):
+    return prepared[:-1]
+
+
+def _edit_round(prepared):
+    """Swap the first two finishers of the first round (with two) two thirds in."""
+    edited = list(prepared)
+    for pos in range(2 * len(prepared) // 3, len(prepared)):
+        comp, rounds = prepared[pos]
+        for idx, rnd in enumerate(rounds):
+            if rnd.num_clean >= 2:
+                (first, rank1, elim1), (second, rank2, elim2), *rest = rnd.entries
+                entries = [(second, rank1, elim1), (first, rank2, elim2), *rest]
+                rounds = list(rounds)
+                rounds[idx] = Round(rnd.size, rnd.comp, rnd.round, rnd.rows, entries, rnd.num_clean)
+                edited[pos] = (comp, rounds)
+                return edited
+    raise AssertionError("no round with two finishers to edit")
+
+
+@pytest.fixture(scope="module")
+def strategies(runs):
+    """{name: (make_strategy, since, size)}, size: the one with most competitions."""
+    plain = RatingPipeline(runs, base.MIN_FIELD_SIZE)
+    entries = calculator_strategies(runs)
+    entries.append(("live_variant_form", lambda: live_variant.LiveVariantStrategy(False),
+                    live_variant._form_window_start(runs)))
+    result = {}
+    for name, make_strategy, since in entries:
+        size = max(plain.size_labels(since=since), key=lambda label: len(plain.competitions(label, since)))
+        result[name] = (make_strategy, since, size)
+    return result
+
+
+def _rate(runs, strategies, name, edit=None, checkpoints=None):
+    make_strategy, since, size = strategies[name]
+    pipeline = _EditedPipeline(runs, edit, checkpoints)
+    return pipeline.rate_size(size, make_strategy(), since=since)
+
+
+@pytest.fixture(scope="module")
+def scratch(runs, strategies):
+    """scratch(name, edit): state rated without checkpoints, computed once."""
+    cache = {}
+
+    def rate(name, edit=None):
+        if (name, edit) not in cache:
+            cache[(name, edit)] = _rate(runs, strategies, name, edit)
+        return cache[(name, edit)]
+    return rate
+
+
+def _assert_same(resumed, scratch):
+    assert list(resumed.ratings) == list(scratch.ratings)
+    assert [(r.mu, r.sigma) for r in resumed.ratings.values()] == \
+        [(r.mu, r.sigma) for r in scratch.ratings.values()]
+    assert resumed.stats == scratch.stats
+    assert vars(resumed.strategy) == vars(scratch.strategy)
+
+
+@pytest.mark.parametrize("name", STRATEGY_NAMES)
+def test_unchanged_rerun(runs, strategies, scratch, tmp_path, name):
+    _rate(runs, strategies, name, checkpoints=CheckpointStore(tmp_path))
+    store = CheckpointStore(tmp_path)
+    resumed = _rate(runs, strategies, name, checkpoints=store)
+    assert (store.resumed, store.replayed) == (1, 0)
+    _assert_same(resumed, scratch(name))
+
+
+@pytest.mark.parametrize("name", STRATEGY_NAMES)
+def test_appended_competition(runs, strategies, scratch, tmp_path, name):
+    _rate(runs, strategies, name, edit=_drop_last, checkpoints=CheckpointStore(tmp_path))
+    store = CheckpointStore(tmp_path)
+    resumed = _rate(runs, strategies, name, checkpoints=store)
+    assert (store.resumed, store.replayed) == (1, 1)
+    _assert_same(resumed, scratch(name))
+
+
+@pytest.mark.parametrize("name", STRATEGY_NAMES)
+def test_edited_earlier_round(runs, strategies, scratch, tmp_path, name):
+    _rate(runs, strategies, name, checkpoints=CheckpointStore(tmp_path))
+    store = CheckpointStore(tmp_path)
+    resumed = _rate(runs, strategies, name, edit=_edit_round, checkpoints=store)
+    assert store.resumed == 1 and 0 < store.replayed < store.competitions
+    _assert_same(resumed, scratch(name, _edit_round))
+
+    # The series now follows the edited data; the original resumes from
+    # before the edit again.
+    store = CheckpointStore(tmp_path)
+    resumed = _rate(runs, strategies, name, checkpoints=store)
+    assert store.resumed == 1 and 0 < store.replayed < store.competitions
+    _assert_same(resumed, scratch(name))
+
+
+@pytest.mark.parametrize("name", STRATEGY_NAMES)
+def test_delta_chain_crossing_full_snapshots(runs, strategies, tmp_path, monkeypatch, name):
+    monkeypatch.setattr(rating_checkpoints, "FULL_CHECKPOINT_INTERVAL", 4)
+    # Grow the data a few competitions at a time, so every run resumes
+    # from a different point of the delta chain.
+    make_strategy, since, size = strategies[name]
+    total = len(RatingPipeline(runs, base.MIN_FIELD_SIZE).competitions(size, since))
+    for cut in sorted({total // 5, total // 3, total // 3 + 1, total // 2 + 3, total - 2, total}):
+        def edit(prepared, cut=cut):
+            return prepared[:cut]
+        store = CheckpointStore(tmp_path)
+        resumed = _rate(runs, strategies, name, edit=edit, checkpoints=store)
+        _assert_same(resumed, _rate(runs, strategies, name, edit=edit))
+
+    (index_path,) = tmp_path.glob("*.idx")
+    with open(index_path, "rb") as index_file:
+        index = pickle.load(index_file)["checkpoints"]
+    fulls = sum(full for _, _, full, _, _ in index)
+    assert fulls >= 3 and fulls < len(index)
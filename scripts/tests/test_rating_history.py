@@ -0,0 +1,51 @@
+"""Recorded rating histories against the rated states."""
+
+import numpy as np
+import pytest
+
+import calculate_rating as base
+from rating_history import HISTORY_COLUMNS, RatingHistory
+from rating_pipeline import RatingPipeline
+
+
+@pytest.fixture(scope="module")
+def states(runs):
+    """{size: SizeState} of the baseline strategy rated with history recorded."""
+    pipeline = RatingPipeline(runs, base.MIN_FIELD_SIZE, record_history=True)
+    return pipeline.rate(base.BaselineStrategy())
+
+
+def test_last_row_is_final_rating(states):
+    for size, state in states.items():
+        history = state.history
+        assert sorted(history.team_ids) == sorted(state.ratings), size
+        for team_id, rating in state.ratings.items():
+            rows = history.trajectory(team_id)
+            assert len(rows["mu"]) > 0
+            assert (rows["mu"][-1], rows["sigma"][-1]) == (rating.mu, rating.sigma), (size, team_id)
+
+
+def test_rows_are_chronological(states):
+    for size, state in states.items():
+        history = state.history
+        assert len(history) == sum(len(history.trajectory(team_id)["round"]) for team_id in history.team_ids)
+        for team_id in history.team_ids:
+            rows = history.trajectory(team_id)
+            assert (np.diff(rows["date"]) >= 0).all(), (size, team_id)
+            assert (np.diff(rows["round"]) > 0).all(), (size, team_id)
+
+
+def test_save_load_round_trip(states, tmp_path):
+    for size, state in states.items():
+        path = str(tmp_path / f"{size.lower()}.npz")
+        state.history.save(path)
+        loaded = RatingHistory.load(path)
+        assert loaded.team_ids == state.history.team_ids
+        np.testing.assert_array_equal(loaded.offsets, state.history.offsets)
+        for name, dtype in HISTORY_COLUMNS.items():
+            assert loaded.columns[name].dtype == dtype
+            np.testing.assert_array_equal(loaded.columns[name], state.history.columns[name])
+        team_id = state.history.team_ids[-1]
+        for name, values in state.history.trajectory(team_id).items():
+            np.testing.assert_array_equal(loaded.trajectory(team_id)[name], values)
+    assert loaded.trajectory("nobody") == {}